@@ -17,15 +17,11 @@ from shared import (
     load_owid_continents,
     inject_total_daily_cols,
     inject_owid_aggregates,
-    inject_per_million,
     inject_days_since,
     inject_cfr,
     inject_population,
-    inject_rolling_avg,
+    inject_rolling_metrics,
     inject_exemplars,
-    inject_doubling_days,
-    inject_weekly_growth,
-    inject_biweekly_growth,
     standard_export,
     ZERO_DAY,
 )
@@ -260,10 +256,7 @@ def load_standardized(df):
     # df = patch_ireland(df)
     df = discard_rows(df)
     df = inject_owid_aggregates(df)
-    df = inject_weekly_growth(df)
-    df = inject_biweekly_growth(df)
-    df = inject_doubling_days(df)
-    df = inject_per_million(
+    df = inject_rolling_metrics(
         df,
         [
             "new_cases",
@@ -276,14 +269,13 @@ def load_standardized(df):
             "biweekly_deaths",
         ],
     )
-    df = inject_rolling_avg(df)
     df = inject_cfr(df)
     df = inject_days_since(df)
     df = inject_exemplars(df)
     return df.sort_values(by=["location", "date"])
 
 
-def export(df_merged):
+def export(df_merged, parallel=False):
     df_loc = df_merged[["Country/Region", "location"]].drop_duplicates()
     df_loc = df_loc.merge(load_owid_continents(), on="location", how="left")
     df_loc = inject_population(df_loc)
@@ -292,10 +284,12 @@ def export(df_merged):
     df_loc = df_loc.sort_values("location")
     df_loc.to_csv(os.path.join(OUTPUT_PATH, "locations.csv"), index=False)
     # The rest of the CSVs
-    return standard_export(load_standardized(df_merged), OUTPUT_PATH, DATASET_NAME)
+    return standard_export(
+        load_standardized(df_merged), OUTPUT_PATH, DATASET_NAME, parallel=parallel
+    )
 
 
-def main(skip_download=False):
+def main(skip_download=False, parallel=False):
 
     if not skip_download:
         print("\nAttempting to download latest CSV files...")
@@ -309,7 +303,7 @@ def main(skip_download=False):
         print_err("Data correctness check %s.\n" % colored("failed", "red"))
         sys.exit(1)
 
-    if export(df_merged):
+    if export(df_merged, parallel=parallel):
         print(
             "Successfully exported CSVs to %s\n"
             % colored(os.path.abspath(OUTPUT_PATH), "magenta")
@@ -349,5 +343,11 @@ if __name__ == "__main__":
         action="store_true",
         help="Skip downloading files from the JHU repository",
     )
+    parser.add_argument(
+        "-p",
+        "--parallel",
+        action="store_true",
+        help="Write the exported CSVs concurrently, in a process pool",
+    )
     args = parser.parse_args()
-    main(skip_download=args.skip_download)
+    main(skip_download=args.skip_download, parallel=args.parallel)
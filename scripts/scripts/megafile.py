@@ -6,14 +6,19 @@ Merges all COVID-19 data into a 'megafile';
 - Includes country ISO codes in a column next to country names.
 """
 
+import argparse
+import hashlib
 import json
 import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, date, timedelta
-from functools import reduce
 import yaml
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 
 
 CURRENT_DIR = os.path.abspath(os.path.dirname(__file__))
@@ -45,78 +50,106 @@ POL_CSV = os.path.join(INPUT_DIR, "bsg", "latest.csv")
 CODEBOOK_CSV = os.path.join(DATA_DIR, "owid-covid-codebook.csv")
 README_TMP = os.path.join(CURRENT_DIR, "README.md.template")
 README_FILE = os.path.join(DATA_DIR, "README.md")
+ZERO_DAY = pd.Timestamp("2020-01-21")
+# Incremental build cache
+MEGAFILE_CACHE_DIR = os.path.abspath(os.path.join(CURRENT_DIR, "..", "tmp", "megafile"))
+MEGAFILE_CACHE_MANIFEST = os.path.join(MEGAFILE_CACHE_DIR, "manifest.json")
+MEGAFILE_CACHE_TABLE = os.path.join(MEGAFILE_CACHE_DIR, "owid-covid-data.parquet")
+
+JHU_VARIABLES = [
+    "total_cases",
+    "new_cases",
+    "weekly_cases",
+    "total_deaths",
+    "new_deaths",
+    "weekly_deaths",
+    "total_cases_per_million",
+    "new_cases_per_million",
+    "weekly_cases_per_million",
+    "total_deaths_per_million",
+    "new_deaths_per_million",
+    "weekly_deaths_per_million",
+]
+
+# Macro variables
+# - the key is the name of the variable of interest
+# - the value is the path to the corresponding file
+MACRO_VARIABLES = {
+    "population": "un/population_2020.csv",
+    "population_density": "wb/population_density.csv",
+    "median_age": "un/median_age.csv",
+    "aged_65_older": "wb/aged_65_older.csv",
+    "aged_70_older": "un/aged_70_older.csv",
+    "gdp_per_capita": "wb/gdp_per_capita.csv",
+    "extreme_poverty": "wb/extreme_poverty.csv",
+    "cardiovasc_death_rate": "gbd/cardiovasc_death_rate.csv",
+    "diabetes_prevalence": "wb/diabetes_prevalence.csv",
+    "female_smokers": "wb/female_smokers.csv",
+    "male_smokers": "wb/male_smokers.csv",
+    "handwashing_facilities": "un/handwashing_facilities.csv",
+    "hospital_beds_per_thousand": "owid/hospital_beds.csv",
+    "life_expectancy": "owid/life_expectancy.csv",
+    "human_development_index": "un/human_development_index.csv",
+}
 
 
 def get_jhu():
     """
     Reads each COVID-19 JHU dataset located in /public/data/jhu/
-    Melts the dataframe to vertical format (1 row per country and date)
-    Merges all JHU dataframes into one with outer joins
+    Aligns all JHU datasets on a single (date, location) grid
+    Reshapes the result to vertical format (1 row per country and date) in one pass
 
     Returns:
         jhu {dataframe}
     """
 
-    jhu_variables = [
-        "total_cases",
-        "new_cases",
-        "weekly_cases",
-        "total_deaths",
-        "new_deaths",
-        "weekly_deaths",
-        "total_cases_per_million",
-        "new_cases_per_million",
-        "weekly_cases_per_million",
-        "total_deaths_per_million",
-        "new_deaths_per_million",
-        "weekly_deaths_per_million",
-    ]
+    smoothed_names = {
+        "weekly_cases": "new_cases_smoothed",
+        "weekly_deaths": "new_deaths_smoothed",
+        "weekly_cases_per_million": "new_cases_smoothed_per_million",
+        "weekly_deaths_per_million": "new_deaths_smoothed_per_million",
+    }
 
-    data_frames = []
+    data_frames = {}
 
-    # Process each file and melt it to vertical format
-    for jhu_var in jhu_variables:
+    # Process each file in its original wide format (1 column per country)
+    for jhu_var in JHU_VARIABLES:
         tmp = pd.read_csv(
-            os.path.join(DATA_DIR, f"../../public/data/jhu/{jhu_var}.csv")
+            os.path.join(DATA_DIR, f"../../public/data/jhu/{jhu_var}.csv"),
+            index_col="date",
         )
-        country_cols = list(tmp.columns)
-        country_cols.remove("date")
 
         # Carrying last observation forward for International totals to avoid discrepancies
         if jhu_var[:5] == "total":
-            tmp = tmp.sort_values("date")
+            tmp = tmp.sort_index()
             tmp["International"] = tmp["International"].ffill()
 
-        tmp = (
-            pd.melt(tmp, id_vars="date", value_vars=country_cols)
-            .rename(columns={"value": jhu_var, "variable": "location"})
-            .dropna()
-        )
-
         # Exclude entities from megafile
-        tmp = tmp[tmp.location != "2020 Summer Olympics athletes & staff"]
+        tmp = tmp.drop(
+            columns=["2020 Summer Olympics athletes & staff"], errors="ignore"
+        )
 
         if jhu_var[:7] == "weekly_":
-            tmp[jhu_var] = tmp[jhu_var].div(7).round(3)
-            tmp = tmp.rename(
-                errors="ignore",
-                columns={
-                    "weekly_cases": "new_cases_smoothed",
-                    "weekly_deaths": "new_deaths_smoothed",
-                    "weekly_cases_per_million": "new_cases_smoothed_per_million",
-                    "weekly_deaths_per_million": "new_deaths_smoothed_per_million",
-                },
-            )
+            data_frames[smoothed_names[jhu_var]] = tmp.div(7).round(3)
         else:
-            tmp[jhu_var] = tmp[jhu_var].round(3)
-        data_frames.append(tmp)
+            data_frames[jhu_var] = tmp.round(3)
     print()
 
-    # Outer join between all files
-    jhu = reduce(
-        lambda left, right: pd.merge(left, right, on=["date", "location"], how="outer"),
-        data_frames,
-    )
+    # Outer join between all files: build the (date, location) grid once and align
+    # every variable into it
+    dates = sorted(set().union(*[df.index for df in data_frames.values()]))
+    locations = sorted(set().union(*[df.columns for df in data_frames.values()]))
+    values = np.stack(
+        [
+            df.reindex(index=dates, columns=locations).to_numpy(dtype=float)
+            for df in data_frames.values()
+        ],
+        axis=-1,
+    ).reshape(len(dates) * len(locations), len(data_frames))
+    jhu = pd.DataFrame(values, columns=list(data_frames.keys()))
+    jhu.insert(0, "location", np.tile(locations, len(dates)))
+    jhu.insert(0, "date", np.repeat(dates, len(locations)))
+    jhu = jhu.dropna(subset=list(data_frames.keys()), how="all").reset_index(drop=True)
 
     return jhu
 
@@ -162,8 +195,7 @@ def get_hosp():
         }
     ).round(3)
     hosp.loc[:, "date"] = (
-        ([pd.to_datetime("2020-01-21")] * hosp.shape[0])
-        + hosp["date"].apply(pd.offsets.Day)
+        ([ZERO_DAY] * hosp.shape[0]) + hosp["date"].apply(pd.offsets.Day)
     ).astype(str)
     return hosp
 
@@ -201,6 +233,20 @@ def get_vax():
         "total_boosters_per_hundred",
     ]
     vax[rounded_cols] = vax[rounded_cols].round(3)
+    vax = vax[
+        -vax.location.isin(
+            [
+                "England",
+                "Northern Ireland",
+                "Scotland",
+                "Wales",
+                "High income",
+                "Upper middle income",
+                "Lower middle income",
+                "Low income",
+            ]
+        )
+    ]
     return vax
 
 
@@ -356,11 +402,16 @@ def get_cgrt():
     return cgrt
 
 
-def add_excess_mortality(df: pd.DataFrame) -> pd.DataFrame:
-    xm = pd.read_csv(
+def get_excess_mortality() -> pd.DataFrame:
+    return pd.read_csv(
         os.path.join(DATA_DIR, "excess_mortality/excess_mortality.csv"),
         usecols=["location", "date", "p_scores_all_ages"],
     )
+
+
+def add_excess_mortality(df: pd.DataFrame, xm: pd.DataFrame = None) -> pd.DataFrame:
+    if xm is None:
+        xm = get_excess_mortality()
     df = df.merge(xm, how="left", on=["location", "date"]).rename(
         columns={"p_scores_all_ages": "excess_mortality"}
     )
@@ -382,34 +433,141 @@ def dict_to_compact_json(d: dict):
     )
 
 
+def encode_json_values(series):
+    """
+    Encodes each value of a series as minified JSON, one column at a time.
+
+    Output matches `dict_to_compact_json` for each value. NA values must be dropped
+    beforehand.
+
+    Returns:
+        np.ndarray: Array of JSON strings (dtype object).
+    """
+    values = series.to_numpy()
+    kind = series.dtype.kind
+    if values.dtype == object:
+        # factorize() treats values that compare equal as the same (1, 1.0 and True;
+        # -0.0 and 0.0), so only object columns holding a single type are encoded by
+        # type. Others (e.g. ints and floats mixed) are encoded value by value.
+        kind = {"floating": "f", "integer": "i", "boolean": "b", "string": "O"}.get(
+            pd.api.types.infer_dtype(values, skipna=False)
+        )
+        if kind is None:
+            return np.array(
+                [
+                    dict_to_compact_json(v.item() if isinstance(v, np.generic) else v)
+                    for v in values
+                ],
+                dtype=object,
+            )
+
+    negative_zero = None
+    if kind == "f":
+        values = values.astype(float)
+        # Same behaviour as `allow_nan=False`
+        if not np.isfinite(values).all():
+            raise ValueError(
+                f"Out of range float values are not JSON compliant ({series.name})"
+            )
+        # factorize() does not tell -0.0 from 0.0, these are encoded separately
+        negative_zero = (values == 0) & np.signbit(values)
+        values[negative_zero] = 0.0
+
+    # Encode each distinct value once
+    codes, uniques = pd.factorize(values)
+    if kind == "f":
+        uniques = uniques.astype(str)
+    elif kind == "b":
+        uniques = np.where(uniques.astype(bool), "true", "false")
+    elif kind in ("i", "u"):
+        uniques = uniques.astype("int64").astype(str)
+    else:
+        uniques = [
+            dict_to_compact_json(v.item() if isinstance(v, np.generic) else v)
+            for v in uniques
+        ]
+    encoded = np.asarray(uniques, dtype=object)[codes]
+    if negative_zero is not None and negative_zero.any():
+        encoded[negative_zero] = "-0.0"
+    return encoded
+
+
+def df_to_json_records(df):
+    """
+    Encodes each row of the dataframe as a minified JSON object.
+    NA values are dropped from each object, column-wise.
+
+    Returns:
+        np.ndarray: Array of JSON strings (dtype object), one per row.
+    """
+    rows = np.full(len(df), "", dtype=object)
+    for col in df.columns:
+        mask = df[col].notna().to_numpy()
+        if mask.any():
+            prefix = "," + dict_to_compact_json(col) + ":"
+            rows[mask] = rows[mask] + prefix + encode_json_values(df.loc[mask, col])
+    # Each non-empty row starts with a leading comma
+    return "{" + pd.Series(rows, dtype=object).str[1:].to_numpy() + "}"
+
+
 def df_to_json(complete_dataset, output_path, static_columns):
     """
     Writes a JSON version of the complete dataset, with the ISO code at the root.
     NA values are dropped from the output.
     Macro variables are normalized by appearing only once, at the root of each ISO code.
-    """
-    megajson = {}
 
+    Rows are encoded column-wise and written to the file one country at a time, so that
+    the JSON document is never built as a Python dictionary.
+    """
     static_columns = ["continent", "location"] + list(static_columns)
 
     complete_dataset = complete_dataset.dropna(axis="rows", subset=["iso_code"])
-
-    for iso in complete_dataset.iso_code.unique():
-        country_df = complete_dataset[complete_dataset.iso_code == iso].drop(
-            columns=["iso_code"]
-        )
-        static_data = country_df.head(1)[static_columns].to_dict("records")[0]
-        megajson[iso] = {k: v for k, v in static_data.items() if pd.notnull(v)}
-        megajson[iso]["data"] = [
-            {k: v for k, v in r.items() if pd.notnull(v)}
-            for r in country_df.drop(columns=static_columns).to_dict("records")
-        ]
+    data_columns = [
+        col
+        for col in complete_dataset.columns
+        if col not in static_columns and col != "iso_code"
+    ]
+    records = df_to_json_records(complete_dataset[data_columns])
+    groups = complete_dataset.groupby("iso_code", sort=False).indices
+    static_records = (
+        complete_dataset[static_columns]
+        .iloc[[idx[0] for idx in groups.values()]]
+        .to_dict("records")
+    )
 
     with open(output_path, "w") as file:
-        file.write(dict_to_compact_json(megajson))
+        file.write("{")
+        for i, ((iso, idx), static_data) in enumerate(
+            zip(groups.items(), static_records)
+        ):
+            static_json = dict_to_compact_json(
+                {k: v for k, v in static_data.items() if pd.notnull(v)}
+            )
+            if i > 0:
+                file.write(",")
+            file.write(dict_to_compact_json(iso) + ":")
+            file.write(static_json[:-1] + ("," if static_json != "{}" else ""))
+            file.write('"data":[')
+            file.write(",".join(records[idx]))
+            file.write("]}")
+        file.write("}")
 
 
-def df_to_columnar_json(complete_dataset, output_path):
+def encode_json_column(series):
+    """
+    Encodes each value of a series as minified JSON, with NA values as `null`.
+
+    Returns:
+        pd.Series: JSON strings, with the same index as `series`.
+    """
+    encoded = np.full(len(series), "null", dtype=object)
+    mask = series.notna().to_numpy()
+    if mask.any():
+        encoded[mask] = encode_json_values(series[mask])
+    return pd.Series(encoded, index=series.index, name=series.name)
+
+
+def df_to_columnar_json(complete_dataset, output_path, encoded_columns=None):
     """
     Writes a columnar JSON version of the complete dataset.
     NA values are dropped from the output.
@@ -421,14 +579,67 @@ def df_to_columnar_json(complete_dataset, output_path):
             "iso_code": ["AFG", "AFG", ... ],
             "date": ["2020-03-01", "2020-03-02", ... ]
         }
+
+    Args:
+        complete_dataset (pd.DataFrame): Data to export.
+        output_path (str): Path to the output JSON file.
+        encoded_columns (dict): Columns already encoded with `encode_json_column`,
+            indexed by a superset of the index of `complete_dataset`. Used instead of
+            encoding these columns again.
     """
-    # Replace NaNs with None in order to be serializable to JSON.
-    # JSON doesn't support NaNs, but it does have null which is represented as None in Python.
-    columnar_dict = complete_dataset.to_dict(orient="list")
-    for k, v in columnar_dict.items():
-        columnar_dict[k] = [x if pd.notnull(x) else None for x in v]
+    if not complete_dataset.index.is_unique:
+        encoded_columns = None
     with open(output_path, "w") as file:
-        file.write(dict_to_compact_json(columnar_dict))
+        file.write("{")
+        for i, col in enumerate(complete_dataset.columns):
+            if encoded_columns is not None and col in encoded_columns:
+                values = encoded_columns[col].loc[complete_dataset.index]
+            else:
+                values = encode_json_column(complete_dataset[col])
+            if i > 0:
+                file.write(",")
+            file.write(dict_to_compact_json(col) + ":[")
+            file.write(",".join(values))
+            file.write("]")
+        file.write("}")
+
+
+def get_latest_values(df):
+    """
+    Gets the latest non-null value of each column, for each location.
+
+    Equivalent to forward-filling the data of each location and keeping its last row.
+
+    Args:
+        df (pd.DataFrame): Data, sorted by date.
+
+    Returns:
+        pd.DataFrame: One row per location, sorted by location.
+    """
+    return df.groupby("location").last().reset_index()[df.columns]
+
+
+def get_latest_dates(df, columns=None):
+    """
+    Gets the date of the latest non-null value of each column, for each location.
+
+    Args:
+        df (pd.DataFrame): Data, sorted by date.
+        columns (list): Columns to get the dates for. Defaults to all columns except
+            `location` and `date`.
+
+    Returns:
+        pd.DataFrame: One row per location, sorted by location. Columns are named as in
+            `df`, and contain the date of the latest value (NaN if there is none).
+    """
+    if columns is None:
+        columns = [col for col in df.columns if col not in ["location", "date"]]
+    dates = pd.DataFrame(
+        np.where(df[columns].notna(), df[["date"]].to_numpy(), None),
+        columns=columns,
+        index=df.index,
+    )
+    return dates.groupby(df["location"]).last().reset_index()
 
 
 def create_latest(df):
@@ -436,13 +647,8 @@ def create_latest(df):
     df = df[df.date >= str(date.today() - timedelta(weeks=2))]
     df = df.sort_values("date")
 
-    latest = [
-        df[df.location == loc].ffill().tail(1).round(3) for loc in set(df.location)
-    ]
-    latest = pd.concat(latest)
-    latest = latest.sort_values("location").rename(
-        columns={"date": "last_updated_date"}
-    )
+    latest = get_latest_values(df).round(3)
+    latest = latest.rename(columns={"date": "last_updated_date"})
 
     print("Writing latest version…")
     latest.to_csv(os.path.join(DATA_DIR, "latest/owid-covid-latest.csv"), index=False)
@@ -600,6 +806,7 @@ class AnnotatorInternal:
 
     def __init__(self, config: dict):
         self._config = config
+        self._intervals = {}
 
     @classmethod
     def from_yaml(cls, path):
@@ -671,31 +878,86 @@ class AnnotatorInternal:
         return self.config_flat_to_nested(df_config)
 
     def insert_annotation(self, stream: str, annotation: dict):
+        self.insert_annotations(stream, [annotation])
+
+    def insert_annotations(self, stream: str, annotations: list):
+        """Inserts a batch of annotations into a stream.
+
+        Duplicates are removed once for the whole batch.
+
+        Args:
+            stream (str): Stream name, as in `internal_files_columns`.
+            annotations (list): Annotation dictionaries, with fields `annotation_text` (str), `location` (list) and
+                `date` (str).
+        """
         # Checks
-        if (
-            "annotation_text" not in annotation
-            or "location" not in annotation
-            or "date" not in annotation
-        ):
-            raise ValueError(
-                "annotation dictionary must contain fields `annotation_text`, `location` and `date`"
-            )
-        if not (
-            isinstance(annotation["annotation_text"], str)
-            and isinstance(annotation["location"], list)
-            and isinstance(annotation["annotation_text"], str)
-        ):
-            raise ValueError(
-                f"Check `annotation` field types. `annotation_text` (str), `location` (list) and `date` (str)"
-            )
-        # Add annotation
-        self._config[stream].append(annotation)
+        for annotation in annotations:
+            if (
+                "annotation_text" not in annotation
+                or "location" not in annotation
+                or "date" not in annotation
+            ):
+                raise ValueError(
+                    "annotation dictionary must contain fields `annotation_text`, `location` and `date`"
+                )
+            if not (
+                isinstance(annotation["annotation_text"], str)
+                and isinstance(annotation["location"], list)
+                and isinstance(annotation["date"], str)
+            ):
+                raise ValueError(
+                    f"Check `annotation` field types. `annotation_text` (str), `location` (list) and `date` (str)"
+                )
+        if not annotations:
+            return
+        # Add annotations
+        self._config[stream].extend(annotations)
         # Remove duplicates
         self._config = self._remove_config_duplicates()
+        self._intervals = {}
 
     def to_yaml(self):
         pass
 
+    def intervals(self, stream: str) -> pd.DataFrame:
+        """Compiles the annotations of a stream into intervals.
+
+        Each row contains [location, date, annotation_text], meaning that `annotation_text` applies to `location` from
+        `date` onwards (until the next interval of the same location). Annotations without `date` apply from the
+        beginning. If several annotations start on the same date, the last one in `config` prevails.
+
+        The result is cached until new annotations are inserted.
+
+        Args:
+            stream (str): Stream name.
+
+        Returns:
+            pd.DataFrame: Intervals, sorted by date.
+        """
+        if stream not in self._intervals:
+            intervals = []
+            for c in self.config[stream]:
+                if not ("location" in c and "annotation_text" in c):
+                    raise ValueError(
+                        f"Missing field in {stream} (`location` and `annotation_text` are required)."
+                    )
+                locations = (
+                    [c["location"]] if isinstance(c["location"], str) else c["location"]
+                )
+                date_start = (
+                    pd.to_datetime(c["date"]) if "date" in c else pd.Timestamp.min
+                )
+                intervals.extend(
+                    [(loc, date_start, c["annotation_text"]) for loc in locations]
+                )
+            self._intervals[stream] = (
+                pd.DataFrame(intervals, columns=["location", "date", "annotation_text"])
+                .drop_duplicates(subset=["location", "date"], keep="last")
+                .sort_values("date", kind="stable")
+                .reset_index(drop=True)
+            )
+        return self._intervals[stream]
+
     def add_annotations(self, df: pd.DataFrame, stream: str) -> pd.DataFrame:
         if stream in self.streams:
             print(f"Adding annotation for {stream}")
@@ -704,19 +966,24 @@ class AnnotatorInternal:
 
     def _add_annotations(self, df: pd.DataFrame, stream: str) -> pd.DataFrame:
         df = df.assign(annotations=pd.NA)
-        conf = self.config[stream]
-        for c in conf:
-            if not ("location" in c and "annotation_text" in c):
-                raise ValueError(
-                    f"Missing field in {stream} (`location` and `annotation_text` are required)."
-                )
-            if isinstance(c["location"], str):
-                mask = df.location == c["location"]
-            elif isinstance(c["location"], list):
-                mask = df.location.isin(c["location"])
-            if "date" in c:
-                mask = mask & (df.date >= c["date"])
-            df.loc[mask, "annotations"] = c["annotation_text"]
+        intervals = self.intervals(stream)
+        if intervals.empty or df.empty:
+            return df
+        # Find, for each row, the latest interval of its location starting on or before its date
+        rows = pd.DataFrame(
+            {
+                "location": df.location.to_numpy(),
+                "date": pd.to_datetime(df.date).to_numpy(),
+                "row": np.arange(len(df)),
+            }
+        ).sort_values("date", kind="stable")
+        rows = pd.merge_asof(
+            rows, intervals, on="date", by="location", direction="backward"
+        )
+        annotations = np.full(len(df), pd.NA, dtype=object)
+        mask = rows.annotation_text.notna().to_numpy()
+        annotations[rows.row.to_numpy()[mask]] = rows.annotation_text.to_numpy()[mask]
+        df["annotations"] = annotations
         return df
 
 
@@ -728,15 +995,17 @@ def add_annotations_countries_100_percentage(df, annotator):
         .date.min()
         .to_dict()
     )
-    for loc, dt in locations_exc.items():
-        annotator.insert_annotation(
-            "vaccinations",
+    annotator.insert_annotations(
+        "vaccinations",
+        [
             {
                 "annotation_text": "Exceeds 100% due to vaccination of non-residents",
                 "location": [loc],
                 "date": dt,
-            },
-        )
+            }
+            for loc, dt in locations_exc.items()
+        ],
+    )
     return annotator
 
 
@@ -805,6 +1074,13 @@ def create_internal(df):
         df["people_partly_vaccinated"] / df["population"] * 100
     )
 
+    # Encode once the columns shared by the internal files
+    df = df.reset_index(drop=True)
+    encoded_columns = {
+        col: encode_json_column(df[col])
+        for col in set().union(*[c["columns"] for c in internal_files_columns.values()])
+    }
+
     # Export
     for name, config in internal_files_columns.items():
         output_path = os.path.join(dir_path, f"megafile--{name}.json")
@@ -813,68 +1089,124 @@ def create_internal(df):
             subset=value_columns, how=config["dropna"]
         )
         df_output = annotator.add_annotations(df_output, name)
-        df_to_columnar_json(df_output, output_path)
+        df_to_columnar_json(df_output, output_path, encoded_columns)
 
 
-def generate_megafile():
+def _date_to_day(dates):
+    return (pd.to_datetime(dates) - ZERO_DAY).dt.days.astype("int32")
 
-    print("\nFetching JHU dataset…")
-    jhu = get_jhu()
 
-    print("\nFetching reproduction rate…")
-    reprod = get_reprod()
+def _day_to_date(days):
+    return (ZERO_DAY + pd.to_timedelta(days, unit="D")).dt.strftime("%Y-%m-%d")
 
-    location_mismatch = set(reprod.location).difference(set(jhu.location))
-    for loc in location_mismatch:
-        print(
-            f"<!> Location '{loc}' has reproduction rates but is absent from JHU data"
-        )
 
-    print("\nFetching hospital dataset…")
-    hosp = get_hosp()
+def _encode_keys(frames, column):
+    """Replaces `column` in all `frames` by integer codes, with one shared (sorted)
+    factorization. Strings are hashed once; dates are not parsed.
 
-    location_mismatch = set(hosp.location).difference(set(jhu.location))
-    for loc in location_mismatch:
-        print(f"<!> Location '{loc}' has hospital data but is absent from JHU data")
+    Returns:
+        Encoded frames and the sorted unique values (`uniques.take(codes)` decodes).
+    """
+    values = np.concatenate(
+        [df[column].to_numpy(dtype=object) for df in frames.values()]
+    )
+    codes, uniques = pd.factorize(values, sort=True)
+    bounds = np.cumsum([len(df) for df in frames.values()])[:-1]
+    codes = np.split(codes.astype("int32"), bounds)
+    encoded = {
+        name: df.assign(**{column: code})
+        for (name, df), code in zip(frames.items(), codes)
+    }
+    return encoded, pd.Index(uniques)
 
-    print("\nFetching testing dataset…")
-    testing = get_testing()
 
-    location_mismatch = set(testing.location).difference(set(jhu.location))
-    for loc in location_mismatch:
-        print(f"<!> Location '{loc}' has testing data but is absent from JHU data")
+def _decode_keys(codes, uniques):
+    """Inverse of `_encode_keys` (-1, i.e. missing, decodes to NaN)."""
+    return uniques.take(codes, allow_fill=True, fill_value=np.nan).to_numpy()
 
-    print("\nFetching vaccination dataset…")
-    vax = get_vax()
-    vax = vax[
-        -vax.location.isin(
-            [
-                "England",
-                "Northern Ireland",
-                "Scotland",
-                "Wales",
-                "High income",
-                "Upper middle income",
-                "Lower middle income",
-                "Low income",
-            ]
+
+MEGAFILE_SOURCES = {
+    "jhu": {
+        "loader": get_jhu,
+        "files": [os.path.join(DATA_DIR, "jhu", f"{v}.csv") for v in JHU_VARIABLES],
+    },
+    # Remote file, always downloaded
+    "reprod": {"loader": get_reprod, "files": None},
+    "hosp": {"loader": get_hosp, "files": [HOSP_CSV]},
+    "testing": {"loader": get_testing, "files": [TESTING_CSV]},
+    "vax": {"loader": get_vax, "files": [VACCINATIONS_CSV]},
+    "cgrt": {"loader": get_cgrt, "files": [POL_CSV]},
+    "xm": {
+        "loader": get_excess_mortality,
+        "files": [os.path.join(DATA_DIR, "excess_mortality", "excess_mortality.csv")],
+    },
+}
+
+
+def get_sources(names=None, cached=None):
+    """
+    Loads the per-location sources of the megafile (see `MEGAFILE_SOURCES`).
+
+    Args:
+        names (list): Sources to load with their loader. Defaults to all of them.
+        cached (dict): Already loaded sources, used as they are.
+
+    Returns:
+        sources {dict}: Source name -> dataframe
+    """
+    if names is None:
+        names = list(MEGAFILE_SOURCES.keys())
+    sources = dict(cached) if cached else {}
+    for name in names:
+        print(f"\nFetching {name} dataset…")
+        sources[name] = MEGAFILE_SOURCES[name]["loader"]()
+
+    for name in ["reprod", "hosp", "testing"]:
+        location_mismatch = set(sources[name].location).difference(
+            set(sources["jhu"].location)
         )
-    ]
+        for loc in location_mismatch:
+            print(f"<!> Location '{loc}' has {name} data but is absent from JHU data")
+    return sources
 
-    print("\nFetching OxCGRT dataset…")
-    cgrt = get_cgrt()
 
+def build_megafile(sources, locations=None):
+    """
+    Merges all sources into the complete dataset and adds ISO codes, continents and
+    macro variables.
+
+    Args:
+        sources (dict): Sources as returned by `get_sources`.
+        locations (list): If given, only rows for these locations are built.
+
+    Returns:
+        all_covid {dataframe}
+    """
+    if locations is not None:
+        sources = {
+            name: df[df.location.isin(locations)] for name, df in sources.items()
+        }
+
+    # Merge on integer keys (sorted location and date codes) rather than strings
+    encoded = {name: df for name, df in sources.items() if name != "xm"}
+    encoded, locations = _encode_keys(encoded, "location")
+    encoded, dates = _encode_keys(encoded, "date")
     all_covid = (
-        jhu.merge(reprod, on=["date", "location"], how="left")
-        .merge(hosp, on=["date", "location"], how="outer")
-        .merge(testing, on=["date", "location"], how="outer")
-        .merge(vax, on=["date", "location"], how="outer")
-        .merge(cgrt, on=["date", "location"], how="left")
+        encoded["jhu"]
+        .merge(encoded["reprod"], on=["date", "location"], how="left")
+        .merge(encoded["hosp"], on=["date", "location"], how="outer")
+        .merge(encoded["testing"], on=["date", "location"], how="outer")
+        .merge(encoded["vax"], on=["date", "location"], how="outer")
+        .merge(encoded["cgrt"], on=["date", "location"], how="left")
         .sort_values(["location", "date"])
     )
 
     # Remove today's datapoint
-    all_covid = all_covid[all_covid["date"] < str(date.today())]
+    all_covid = all_covid[all_covid["date"] < dates.searchsorted(str(date.today()))]
+    all_covid = all_covid.assign(
+        location=_decode_keys(all_covid.location, locations),
+        date=_decode_keys(all_covid.date, dates),
+    )
 
     # Add ISO codes
     print("Adding ISO codes…")
@@ -899,29 +1231,10 @@ def generate_megafile():
     all_covid = continents.merge(all_covid, on="iso_code", how="right")
 
     # Add macro variables
-    # - the key is the name of the variable of interest
-    # - the value is the path to the corresponding file
-    macro_variables = {
-        "population": "un/population_2020.csv",
-        "population_density": "wb/population_density.csv",
-        "median_age": "un/median_age.csv",
-        "aged_65_older": "wb/aged_65_older.csv",
-        "aged_70_older": "un/aged_70_older.csv",
-        "gdp_per_capita": "wb/gdp_per_capita.csv",
-        "extreme_poverty": "wb/extreme_poverty.csv",
-        "cardiovasc_death_rate": "gbd/cardiovasc_death_rate.csv",
-        "diabetes_prevalence": "wb/diabetes_prevalence.csv",
-        "female_smokers": "wb/female_smokers.csv",
-        "male_smokers": "wb/male_smokers.csv",
-        "handwashing_facilities": "un/handwashing_facilities.csv",
-        "hospital_beds_per_thousand": "owid/hospital_beds.csv",
-        "life_expectancy": "owid/life_expectancy.csv",
-        "human_development_index": "un/human_development_index.csv",
-    }
-    all_covid = add_macro_variables(all_covid, macro_variables)
+    all_covid = add_macro_variables(all_covid, MACRO_VARIABLES)
 
     # Add excess mortality
-    all_covid = add_excess_mortality(all_covid)
+    all_covid = add_excess_mortality(all_covid, sources["xm"])
 
     # Sort by location and date
     all_covid = all_covid.sort_values(["location", "date"])
@@ -931,29 +1244,264 @@ def generate_megafile():
         all_covid.drop_duplicates(subset=["location", "date"]).shape == all_covid.shape
     )
 
-    # Create light versions of complete dataset with only the latest data point
-    create_latest(all_covid)
+    return all_covid
 
-    print("Writing to CSV…")
 
+# Incremental build ####################################################
+def _file_fingerprint(path):
+    hash_md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hash_md5.update(chunk)
+    return hash_md5.hexdigest()
+
+
+def _static_fingerprint():
+    """Fingerprint of everything that affects all locations at once.
+
+    This includes the static inputs (ISO codes, continents, macro variables, mappings),
+    this script and the current date (some steps filter out today's data points).
+    """
+    paths = [
+        os.path.abspath(__file__),
+        os.path.join(INPUT_DIR, "iso/iso3166_1_alpha_3_codes.csv"),
+        os.path.join(INPUT_DIR, "owid/continents.csv"),
+        os.path.join(INPUT_DIR, "owid/secondary_testing_series.csv"),
+        os.path.join(INPUT_DIR, "bsg/bsg_country_standardised.csv"),
+        os.path.join(INPUT_DIR, "reproduction/reprod_country_standardized.csv"),
+        *[os.path.join(INPUT_DIR, file) for file in MACRO_VARIABLES.values()],
+    ]
+    return {
+        "date": str(date.today()),
+        "files": {os.path.basename(path): _file_fingerprint(path) for path in paths},
+    }
+
+
+def _source_fingerprint(name):
+    files = MEGAFILE_SOURCES[name]["files"]
+    if files is None:
+        return None
+    return [_file_fingerprint(path) for path in files]
+
+
+def _location_fingerprints(df):
+    """Order-independent hash of the rows of each location in `df`."""
+    hashes = pd.util.hash_pandas_object(
+        df.drop(columns=["location"]), index=False
+    ).to_numpy()
+    return {
+        loc: str(h)
+        for loc, h in pd.Series(hashes).groupby(df.location.to_numpy()).sum().items()
+    }
+
+
+def _source_cache_path(name):
+    return os.path.join(MEGAFILE_CACHE_DIR, f"source-{name}.parquet")
+
+
+def _write_cache_frame(df, path):
+    """Stores `df` as typed columnar file (categorical locations, int32 day offsets)."""
+    df.assign(
+        location=df.location.astype("category"), date=_date_to_day(df.date)
+    ).to_parquet(path, index=False)
+
+
+def _read_cache_frame(path):
+    df = pd.read_parquet(path)
+    return df.assign(location=df.location.astype(str), date=_day_to_date(df.date))
+
+
+def _load_cache_manifest():
+    if not (
+        os.path.isfile(MEGAFILE_CACHE_MANIFEST) and os.path.isfile(MEGAFILE_CACHE_TABLE)
+    ):
+        return None
+    with open(MEGAFILE_CACHE_MANIFEST, "r") as f:
+        return json.load(f)
+
+
+def _save_cache(all_covid, sources, static, location_hashes):
+    """Stores the cache of `build_megafile_incremental`, once the exports succeeded."""
+    os.makedirs(MEGAFILE_CACHE_DIR, exist_ok=True)
+    _write_cache_frame(all_covid, MEGAFILE_CACHE_TABLE)
+    for name, df in sources.items():
+        _write_cache_frame(df, _source_cache_path(name))
+    manifest = {
+        "static": static,
+        "sources": {name: _source_fingerprint(name) for name in sources},
+        "locations": location_hashes,
+    }
+    with open(MEGAFILE_CACHE_MANIFEST, "w") as f:
+        json.dump(manifest, f)
+
+
+def _changed_locations(old_hashes, new_hashes):
+    changed = set()
+    for name, hashes in new_hashes.items():
+        old = old_hashes.get(name, {})
+        changed |= {
+            loc for loc in set(hashes) | set(old) if hashes.get(loc) != old.get(loc)
+        }
+    return changed
+
+
+def build_megafile_incremental():
+    """
+    Builds the complete dataset, recomputing only the locations whose inputs changed
+    since the last run.
+
+    Sources whose files are unchanged are read from the cache instead of being parsed
+    again. Rows of each source are then fingerprinted per location, and only the
+    locations with a new fingerprint are merged again and patched into the cached
+    table. Any change in the static inputs, this script or the current date triggers a
+    full rebuild.
+
+    The cache is not updated here: it must be saved with `_save_cache(all_covid,
+    **cache)` once the exports succeeded, so that a failed run is retried next time.
+
+    Returns:
+        all_covid {dataframe}: Complete dataset, or None if nothing changed.
+        cache {dict}: Arguments of `_save_cache`, or None if nothing changed.
+    """
+    static = _static_fingerprint()
+    manifest = _load_cache_manifest()
+
+    if manifest is None or manifest["static"] != static:
+        print("Megafile cache is missing or stale, building all locations…")
+        sources = get_sources()
+        all_covid = build_megafile(sources)
+        location_hashes = {
+            name: _location_fingerprints(df) for name, df in sources.items()
+        }
+        return all_covid, dict(
+            sources=sources, static=static, location_hashes=location_hashes
+        )
+
+    # Reuse sources whose input files did not change
+    cached, to_load = {}, []
+    for name in MEGAFILE_SOURCES:
+        fingerprint = _source_fingerprint(name)
+        if (
+            fingerprint is not None
+            and fingerprint == manifest["sources"].get(name)
+            and os.path.isfile(_source_cache_path(name))
+        ):
+            cached[name] = _read_cache_frame(_source_cache_path(name))
+        else:
+            to_load.append(name)
+    sources = get_sources(names=to_load, cached=cached)
+
+    location_hashes = {
+        name: _location_fingerprints(sources[name])
+        if name in to_load
+        else manifest["locations"][name]
+        for name in MEGAFILE_SOURCES
+    }
+    changed = _changed_locations(manifest["locations"], location_hashes)
+    if not changed:
+        return None, None
+    print(f"Rebuilding {len(changed)} locations: {sorted(changed)}")
+
+    all_covid = _read_cache_frame(MEGAFILE_CACHE_TABLE)
+    all_covid = pd.concat(
+        [
+            all_covid[~all_covid.location.isin(changed)],
+            build_megafile(sources, locations=changed),
+        ]
+    ).sort_values(["location", "date"])
+    return all_covid, dict(
+        sources=sources, static=static, location_hashes=location_hashes
+    )
+
+
+def export_csv(all_covid):
+    print("Writing to CSV…")
     all_covid.to_csv(os.path.join(DATA_DIR, "owid-covid-data.csv"), index=False)
 
+
+def export_xlsx(all_covid):
     print("Writing to XLSX…")
     all_covid.to_excel(
         os.path.join(DATA_DIR, "owid-covid-data.xlsx"), index=False, engine="xlsxwriter"
     )
 
+
+def export_json(all_covid):
     print("Writing to JSON…")
     df_to_json(
         all_covid,
         os.path.join(DATA_DIR, "owid-covid-data.json"),
-        macro_variables.keys(),
+        MACRO_VARIABLES.keys(),
     )
 
-    print("Creating internal files…")
 
+def export_internal(all_covid):
+    print("Creating internal files…")
     create_internal(all_covid)
 
+
+# Export tasks, independent of each other.
+EXPORT_TASKS = {
+    # Light versions of complete dataset with only the latest data point
+    "latest": create_latest,
+    "csv": export_csv,
+    "xlsx": export_xlsx,
+    "json": export_json,
+    "internal": export_internal,
+}
+
+
+def _run_export_task(name, all_covid):
+    start = time.time()
+    EXPORT_TASKS[name](all_covid)
+    return name, time.time() - start
+
+
+def _run_export_task_from_arrow(name, arrow_path):
+    # Read the Arrow file written by the parent process instead of receiving the
+    # dataframe pickled. The file is memory-mapped, but read_pandas() still builds a
+    # full pandas copy of the dataset in each worker.
+    all_covid = pa.ipc.open_file(pa.memory_map(arrow_path)).read_pandas()
+    return _run_export_task(name, all_covid)
+
+
+def _run_export_tasks_parallel(all_covid):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        arrow_path = os.path.join(tmp_dir, "owid-covid-data.arrow")
+        table = pa.Table.from_pandas(all_covid, preserve_index=False)
+        with pa.OSFile(arrow_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        del table
+
+        with ProcessPoolExecutor(max_workers=len(EXPORT_TASKS)) as executor:
+            futures = [
+                executor.submit(_run_export_task_from_arrow, name, arrow_path)
+                for name in EXPORT_TASKS
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+
+
+def export_megafile(all_covid, parallel=False):
+    """
+    Writes all exports of the megafile (see `EXPORT_TASKS`), the README and the
+    timestamps.
+
+    Args:
+        all_covid (pd.DataFrame): Complete dataset.
+        parallel (bool): Run the export tasks concurrently, in a process pool. The
+            dataset is passed to the workers through an Arrow file rather than
+            pickled, but each worker holds its own pandas copy of it: peak memory
+            grows with the number of tasks (one worker per task).
+    """
+    if parallel:
+        timings = _run_export_tasks_parallel(all_covid)
+    else:
+        timings = (_run_export_task(name, all_covid) for name in EXPORT_TASKS)
+    for name, seconds in timings:
+        print(f"Export '{name}' done in {seconds:.1f}s")
+
     # Store the last updated time
     timestamp_filename = os.path.join(
         DATA_DIR, "owid-covid-data-last-updated-timestamp.txt"
@@ -969,6 +1517,31 @@ def generate_megafile():
     # Export timestamp
     export_timestamp(timestamp_filename)
 
+
+def generate_megafile(incremental=False, parallel=False):
+    """
+    Generates the megafile and all its exports.
+
+    Args:
+        incremental (bool): Only rebuild locations whose inputs changed since the last
+            run, and skip the exports altogether if none did. See
+            `build_megafile_incremental`.
+        parallel (bool): Write the export formats concurrently. See `export_megafile`.
+    """
+    if incremental:
+        all_covid, cache = build_megafile_incremental()
+        if all_covid is None:
+            print("Megafile is up to date!")
+            return
+    else:
+        all_covid = build_megafile(get_sources())
+
+    export_megafile(all_covid, parallel=parallel)
+
+    if incremental:
+        # Only now, so that a failed export is retried by the next run
+        _save_cache(all_covid, **cache)
+
     print("All done!")
 
 
@@ -1021,25 +1594,8 @@ def get_num_countries_jhu(csv_filepath):
 
 
 def load_macro_df():
-    macro_variables = {
-        "population": "un/population_2020.csv",
-        "population_density": "wb/population_density.csv",
-        "median_age": "un/median_age.csv",
-        "aged_65_older": "wb/aged_65_older.csv",
-        "aged_70_older": "un/aged_70_older.csv",
-        "gdp_per_capita": "wb/gdp_per_capita.csv",
-        "extreme_poverty": "wb/extreme_poverty.csv",
-        "cardiovasc_death_rate": "gbd/cardiovasc_death_rate.csv",
-        "diabetes_prevalence": "wb/diabetes_prevalence.csv",
-        "female_smokers": "wb/female_smokers.csv",
-        "male_smokers": "wb/male_smokers.csv",
-        "handwashing_facilities": "un/handwashing_facilities.csv",
-        "hospital_beds_per_thousand": "owid/hospital_beds.csv",
-        "life_expectancy": "owid/life_expectancy.csv",
-        "human_development_index": "un/human_development_index.csv",
-    }
     dfs = []
-    for var, file in macro_variables.items():
+    for var, file in MACRO_VARIABLES.items():
         dfs.append(
             pd.read_csv(os.path.join(INPUT_DIR, file), usecols=["iso_code", var])
         )
@@ -1100,4 +1656,18 @@ def generate_readme():
 
 
 if __name__ == "__main__":
-    generate_megafile()
+    parser = argparse.ArgumentParser(description="Generate the COVID-19 megafile")
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        action="store_true",
+        help="Only rebuild locations whose inputs changed since the last run",
+    )
+    parser.add_argument(
+        "-p",
+        "--parallel",
+        action="store_true",
+        help="Write the export formats concurrently, in a process pool",
+    )
+    args = parser.parse_args()
+    generate_megafile(incremental=args.incremental, parallel=args.parallel)
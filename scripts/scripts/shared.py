@@ -2,6 +2,7 @@ import sys
 import pandas as pd
 import numpy as np
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 CURRENT_DIR = os.path.dirname(__file__)
@@ -115,6 +116,52 @@ def inject_per_million(df, measures):
     return drop_population(df)
 
 
+# ===============
+# Grouped windows
+# ===============
+
+# Rolling and lagged calculations by location are computed over contiguous arrays,
+# with rows sorted by location and date. The position of each row within its location
+# keeps windows from crossing into the previous location.
+
+
+def _sort_by_location(df):
+    """Returns df sorted by location and date, and the position of each row within its
+    location"""
+    df = df.sort_values(by=["location", "date"]).reset_index(drop=True)
+    locations = df["location"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, locations[1:] != locations[:-1]])
+    lengths = np.diff(np.r_[starts, len(df)])
+    position = np.arange(len(df)) - np.repeat(starts, lengths)
+    return df, position
+
+
+def _rolling_sum(values, position, window):
+    """Sum and number of non-NaN values over the last `window` rows of each location"""
+    valid = ~np.isnan(values)
+    cumsum = np.r_[0, np.cumsum(np.where(valid, values, 0))]
+    cumcount = np.r_[0, np.cumsum(valid)]
+    end = np.arange(1, len(values) + 1)
+    start = end - np.minimum(position + 1, window)
+    return cumsum[end] - cumsum[start], cumcount[end] - cumcount[start]
+
+
+def _rolling_mean(values, position, window, min_periods):
+    total, count = _rolling_sum(values, position, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / count
+    return np.where(count >= max(min_periods, 1), mean, np.nan)
+
+
+def _pct_change(values, position, periods):
+    """Change relative to the value `periods` rows before, within each location"""
+    previous = np.full(len(values), np.nan)
+    has_previous = position >= periods
+    previous[has_previous] = values[np.flatnonzero(has_previous) - periods]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return values / previous - 1
+
+
 # ===================================
 # OWID continents + custom aggregates
 # ===================================
@@ -145,29 +192,43 @@ aggregates_spec = {
 }
 
 
-def _sum_aggregate(df, name, include=None, exclude=None):
-    df = df.copy()
-    if include:
-        df = df[df["location"].isin(include)]
-    if exclude:
-        df = df[~df["location"].isin(exclude)]
-    df = df.groupby("date").sum().reset_index()
-    df["location"] = name
-    return df
+def _membership_matrix(locations, spec):
+    """Returns a boolean (location x aggregate) matrix, True if the location is part of
+    the aggregate"""
+    membership = np.ones((len(locations), len(spec)), dtype=bool)
+    for i, params in enumerate(spec.values()):
+        if params.get("include"):
+            membership[:, i] &= locations.isin(params["include"])
+        if params.get("exclude"):
+            membership[:, i] &= ~locations.isin(params["exclude"])
+    return membership
 
 
 def inject_owid_aggregates(df):
-    return pd.concat(
-        [
-            df,
-            *[
-                _sum_aggregate(df, name, **params)
-                for name, params in aggregates_spec.items()
-            ],
-        ],
-        sort=True,
-        ignore_index=True,
-    )
+    """Adds the aggregates in aggregates_spec, summing the numeric columns of their
+    locations by date (missing values count as zero).
+
+    All aggregates are computed at once: each column is laid out as a (date x location)
+    matrix and multiplied by the (location x aggregate) membership matrix. An aggregate
+    has a row for each date with a row for any of its locations.
+    """
+    value_cols = df.select_dtypes("number").columns
+    date_idx, dates = pd.factorize(df["date"], sort=True)
+    location_idx, locations = pd.factorize(df["location"])
+    cell = date_idx * len(locations) + location_idx
+    shape = (len(dates), len(locations))
+    membership = _membership_matrix(locations, aggregates_spec)
+    reported = np.bincount(cell, minlength=shape[0] * shape[1]).reshape(shape)
+    agg_idx, agg_date_idx = np.nonzero((reported @ membership).T)
+    aggregates = {"date": dates[agg_date_idx]}
+    for col in value_cols:
+        values = np.bincount(
+            cell, weights=df[col].fillna(0), minlength=shape[0] * shape[1]
+        ).reshape(shape)
+        aggregates[col] = (values @ membership)[agg_date_idx, agg_idx]
+    aggregates["location"] = np.array(list(aggregates_spec))[agg_idx]
+    aggregates = pd.DataFrame(aggregates).astype(df[value_cols].dtypes.to_dict())
+    return pd.concat([df, aggregates], sort=True, ignore_index=True)
 
 
 # =======================
@@ -266,42 +327,41 @@ days_since_spec = {
 }
 
 
-def _get_date_of_threshold(df, col, threshold):
-    try:
-        return df["date"][df[col] >= threshold].iloc[0]
-    except:
-        return None
-
-
-def _date_diff(a, b, positive_only=False):
-    if pd.isnull(a) or pd.isnull(b):
-        return None
-    diff = (a - b).days
-    if positive_only and diff < 0:
-        return None
-    return diff
-
+def inject_days_since(df):
+    """Injects all `days_since_spec` columns at once.
 
-def _days_since(df, spec):
-    ref_date = pd.to_datetime(
-        _get_date_of_threshold(df, spec["value_col"], spec["value_threshold"])
-    )
-    return (
-        pd.to_datetime(df["date"])
-        .map(lambda date: _date_diff(date, ref_date, spec["positive_only"]))
-        .astype("Int64")
+    For every location and spec, the reference date is the first row (in frame order) where the
+    value reaches the threshold; days since are then plain integer day differences.
+    """
+    df = df.copy()
+    codes, _ = pd.factorize(df["location"])
+    has_location = codes >= 0
+    days = pd.to_datetime(df["date"]).to_numpy().astype("datetime64[D]")
+    days = np.where(np.isnat(days), np.nan, days.astype(np.int64))
+
+    reached = pd.DataFrame(
+        {
+            col: (df[spec["value_col"]] >= spec["value_threshold"])
+            .fillna(False)
+            .to_numpy(dtype=bool)
+            for col, spec in days_since_spec.items()
+        }
+    )[has_location]
+    grouped = reached.groupby(codes[has_location])
+    # Day of the first row reaching the threshold, for each (location, spec)
+    ref_days = np.where(
+        grouped.any().to_numpy(), days[grouped.idxmax().to_numpy()], np.nan
     )
 
+    ref_days_by_row = np.full((len(df), len(days_since_spec)), np.nan)
+    ref_days_by_row[has_location] = ref_days[codes[has_location]]
+    days_since = days[:, np.newaxis] - ref_days_by_row
 
-def inject_days_since(df):
-    df = df.copy()
-    for col, spec in days_since_spec.items():
-        df[col] = (
-            df[["date", "location", spec["value_col"]]]
-            .groupby("location")
-            .apply(lambda df_group: _days_since(df_group, spec))
-            .reset_index(level=0, drop=True)
-        )
+    for i, (col, spec) in enumerate(days_since_spec.items()):
+        values = days_since[:, i]
+        if spec["positive_only"]:
+            values = np.where(values < 0, np.nan, values)
+        df[col] = pd.Series(values, index=df.index).astype("Int64")
     return df
 
 
@@ -310,16 +370,10 @@ def inject_days_since(df):
 # ===================
 
 
-def _apply_row_cfr_100(row):
-    if pd.notnull(row["total_cases"]) and row["total_cases"] >= 100:
-        return row["cfr"]
-    return pd.NA
-
-
 def inject_cfr(df):
     cfr_series = (df["total_deaths"] / df["total_cases"]) * 100
     df["cfr"] = cfr_series.round(decimals=3)
-    df["cfr_100_cases"] = df.apply(_apply_row_cfr_100, axis=1)
+    df["cfr_100_cases"] = df["cfr"].where(df["total_cases"] >= 100)
 
     shifted_cases = (
         df.sort_values("date").groupby("location")["new_cases_7_day_avg_right"].shift(9)
@@ -346,76 +400,64 @@ def inject_cfr(df):
 # Rolling averages
 # ================
 
+# Windows are right-aligned
 rolling_avg_spec = {
     "new_cases_3_day_avg_right": {
         "col": "new_cases",
         "window": 3,
         "min_periods": 1,
-        "center": False,
     },
     "new_deaths_3_day_avg_right": {
         "col": "new_deaths",
         "window": 3,
         "min_periods": 1,
-        "center": False,
     },
     "new_cases_7_day_avg_right": {
         "col": "new_cases",
         "window": 7,
         "min_periods": 3,
-        "center": False,
     },
     "new_deaths_7_day_avg_right": {
         "col": "new_deaths",
         "window": 7,
         "min_periods": 3,
-        "center": False,
     },
     "new_cases_per_million_3_day_avg_right": {
         "col": "new_cases_per_million",
         "window": 3,
         "min_periods": 1,
-        "center": False,
     },
     "new_deaths_per_million_3_day_avg_right": {
         "col": "new_deaths_per_million",
         "window": 3,
         "min_periods": 1,
-        "center": False,
     },
     "new_cases_per_million_7_day_avg_right": {
         "col": "new_cases_per_million",
         "window": 7,
         "min_periods": 3,
-        "center": False,
     },
     "new_deaths_per_million_7_day_avg_right": {
         "col": "new_deaths_per_million",
         "window": 7,
         "min_periods": 3,
-        "center": False,
     },
 }
 
 
-def inject_rolling_avg(df):
-    df = df.copy().sort_values(by="date")
+def _inject_rolling_avg(df, position):
     for col, spec in rolling_avg_spec.items():
-        df[col] = df[spec["col"]].astype("float")
-        df[col] = (
-            df.groupby("location")[col]
-            .rolling(
-                window=spec["window"],
-                min_periods=spec["min_periods"],
-                center=spec["center"],
-            )
-            .mean()
-            .round(decimals=5)
-            .reset_index(level=0, drop=True)
-        )
+        values = df[spec["col"]].astype("float").to_numpy()
+        mean = _rolling_mean(values, position, spec["window"], spec["min_periods"])
+        # Adding zero turns -0.0 (means of ~0 with rounding noise) into 0.0
+        df[col] = pd.Series(mean, index=df.index).round(decimals=5) + 0.0
     return df
 
 
+def inject_rolling_avg(df):
+    return _inject_rolling_avg(*_sort_by_location(df))
+
+
 # ===========================
 # Variables to find exemplars
 # ===========================
@@ -425,29 +467,20 @@ def inject_exemplars(df):
     df = inject_population(df)
 
     # Inject days since 100th case IF population ≥ 5M
-    def mapper_days_since(row):
-        if pd.notnull(row["population"]) and row["population"] >= 5e6:
-            return row["days_since_100_total_cases"]
-        return pd.NA
-
-    df["days_since_100_total_cases_and_5m_pop"] = df.apply(mapper_days_since, axis=1)
+    has_5m_pop = df["population"] >= 5e6
+    df["days_since_100_total_cases_and_5m_pop"] = df[
+        "days_since_100_total_cases"
+    ].where(has_5m_pop)
 
     # Inject boolean when all exenplar conditions hold
     # Use int because the Grapher doesn't handle non-ints very well
     countries_with_testing_data = set(megafile.get_testing()["location"])
 
-    def mapper_bool(row):
-        if (
-            pd.notnull(row["days_since_100_total_cases"])
-            and pd.notnull(row["population"])
-            and row["days_since_100_total_cases"] >= 21
-            and row["population"] >= 5e6
-            and row["location"] in countries_with_testing_data
-        ):
-            return 1
-        return 0
-
-    df["5m_pop_and_21_days_since_100_cases_and_testing"] = df.apply(mapper_bool, axis=1)
+    df["5m_pop_and_21_days_since_100_cases_and_testing"] = (
+        (df["days_since_100_total_cases"] >= 21).fillna(False)
+        & has_5m_pop
+        & df["location"].isin(countries_with_testing_data)
+    ).astype(int)
 
     return drop_population(df)
 
@@ -477,61 +510,80 @@ doubling_days_spec = {
 
 
 def pct_change_to_doubling_days(pct_change, periods):
-    if pd.notnull(pct_change) and pct_change != 0:
+    # Scalars are still accepted (NA if the change is null or zero), as the row-wise
+    # helper used to be public
+    if np.ndim(pct_change) == 0:
+        if pd.notnull(pct_change) and pct_change != 0:
+            doubling_days = periods * np.log(2) / np.log(1 + pct_change)
+            return np.round(doubling_days, decimals=2)
+        return pd.NA
+    pct_change = pct_change.where(pct_change != 0)
+    with np.errstate(divide="ignore"):
         doubling_days = periods * np.log(2) / np.log(1 + pct_change)
-        return np.round(doubling_days, decimals=2)
-    return pd.NA
+    return doubling_days.round(decimals=2)
 
 
-def inject_doubling_days(df):
+def _inject_doubling_days(df, position):
     for col, spec in doubling_days_spec.items():
         value_col = spec["value_col"]
         periods = spec["periods"]
         df.loc[df[value_col] == 0, value_col] = np.nan
-        df[col] = (
-            df.groupby("location", as_index=False)[value_col]
-            .pct_change(periods=periods, fill_method=None)[value_col]
-            .map(lambda pct: pct_change_to_doubling_days(pct, periods))
-        )
+        values = df[value_col].astype("float").to_numpy()
+        df[col] = pd.Series(
+            _pct_change(values, position, periods), index=df.index
+        ).pipe(pct_change_to_doubling_days, periods)
     return df
 
 
+def inject_doubling_days(df):
+    return _inject_doubling_days(*_sort_by_location(df))
+
+
 # ====================================
 # Weekly & biweekly growth calculation
 # ====================================
 
 
-def _inject_growth(df, prefix, periods):
-    cases_colname = "%s_cases" % prefix
-    deaths_colname = "%s_deaths" % prefix
-    cases_growth_colname = "%s_pct_growth_cases" % prefix
-    deaths_growth_colname = "%s_pct_growth_deaths" % prefix
-
-    df[[cases_colname, deaths_colname]] = (
-        df[["location", "new_cases", "new_deaths"]]
-        .fillna(0)
-        .groupby("location")[["new_cases", "new_deaths"]]
-        .rolling(window=periods, min_periods=periods, center=False)
-        .sum()
-        .reset_index(level=0, drop=True)
-    )
-    df[[cases_growth_colname, deaths_growth_colname]] = (
-        df[["location", cases_colname, deaths_colname]]
-        .groupby("location")[[cases_colname, deaths_colname]]
-        .pct_change(periods=periods, fill_method=None)
-        .replace([np.inf, -np.inf], pd.NA)
-        * 100
-    )
-
+def _inject_growth(df, position, prefix, periods):
+    measures = ["cases", "deaths"]
+    for measure in measures:
+        values = df["new_%s" % measure].fillna(0).astype("float").to_numpy()
+        total, _ = _rolling_sum(values, position, periods)
+        df["%s_%s" % (prefix, measure)] = np.where(
+            position >= periods - 1, total, np.nan
+        )
+    for measure in measures:
+        total = df["%s_%s" % (prefix, measure)].to_numpy()
+        pct_change = _pct_change(total, position, periods)
+        df["%s_pct_growth_%s" % (prefix, measure)] = (
+            np.where(np.isinf(pct_change), np.nan, pct_change) * 100
+        )
     return df
 
 
 def inject_weekly_growth(df):
-    return _inject_growth(df, "weekly", 7)
+    return _inject_growth(*_sort_by_location(df), "weekly", 7)
 
 
 def inject_biweekly_growth(df):
-    return _inject_growth(df, "biweekly", 14)
+    return _inject_growth(*_sort_by_location(df), "biweekly", 14)
+
+
+def inject_rolling_metrics(df, per_million_measures):
+    """Inject weekly and biweekly growth, doubling days, per million measures and
+    rolling averages.
+
+    Same as inject_weekly_growth, inject_biweekly_growth, inject_doubling_days,
+    inject_per_million and inject_rolling_avg in this order, but rows are sorted and
+    locations delimited only once for all of them.
+    """
+    df, position = _sort_by_location(df)
+    df = _inject_growth(df, position, "weekly", 7)
+    df = _inject_growth(df, position, "biweekly", 14)
+    df = _inject_doubling_days(df, position)
+    # Left merge, row order is kept
+    df = inject_per_million(df, per_million_measures)
+    return _inject_rolling_avg(df, position)
 
 
 # ============
@@ -631,16 +683,39 @@ def existsin(l1, l2):
     return [x for x in l1 if x in l2]
 
 
-def standard_export(df, output_path, grapher_name):
+def _wide_measures(df, measures):
+    """Returns the (measure x date x location) array of `measures`, with its dates and
+    locations (both sorted)"""
+    if df.duplicated(subset=KEYS).any():
+        raise ValueError("Index contains duplicate entries, cannot reshape")
+    date_idx, dates = pd.factorize(df["date"], sort=True)
+    location_idx, locations = pd.factorize(df["location"], sort=True)
+    values = np.full((len(measures), len(dates), len(locations)), np.nan)
+    values[:, date_idx, location_idx] = df[measures].to_numpy(dtype=float).T
+    return values, dates, locations
+
+
+def _write_csv(df, path, index):
+    df.to_csv(path, index=index)
+
+
+def standard_export(df, output_path, grapher_name, parallel=False):
+    """
+    Writes the grapher file, full_data.csv and a wide CSV (date x location) for each
+    of the base and per-million measures.
+
+    Args:
+        df (pd.DataFrame): Standardized dataset, see e.g. `jhu.load_standardized`.
+        output_path (str): Directory where the CSVs are written.
+        grapher_name (str): Name of the grapher file.
+        parallel (bool): Write the CSVs concurrently, in a process pool.
+    """
+    exports = []
     # Grapher
-    df_grapher = df.copy()
-    df_grapher["date"] = pd.to_datetime(df_grapher["date"]).map(
-        lambda date: (date - zero_day).days
-    )
-    df_grapher = (
-        df_grapher[GRAPHER_COL_NAMES.keys()]
-        .rename(columns=GRAPHER_COL_NAMES)
-        .to_csv(os.path.join(output_path, "%s.csv" % grapher_name), index=False)
+    df_grapher = df[GRAPHER_COL_NAMES.keys()].rename(columns=GRAPHER_COL_NAMES)
+    df_grapher["Year"] = (pd.to_datetime(df_grapher["Year"]) - zero_day).dt.days
+    exports.append(
+        (df_grapher, os.path.join(output_path, "%s.csv" % grapher_name), False)
     )
 
     # Table & public extracts for external users
@@ -663,14 +738,33 @@ def standard_export(df, output_path, grapher_name):
     df_table = df[~df["location"].isin(excluded_aggregates)]
     # full_data.csv
     full_data_cols = existsin(FULL_DATA_COLS, df_table.columns)
-    df_table[full_data_cols].dropna(subset=BASE_MEASURES, how="all").to_csv(
-        os.path.join(output_path, "full_data.csv"), index=False
+    exports.append(
+        (
+            df_table[full_data_cols].dropna(subset=BASE_MEASURES, how="all"),
+            os.path.join(output_path, "full_data.csv"),
+            False,
+        )
     )
-    # Pivot variables (wide format)
-    for col_name in [*BASE_MEASURES, *PER_MILLION_MEASURES]:
-        df_pivot = df_table.pivot(index="date", columns="location", values=col_name)
-        # move World to first column
-        cols = df_pivot.columns.tolist()
-        cols.insert(0, cols.pop(cols.index("World")))
-        df_pivot[cols].to_csv(os.path.join(output_path, "%s.csv" % col_name))
+    # Pivot variables (wide format), all at once
+    measures = [*BASE_MEASURES, *PER_MILLION_MEASURES]
+    values, dates, locations = _wide_measures(df_table, measures)
+    # move World to first column
+    order = np.argsort(locations != "World", kind="stable")
+    dates = pd.Index(dates, name="date")
+    locations = pd.Index(locations[order], name="location")
+    for col_name, col_values in zip(measures, values[:, :, order]):
+        exports.append(
+            (
+                pd.DataFrame(col_values, index=dates, columns=locations),
+                os.path.join(output_path, "%s.csv" % col_name),
+                True,
+            )
+        )
+
+    if parallel:
+        with ProcessPoolExecutor() as executor:
+            list(executor.map(_write_csv, *zip(*exports)))
+    else:
+        for export in exports:
+            _write_csv(*export)
     return True
@@ -16,4 +16,6 @@ def connection():
         password=os.getenv("DB_PASS"),
         charset="utf8mb4",
         autocommit=False,
+        # Needed to bulk load data_values with LOAD DATA LOCAL INFILE
+        local_infile=bool(os.getenv("DB_LOAD_DATA_INFILE")),
     )  # requires .commit(), so everything is implicitly a transaction
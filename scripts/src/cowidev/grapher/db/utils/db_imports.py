@@ -7,6 +7,7 @@ Update vaccination by age data.
 
 import sys
 import os
+import numpy as np
 import pandas as pd
 
 import json
@@ -28,6 +29,14 @@ NAMESPACE = "owid"
 
 DEPLOY_QUEUE_PATH = os.getenv("DEPLOY_QUEUE_PATH")
 
+# Bulk load data_values with LOAD DATA LOCAL INFILE (the server must allow `local_infile`)
+LOAD_DATA_INFILE = bool(os.getenv("DB_LOAD_DATA_INFILE"))
+
+# Only write the data_values that changed since the last import, instead of replacing them all
+DIFF_IMPORT = bool(os.getenv("DB_DIFF_IMPORT"))
+
+DATA_VALUES_KEY = ["variableId", "entityId", "year"]
+
 
 def print_err(*args, **kwargs):
     return print(*args, file=sys.stderr, **kwargs)
@@ -43,6 +52,141 @@ tz_utc = tz_db = timezone.utc
 tz_local = datetime.now(tz_utc).astimezone().tzinfo
 
 
+def format_data_values(values):
+    """Formats values as the text stored in data_values.
+
+    Floats are rendered with "%.15g", as pymysql does, so that e.g. `12.0` is stored as
+    `12` by both the INSERT and the LOAD DATA paths.
+    """
+    if pd.api.types.is_float_dtype(values):
+        return pd.Series(
+            np.char.mod("%.15g", values.to_numpy()), index=values.index, dtype=object
+        )
+    return values.map(lambda v: "%.15g" % v if isinstance(v, float) else str(v))
+
+
+def get_data_values(
+    df, id_names, variable_names, entity_id_by_name, variable_id_by_name
+):
+    """Reshapes a grapher dataset into data_values rows (value, year, entityId, variableId).
+
+    Values are formatted with `format_data_values`. Raises KeyError if an entity or a
+    variable has no id.
+    """
+    df_data_values = df.melt(
+        id_vars=id_names,
+        value_vars=variable_names,
+        var_name="variable",
+        value_name="value",
+    ).dropna(how="any")
+    entity_ids = df_data_values["Country"].map(entity_id_by_name)
+    variable_ids = df_data_values["variable"].map(variable_id_by_name)
+    for kind, ids, names in [
+        ("entities", entity_ids, df_data_values["Country"]),
+        ("variables", variable_ids, df_data_values["variable"]),
+    ]:
+        if ids.isna().any():
+            raise KeyError(f"No id for {kind}: {sorted(names[ids.isna()].unique())}")
+    return pd.DataFrame(
+        {
+            "value": format_data_values(df_data_values["value"]),
+            "year": df_data_values["Year"].astype(int),
+            "entityId": entity_ids.astype(int),
+            "variableId": variable_ids.astype(int),
+        }
+    )
+
+
+def _data_values_rows(df_data_values):
+    return list(
+        zip(
+            df_data_values["value"].tolist(),
+            df_data_values["year"].tolist(),
+            df_data_values["entityId"].tolist(),
+            df_data_values["variableId"].tolist(),
+        )
+    )
+
+
+def insert_data_values(db, df_data_values, chunk_size=50000):
+    """Inserts data_values rows.
+
+    Uses LOAD DATA LOCAL INFILE if ${DB_LOAD_DATA_INFILE} is set, and multi-row INSERT statements otherwise.
+    """
+    if LOAD_DATA_INFILE:
+        db.load_data_infile("data_values", df_data_values)
+        return
+    for df_chunk in chunk_df(df_data_values, chunk_size):
+        db.upsert_many(
+            """
+            INSERT INTO
+                data_values (value, year, entityId, variableId)
+            VALUES
+                (%s, %s, %s, %s)
+        """,
+            _data_values_rows(df_chunk),
+        )
+
+
+def get_current_data_values(db, variable_ids):
+    """Fetches the data_values rows currently stored for the given variables."""
+    rows = db.fetch_many(
+        """
+        SELECT value, year, entityId, variableId
+        FROM data_values
+        WHERE variableId IN %s
+    """,
+        [tuple(variable_ids)],
+    )
+    return pd.DataFrame(list(rows), columns=["value", "year", "entityId", "variableId"])
+
+
+def get_data_values_delta(df_current, df_new):
+    """Compares stored data_values with the new ones.
+
+    Returns the rows to insert or update and the keys (variableId, entityId, year) to delete. Values
+    are stored as text formatted by `format_data_values`, so they are compared as text: any revision
+    that changes the stored text is written.
+    """
+    df = df_current.merge(
+        df_new,
+        on=DATA_VALUES_KEY,
+        how="outer",
+        suffixes=("_current", ""),
+        indicator=True,
+    )
+    unchanged = df["value_current"].astype(str) == df["value"].astype(str)
+    in_current = df["_merge"] != "right_only"
+    in_new = df["_merge"] != "left_only"
+    df_upsert = df.loc[in_new & ~(in_current & unchanged), df_new.columns]
+    df_delete = df.loc[~in_new, DATA_VALUES_KEY]
+    return df_upsert, df_delete
+
+
+def apply_data_values_delta(db, df_upsert, df_delete, chunk_size=50000):
+    """Deletes and upserts data_values rows, relying on the unique (variableId, entityId, year) key."""
+    for df_chunk in chunk_df(df_delete, chunk_size):
+        db.execute(
+            """
+            DELETE FROM data_values
+            WHERE (variableId, entityId, year) IN %s
+        """,
+            [list(df_chunk.itertuples(index=False, name=None))],
+        )
+    for df_chunk in chunk_df(df_upsert, chunk_size):
+        db.upsert_many(
+            """
+            INSERT INTO
+                data_values (value, year, entityId, variableId)
+            VALUES
+                (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                value = VALUES(value)
+        """,
+            _data_values_rows(df_chunk),
+        )
+
+
 def import_dataset(
     dataset_name,
     namespace,
@@ -52,7 +196,13 @@ def import_dataset(
     slack_notifications=True,
     unit="",
     unit_short=None,
+    differential=DIFF_IMPORT,
 ):
+    """Imports a grapher CSV into the database.
+
+    With `differential`, only the data_values that changed since the last import are written
+    (defaults to ${DB_DIFF_IMPORT}); otherwise all data_values in the dataset are replaced.
+    """
     print(dataset_name.upper())
     with connection() as c:
         db = DBUtils(c)
@@ -180,49 +330,42 @@ def import_dataset(
                     display=default_variable_display,
                 )
 
-        # Delete all data_values in dataset
+        df_data_values = get_data_values(
+            df, id_names, variable_names, db_entity_id_by_name, db_variable_id_by_name
+        )
 
-        print("Deleting all data_values...")
+        if differential:
+            # Write only the data_values that changed
 
-        db.execute(
-            """
-            DELETE FROM data_values
-            WHERE variableId IN %s
-        """,
-            [tuple(db_variable_id_by_name.values())],
-        )
+            print("Comparing data_values...")
 
-        # Insert new data_values
+            df_current = get_current_data_values(db, db_variable_id_by_name.values())
+            df_upsert, df_delete = get_data_values_delta(df_current, df_data_values)
 
-        print("Inserting new data_values...")
+            print(
+                f"Upserting {len(df_upsert)} and deleting {len(df_delete)} data_values..."
+            )
 
-        df_data_values = df.melt(
-            id_vars=id_names,
-            value_vars=variable_names,
-            var_name="variable",
-            value_name="value",
-        ).dropna(how="any")
+            apply_data_values_delta(db, df_upsert, df_delete)
+        else:
+            # Delete all data_values in dataset
 
-        for df_chunk in chunk_df(df_data_values, 50000):
-            data_values = [
-                (
-                    row["value"],
-                    int(row["Year"]),
-                    db_entity_id_by_name[row["Country"]],
-                    db_variable_id_by_name[row["variable"]],
-                )
-                for _, row in df_chunk.iterrows()
-            ]
-            db.upsert_many(
+            print("Deleting all data_values...")
+
+            db.execute(
                 """
-                INSERT INTO
-                    data_values (value, year, entityId, variableId)
-                VALUES
-                    (%s, %s, %s, %s)
+                DELETE FROM data_values
+                WHERE variableId IN %s
             """,
-                data_values,
+                [tuple(db_variable_id_by_name.values())],
             )
 
+            # Insert new data_values
+
+            print("Inserting new data_values...")
+
+            insert_data_values(db, df_data_values)
+
         # Update dataset dataUpdatedAt time & dataUpdatedBy
 
         db.execute(
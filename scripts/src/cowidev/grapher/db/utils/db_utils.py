@@ -2,6 +2,7 @@
 # At some point in the future we should turn it into a package.
 
 import json
+import tempfile
 import time
 from unidecode import unidecode
 
@@ -82,8 +83,29 @@ class DBUtils:
         return None
 
     def upsert_many(self, query, tuples):
+        # For INSERT ... VALUES queries, pymysql sends multi-row statements (up to 1MB each)
         self.cursor.executemany(query, tuples)
 
+    def load_data_infile(self, table, df):
+        """Bulk loads a dataframe into `table` with LOAD DATA LOCAL INFILE.
+
+        Columns in `df` must be named as in `table`. NA values are loaded as NULL. The
+        connection must be created with `local_infile=True`.
+        """
+        with tempfile.NamedTemporaryFile("w", suffix=".tsv") as f:
+            df.to_csv(f, sep="\t", header=False, index=False, na_rep="\\N")
+            f.flush()
+            self.cursor.execute(
+                f"""
+                LOAD DATA LOCAL INFILE %s
+                INTO TABLE {table}
+                FIELDS TERMINATED BY '\\t'
+                LINES TERMINATED BY '\\n'
+                ({", ".join(df.columns)})
+            """,
+                [f.name],
+            )
+
     def execute_until_empty(self, *args, **kwargs):
         first = True
         while first or self.cursor.rowcount > 0:
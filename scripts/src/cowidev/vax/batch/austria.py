@@ -2,6 +2,8 @@ import re
 
 import pandas as pd
 
+from cowidev.vax.utils import web
+
 
 vaccine_mapping = {
     "BioNTechPfizer": "Pfizer/BioNTech",
@@ -12,7 +14,7 @@ vaccine_mapping = {
 
 
 def read(source: str) -> pd.DataFrame:
-    return pd.read_csv(source, sep=";")
+    return web.read_csv_from_url(source, sep=";")
 
 
 def filter_country(df: pd.DataFrame) -> pd.DataFrame:
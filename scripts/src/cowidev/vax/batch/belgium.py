@@ -1,5 +1,7 @@
 import pandas as pd
 
+from cowidev.vax.utils import web
+
 
 class Belgium:
     def __init__(self) -> None:
@@ -8,7 +10,7 @@ class Belgium:
         self.source_url_ref = "https://epistat.wiv-isp.be/covid/"
 
     def read(self) -> pd.DataFrame:
-        return pd.read_csv(self.source_url, usecols=["DATE", "DOSE", "COUNT"])
+        return web.read_csv_from_url(self.source_url, usecols=["DATE", "DOSE", "COUNT"])
 
     def pipe_dose_check(self, df: pd.DataFrame) -> pd.DataFrame:
         doses_wrong = set(df.DOSE).difference(["A", "B", "C"])
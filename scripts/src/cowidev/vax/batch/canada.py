@@ -1,10 +1,10 @@
-import requests
-
 import pandas as pd
 
+from cowidev.vax.utils import web
+
 
 def read(source: str) -> pd.DataFrame:
-    data = requests.get(source).json()
+    data = web.get(source).json()
     return pd.DataFrame.from_records(data["data"])
 
 
@@ -1,6 +1,7 @@
 import pandas as pd
 
 from cowidev.vax.utils.files import export_metadata
+from cowidev.vax.utils import web
 
 
 vaccine_mapping = {
@@ -24,7 +25,7 @@ class Chile:
 
     # Generalized methods
     def read(self, url: str) -> pd.DataFrame:
-        return pd.read_csv(url)
+        return web.read_csv_from_url(url)
 
     def pipe_melt(self, df: pd.DataFrame, id_vars: list) -> pd.DataFrame:
         return df.melt(id_vars, var_name="date", value_name="value")
@@ -6,6 +6,7 @@ manufacturers were added, so that we can maintain control over this.
 import pandas as pd
 
 from cowidev.vax.utils.files import export_metadata
+from cowidev.vax.utils import web
 
 
 vaccine_mapping = {
@@ -19,7 +20,7 @@ one_dose_vaccines = ["Johnson&Johnson"]
 
 
 def read(source: str) -> pd.DataFrame:
-    return pd.read_csv(source, parse_dates=["datum"])
+    return web.read_csv_from_url(source, parse_dates=["datum"])
 
 
 def check_columns(df: pd.DataFrame) -> pd.DataFrame:
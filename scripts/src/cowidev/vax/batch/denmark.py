@@ -4,12 +4,12 @@ import os
 import tempfile
 from datetime import datetime
 
-import requests
 import pandas as pd
 
 from cowidev.vax.utils.checks import VACCINES_ONE_DOSE
 from cowidev.vax.utils.utils import get_soup
 from cowidev.vax.utils.dates import clean_date_series
+from cowidev.vax.utils import web
 
 
 SEPARATOR = ";"
@@ -61,7 +61,7 @@ class Denmark:
         return url
 
     def _download_data(self, url, output_path):
-        r = requests.get(url)
+        r = web.get(url)
         z = zipfile.ZipFile(io.BytesIO(r.content))
         z.extractall(output_path)
 
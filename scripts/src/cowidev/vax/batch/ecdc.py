@@ -1,9 +1,16 @@
 import os
+from io import BytesIO
 
 import pandas as pd
 
 from cowidev.vax.utils.dates import clean_date, localdate
 from cowidev.vax.utils.files import export_metadata
+from cowidev.vax.utils.web import HTTPCache, file_fingerprint
+from cowidev.vax.utils import web
+from cowidev.vax.cmd.utils import get_logger
+
+
+logger = get_logger()
 
 
 age_groups_known = {
@@ -77,6 +84,7 @@ class ECDC:
             "https://opendata.ecdc.europa.eu/covid19/vaccine_tracker/csv/data.csv"
         )
         self.source_url_ref = "https://www.ecdc.europa.eu/en/publications-data/data-covid-19-vaccination-eu-eea"
+        self.iso_path = iso_path
         self.country_mapping = self._load_country_mapping(iso_path)
         self.vaccine_mapping = {
             "COM": "Pfizer/BioNTech",
@@ -88,8 +96,10 @@ class ECDC:
             "UNK": "Unknown",
         }
 
-    def read(self):
-        return pd.read_csv(self.source_url)
+    def read(self, content: bytes = None):
+        if content is None:
+            return web.read_csv_from_url(self.source_url)
+        return pd.read_csv(BytesIO(content))
 
     def _load_country_mapping(self, iso_path: str):
         country_mapping = pd.read_csv(iso_path)
@@ -345,6 +355,7 @@ class ECDC:
         )
 
     def export_age(self, paths, df: pd.DataFrame):
+        """Export age data, return paths of the files written."""
         df_age = df.pipe(self.pipeline_age)
         # Export
         locations = df_age.location.unique()
@@ -363,8 +374,12 @@ class ECDC:
                 ],
             )
         self._export_metadata(df_age, paths.tmp_vax_metadata_age)
+        return [paths.tmp_vax_out_by_age_group(location) for location in locations] + [
+            paths.tmp_vax_metadata_age
+        ]
 
     def export_manufacturer(self, paths, df: pd.DataFrame):
+        """Export manufacturer data, return paths of the files written."""
         df_manufacuter = df.pipe(self.pipeline_manufacturer)
         # Export
         locations = df_manufacuter.location.unique()
@@ -376,6 +391,9 @@ class ECDC:
                 columns=["location", "date", "vaccine", "total_vaccinations"],
             )
         self._export_metadata(df_manufacuter, paths.tmp_vax_metadata_man)
+        return [paths.tmp_vax_out_man(location) for location in locations] + [
+            paths.tmp_vax_metadata_man
+        ]
 
     def _export_metadata(self, df, output_path):
         export_metadata(
@@ -386,12 +404,20 @@ class ECDC:
         )
 
     def export(self, paths):
-        # Read data
-        df = self.read().pipe(self.pipe_base)
+        # Read data (skip if source and code unchanged since last successful export, and
+        # outputs still exist)
+        cache = HTTPCache(paths.tmp_http_cache)
+        fingerprint = file_fingerprint(__file__, self.iso_path)
+        response = cache.get(self.source_url, fingerprint=fingerprint)
+        if response.unchanged:
+            logger.info("vax.batch.ecdc: source not modified, skipping")
+            return
+        df = self.read(response.content).pipe(self.pipe_base)
         # Age
-        self.export_age(paths, df)
+        outputs = self.export_age(paths, df)
         # Manufacturer
-        self.export_manufacturer(paths, df)
+        outputs += self.export_manufacturer(paths, df)
+        cache.mark_processed(self.source_url, fingerprint=fingerprint, outputs=outputs)
 
 
 def main(paths):
@@ -1,6 +1,7 @@
 import pandas as pd
 
 from cowidev.vax.utils.dates import clean_date_series
+from cowidev.vax.utils import web
 
 
 class Ecuador:
@@ -18,7 +19,7 @@ class Ecuador:
 
     def read(self) -> pd.DataFrame:
         url = f"{self.source_url}/raw/master/datos_crudos/vacunas/vacunas.csv"
-        return pd.read_csv(url)
+        return web.read_csv_from_url(url)
 
     def check_columns(self, df: pd.DataFrame, expected) -> pd.DataFrame:
         n_columns = df.shape[1]
@@ -1,6 +1,5 @@
-import pandas as pd
-
 from cowidev.vax.utils.files import export_metadata
+from cowidev.vax.utils import web
 
 
 def main(paths):
@@ -17,7 +16,7 @@ def main(paths):
         "https://www.data.gouv.fr/fr/datasets/r/b273cf3b-e9de-437c-af55-eda5979e92fc"
     )
 
-    df = pd.read_csv(
+    df = web.read_csv_from_url(
         source, usecols=["vaccin", "jour", "n_cum_dose1", "n_cum_dose2"], sep=";"
     )
 
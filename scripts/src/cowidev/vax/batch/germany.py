@@ -4,6 +4,7 @@ from typing import Dict
 import pandas as pd
 
 from cowidev.vax.utils.files import export_metadata
+from cowidev.vax.utils import web
 
 
 class Germany:
@@ -23,7 +24,7 @@ class Germany:
         self.regex_doses_colnames = r"dosen_([a-zA-Z]*)_kumulativ"
 
     def read(self):
-        return pd.read_csv(self.source_url, sep="\t")
+        return web.read_csv_from_url(self.source_url, sep="\t")
 
     def _check_vaccines(self, df: pd.DataFrame):
         """Get vaccine columns mapped to Vaccine names."""
@@ -1,8 +1,8 @@
-import requests
 from functools import reduce
 import pandas as pd
 
 from cowidev.vax.utils.dates import clean_date_series
+from cowidev.vax.utils import web
 
 
 class Greece:
@@ -19,7 +19,7 @@ class Greece:
         self.location = location
 
     def read(self) -> pd.DataFrame:
-        data = requests.get(self.source_url).json()
+        data = web.get(self.source_url).json()
         return self.parse_data(data)
 
     def parse_data(self, data: dict):
@@ -1,10 +1,10 @@
 import datetime
 import json
 
-import requests
 import pandas as pd
 
 from cowidev.vax.utils.pipeline import enrich_total_vaccinations
+from cowidev.vax.utils import web
 
 
 def read(source: str) -> pd.DataFrame:
@@ -16,7 +16,7 @@ def read(source: str) -> pd.DataFrame:
         "Pragma": "no-cache",
         "Cache-Control": "no-cache",
     }
-    data = json.loads(requests.get(source, headers=headers).content)
+    data = json.loads(web.get(source, headers=headers).content)
     return pd.DataFrame.from_records(data)
 
 
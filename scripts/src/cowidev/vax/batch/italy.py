@@ -1,6 +1,7 @@
 import pandas as pd
 
 from cowidev.vax.utils.files import export_metadata
+from cowidev.vax.utils import web
 
 LOCATION = "Italy"
 SOURCE_URL = (
@@ -38,7 +39,7 @@ class Italy:
         self.vax_date_mapping = None
 
     def read(self):
-        df = pd.read_csv(
+        df = web.read_csv_from_url(
             self.source_url,
             usecols=[
                 "data_somministrazione",
@@ -1,10 +1,10 @@
-import requests
 import tempfile
 import re
 
 import pandas as pd
 
 from cowidev.vax.utils.files import export_metadata
+from cowidev.vax.utils import web
 
 
 class Jersey:
@@ -30,7 +30,7 @@ class Jersey:
     def read(self):
         with tempfile.NamedTemporaryFile() as tf:
             with open(tf.name, mode="wb") as f:
-                f.write(requests.get(self.source_url).content)
+                f.write(web.get(self.source_url).content)
             return pd.read_csv(tf.name)
 
     def pipe_select_columns(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -1,9 +1,9 @@
 import json
 
-import requests
 import pandas as pd
 
 from cowidev.vax.utils.files import export_metadata
+from cowidev.vax.utils import web
 
 
 def main(paths):
@@ -22,7 +22,7 @@ def main(paths):
         "resultRecordCount": 32000,
         "resultType": "standard",
     }
-    res = requests.get(DATA_URL, params=PARAMS)
+    res = web.get(DATA_URL, params=PARAMS)
 
     data = [elem["attributes"] for elem in json.loads(res.content)["features"]]
 
@@ -2,6 +2,8 @@ import re
 
 import pandas as pd
 
+from cowidev.vax.utils import web
+
 
 class Malaysia:
     def __init__(self) -> None:
@@ -32,7 +34,7 @@ class Malaysia:
         self._vax_1d = {}
 
     def read(self) -> pd.DataFrame:
-        return pd.read_csv(
+        return web.read_csv_from_url(
             self.source_url,
         )
 
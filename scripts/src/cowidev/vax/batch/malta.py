@@ -1,10 +1,11 @@
 import pandas as pd
 
 from cowidev.vax.utils.dates import clean_date_series
+from cowidev.vax.utils import web
 
 
 def read(source: str) -> pd.DataFrame:
-    return pd.read_csv(source)
+    return web.read_csv_from_url(source)
 
 
 def check_columns(df: pd.DataFrame, expected) -> pd.DataFrame:
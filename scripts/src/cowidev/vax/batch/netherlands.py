@@ -2,6 +2,8 @@ from datetime import date, timedelta
 
 import pandas as pd
 
+from cowidev.vax.utils import web
+
 
 URL = "https://opendata.ecdc.europa.eu/covid19/vaccine_tracker/csv/data.csv"
 VACCINES_ONE_DOSE = ["JANSS"]
@@ -9,7 +11,7 @@ VACCINES_ONE_DOSE = ["JANSS"]
 
 def main(paths):
 
-    df = pd.read_csv(
+    df = web.read_csv_from_url(
         URL, usecols=["YearWeekISO", "FirstDose", "SecondDose", "Region", "Vaccine"]
     )
 
@@ -2,6 +2,7 @@ import pandas as pd
 
 from cowidev.vax.utils.dates import localdatenow
 from cowidev.vax.utils.files import export_metadata
+from cowidev.vax.utils import web
 
 
 class Peru:
@@ -23,13 +24,13 @@ class Peru:
         }
 
     def read(self):
-        return pd.read_csv(
+        return web.read_csv_from_url(
             self.source_url,
             usecols=["fecha_vacunacion", "fabricante", "dosis", "n_reg"],
         )
 
     def read_age(self):
-        return pd.read_csv(self.source_url_age)
+        return web.read_csv_from_url(self.source_url_age)
 
     def pipe_rename_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         df = df.rename(columns={"fecha_vacunacion": "date", "fabricante": "vaccine"})
@@ -1,10 +1,11 @@
 import pandas as pd
 
 from cowidev.vax.utils.utils import make_monotonic
+from cowidev.vax.utils import web
 
 
 def read(source_url: str) -> pd.DataFrame:
-    return pd.read_csv(
+    return web.read_csv_from_url(
         source_url,
         usecols=[
             "data",
@@ -1,8 +1,8 @@
-import requests
 import pandas as pd
 
 from cowidev.vax.utils.files import export_metadata
 from cowidev.vax.utils.utils import make_monotonic
+from cowidev.vax.utils import web
 
 
 class Romania:
@@ -23,7 +23,7 @@ class Romania:
         self.vaccines_1d = vaccines_1d
 
     def read(self) -> pd.DataFrame:
-        data = requests.get(self.source_url).json()
+        data = web.get(self.source_url).json()
         return (
             pd.DataFrame.from_dict(
                 data["historicalData"],
@@ -3,10 +3,12 @@ import json
 import requests
 import pandas as pd
 
+from cowidev.vax.utils import web
+
 
 def import_iza():
 
-    iza = pd.read_csv(
+    iza = web.read_csv_from_url(
         (
             "https://github.com/Institut-Zdravotnych-Analyz/covid19-data/raw/main/Vaccination/"
             "OpenData_Slovakia_Vaccination_Regions.csv"
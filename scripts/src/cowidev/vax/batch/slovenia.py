@@ -1,9 +1,9 @@
-import pandas as pd
+from cowidev.vax.utils import web
 
 
 def main(paths):
 
-    df = pd.read_csv(
+    df = web.read_csv_from_url(
         "https://raw.githubusercontent.com/sledilnik/data/master/csv/vaccination.csv",
         usecols=[
             "date",
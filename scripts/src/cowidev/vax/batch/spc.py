@@ -1,11 +1,11 @@
 from collections import defaultdict
 import copy
 
-import requests
 import pandas as pd
 
 from cowidev.vax.utils.files import load_data
 from cowidev.vax.utils.utils import make_monotonic
+from cowidev.vax.utils import web
 
 
 metrics_mapping = {
@@ -56,7 +56,7 @@ class SPC:
 
     def read(self):
         # Get data
-        data = requests.get(self.source_url).json()
+        data = web.get(self.source_url).json()
         return self.parse_data(data)
 
     def parse_data(self, data: dict):
@@ -1,8 +1,7 @@
-import requests
-
 import pandas as pd
 
 from cowidev.vax.utils.files import export_metadata
+from cowidev.vax.utils import web
 
 
 class Switzerland:
@@ -15,7 +14,7 @@ class Switzerland:
         return df, df_manufacturer
 
     def _get_file_url(self) -> str:
-        response = requests.get("https://www.covid19.admin.ch/api/data/context").json()
+        response = web.get("https://www.covid19.admin.ch/api/data/context").json()
         context = response["sources"]["individual"]["csv"]
         doses_url = context["vaccDosesAdministered"]
         people_url = context["vaccPersonsV2"]
@@ -23,15 +22,15 @@ class Switzerland:
         return doses_url, people_url, manufacturer_url
 
     def _parse_data(self, doses_url, people_url, manufacturer_url):
-        doses = pd.read_csv(
+        doses = web.read_csv_from_url(
             doses_url,
             usecols=["geoRegion", "date", "sumTotal", "type"],
         )
-        people = pd.read_csv(
+        people = web.read_csv_from_url(
             people_url,
             usecols=["geoRegion", "date", "sumTotal", "type"],
         )
-        manufacturer = pd.read_csv(
+        manufacturer = web.read_csv_from_url(
             manufacturer_url,
             usecols=["date", "geoRegion", "vaccine", "sumTotal"],
         )
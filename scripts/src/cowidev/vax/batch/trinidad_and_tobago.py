@@ -1,13 +1,13 @@
-import requests
 import pandas as pd
 
 from cowidev.vax.utils.files import load_query, load_data
 from cowidev.vax.utils.dates import clean_date_series
+from cowidev.vax.utils import web
 
 
 def read(source: str) -> pd.DataFrame:
     params = load_query("trinidad-and-tobago-metrics", to_str=False)
-    data = requests.get(source, params=params).json()
+    data = web.get(source, params=params).json()
     return parse_data(data)
 
 
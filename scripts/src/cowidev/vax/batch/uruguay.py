@@ -2,6 +2,7 @@ import re
 import pandas as pd
 
 from cowidev.vax.utils.files import export_metadata
+from cowidev.vax.utils import web
 
 
 vaccines_mapping = {
@@ -19,10 +20,10 @@ class Uruguay:
 
     def read(self):
         # Load main data
-        df = pd.read_csv(self.source_url)
+        df = web.read_csv_from_url(self.source_url)
         # Load age data
         regex = r"(date|coverage_(people|fully)_\d+_\d+)"
-        df_age = df_age = pd.read_csv(
+        df_age = df_age = web.read_csv_from_url(
             self.source_url_age, usecols=lambda x: re.match(regex, x)
         )
         return df, df_age
@@ -1,6 +1,7 @@
-import requests
 import pandas as pd
 
+from cowidev.vax.utils import web
+
 
 class Zimbabwe:
     def __init__(self, source_url: str, location: str, columns_rename: dict = None):
@@ -10,7 +11,7 @@ class Zimbabwe:
 
     def read(self) -> pd.DataFrame:
         url = "https://services9.arcgis.com/DnERH4rcjw7NU6lv/arcgis/rest/services/Vaccine_Distribution_Program/FeatureServer/2/query?where=1%3D1&objectIds=&time=&geometry=&geometryType=esriGeometryEnvelope&inSR=&spatialRel=esriSpatialRelIntersects&resultType=none&distance=0.0&units=esriSRUnit_Meter&returnGeodetic=false&outFields=date_reported%2Cfirst_doses%2Csecond_doses&returnGeometry=true&featureEncoding=esriDefault&multipatchOption=xyFootprint&maxAllowableOffset=&geometryPrecision=&outSR=&datumTransformation=&applyVCSProjection=false&returnIdsOnly=false&returnUniqueIdsOnly=false&returnCountOnly=false&returnExtentOnly=false&returnQueryGeometry=false&returnDistinctValues=false&cacheHint=false&orderByFields=&groupByFieldsForStatistics=&outStatistics=&having=&resultOffset=&resultRecordCount=&returnZ=false&returnM=false&returnExceededLimitFeatures=true&quantizationParameters=&sqlFormat=none&f=pjson&token="
-        data = requests.get(url).json()
+        data = web.get(url).json()
         return pd.DataFrame.from_records(
             elem["attributes"] for elem in data["features"]
         )
@@ -3,6 +3,7 @@ from cowidev.vax.cmd import main_get_data, main_process_data, main_generate_data
 from cowidev.vax.cmd.export import main_export
 from cowidev.vax.cmd.twitter import main_propose_data_twitter
 from cowidev.vax.cmd.check_with_r import test_check_with_r
+from cowidev.vax.cmd.report import main_report
 from cowidev.vax.utils.paths import Paths
 
 
@@ -25,6 +26,9 @@ def main():
             modules_name=cfg.countries,
             skip_countries=cfg.skip_countries,
             gsheets_api=config.gsheets_api,
+            backend=cfg.backend,
+            timeout=cfg.timeout,
+            memory_limit=cfg.memory_limit,
         )
     if "process" in config.mode:
         cfg = config.ProcessDataConfig()
@@ -35,6 +39,9 @@ def main():
             skip_complete=cfg.skip_complete,
             skip_monotonic=cfg.skip_monotonic_check,
             skip_anomaly=cfg.skip_anomaly_check,
+            incremental=cfg.incremental,
+            parallel=cfg.parallel,
+            n_jobs=cfg.njobs,
         )
     if "generate" in config.mode:
         if config.check_r:
@@ -54,6 +61,8 @@ def main():
             parallel=cfg.parallel,
             n_jobs=cfg.njobs,
         )
+    if "report" in config.mode:
+        main_report(paths=paths)
 
 
 if __name__ == "__main__":
@@ -146,6 +146,13 @@ class ConfigParams(object):
                         self._return_value_pipeline("get-data", "skip_countries", []),
                     )
                 ),
+                "backend": self._return_value_pipeline(
+                    "get-data", "backend", "threading"
+                ),
+                "timeout": self._return_value_pipeline("get-data", "timeout", None),
+                "memory_limit": self._return_value_pipeline(
+                    "get-data", "memory_limit", None
+                ),
             }
         )
 
@@ -180,6 +187,15 @@ class ConfigParams(object):
                 ),
                 "skip_monotonic_check": self._get_skip_check("skip_monotonic_check"),
                 "skip_anomaly_check": self._get_skip_check("skip_anomaly_check"),
+                "incremental": self._return_value_pipeline(
+                    "process-data", "incremental", True
+                ),
+                "parallel": self._return_value_pipeline(
+                    "process-data", "parallel", self._parallel
+                ),
+                "njobs": self._return_value_pipeline(
+                    "process-data", "njobs", self._njobs
+                ),
             }
         )
 
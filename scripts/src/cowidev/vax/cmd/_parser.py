@@ -5,7 +5,7 @@ from difflib import SequenceMatcher
 from cowidev.vax.cmd.utils import normalize_country_name, get_logger
 
 
-CHOICES = ["get", "process", "generate", "export", "propose"]
+CHOICES = ["get", "process", "generate", "export", "propose", "report"]
 logger = get_logger()
 
 
@@ -42,7 +42,8 @@ def _parse_args():
             "Choose a step: i) `get` will run automated scripts, 2) `process` will get csvs generated in 1"
             " and collect all data from spreadsheet, 3) `generate` generate the output files, 4) `export`"
             " to generate all final files, 5) `all` will  run all steps sequentially + step 6, 6) `propose` Get data"
-            " from Social Networks (Twitter, Facebook) and propose data."
+            " from Social Networks (Twitter, Facebook) and propose data, 7) `report` show the slowest modules and"
+            " regressions across runs (from the run log)."
         ),
     )
     parser.add_argument(
@@ -1,19 +1,20 @@
 import os
-import itertools
+from contextlib import contextmanager
 from datetime import datetime
 from collections import ChainMap
-from math import isnan
 import glob
 import json
 import locale
 from shutil import copyfile
 
+import numpy as np
 import pandas as pd
 from pandas.api.types import is_numeric_dtype
 
 from cowidev.vax.cmd.utils import get_logger
-from cowidev.vax.utils.checks import VACCINES_ACCEPTED
+from cowidev.vax.utils.checks import VACCINES_ACCEPTED, LocationsChecker
 from cowidev.vax.utils.dates import clean_date
+from cowidev.vax.utils.metrics import RunLog, track
 
 
 logger = get_logger()
@@ -33,6 +34,7 @@ class DatasetGenerator:
         self.outputs = outputs
         # Others
         self.paths = paths
+        self.run_log = RunLog(paths.tmp_vax_run_log)
         self.aggregates = self.build_aggregates()
         self._countries_covered = None
 
@@ -149,54 +151,54 @@ class DatasetGenerator:
             ]
         ]
 
-    def _get_aggregate(self, df, agg_name, included_locs, excluded_locs):
-        # Take rows that matter
-        agg = df[~df.location.isin(self.aggregates.keys())]  # remove aggregated rows
-        if excluded_locs is not None:
-            agg = agg[~agg.location.isin(excluded_locs)]
-        elif included_locs is not None:
-            agg = agg[agg.location.isin(included_locs)]
+    def _membership_matrix(self, locations: pd.Index) -> np.ndarray:
+        # Boolean matrix (location x aggregate), True if location is part of aggregate
+        membership = np.ones((len(locations), len(self.aggregates)), dtype=bool)
+        for i, agg in enumerate(self.aggregates.values()):
+            if agg["excluded_locs"] is not None:
+                membership[:, i] = ~locations.isin(agg["excluded_locs"])
+            elif agg["included_locs"] is not None:
+                membership[:, i] = locations.isin(agg["included_locs"])
+        return membership
 
-        # Get full location-date grid
-        agg = (
-            pd.DataFrame(
-                itertools.product(agg.location.unique(), agg.date.unique()),
-                columns=[agg.location.name, agg.date.name],
-            )
-            .merge(agg, on=["date", "location"], how="outer")
-            .sort_values(by=["location", "date"])
-        )
-
-        # NaN: Forward filling + Zero-filling if all metric is NaN
+    def pipe_aggregates(self, df: pd.DataFrame) -> pd.DataFrame:
+        logger.info(f"Building aggregate regions {list(self.aggregates.keys())}")
         cols = [
             "total_vaccinations",
             "people_vaccinated",
             "people_fully_vaccinated",
             "total_boosters",
         ]
-        grouper = agg.groupby("location")
-        for col in cols:
-            agg[col] = grouper[col].apply(
-                lambda x: x.fillna(0) if x.isnull().all() else x.fillna(method="ffill")
-            )
-
-        # Aggregate
-        agg = agg.groupby("date").sum().reset_index().assign(location=agg_name)
-        agg = agg[agg.date.dt.date < datetime.now().date()]
-        return agg
-
-    def pipe_aggregates(self, df: pd.DataFrame) -> pd.DataFrame:
-        logger.info(f"Building aggregate regions {list(self.aggregates.keys())}")
-        aggs = []
-        for agg_name, _ in self.aggregates.items():
-            aggs.append(
-                self._get_aggregate(
-                    df=df,
-                    agg_name=agg_name,
-                    included_locs=self.aggregates[agg_name]["included_locs"],
-                    excluded_locs=self.aggregates[agg_name]["excluded_locs"],
-                )
+        df_locs = df[
+            ~df.location.isin(self.aggregates.keys())
+        ]  # remove aggregated rows
+        # Dense (date x location) matrices. Forward filling, missing values (before
+        # first report or never reported) count as zero
+        df_pivot = df_locs.assign(reported=True).pivot(
+            index="date", columns="location", values=cols + ["reported"]
+        )
+        dates = df_pivot.index
+        membership = self._membership_matrix(df_pivot["reported"].columns)
+        # Aggregates are reported on dates where at least one of their locations is
+        reported = df_pivot["reported"].notnull().to_numpy().astype(int) @ membership
+        msk_dates = (dates < pd.Timestamp(datetime.now().date()))[:, None] & (
+            reported > 0
+        )
+        # Aggregate, (date x location) @ (location x aggregate)
+        values = {
+            col: df_pivot[col].ffill().fillna(0).to_numpy(dtype=float) @ membership
+            for col in cols
+        }
+        aggs = [
+            pd.DataFrame(
+                {
+                    "date": dates[msk_dates[:, i]],
+                    **{col: values[col][msk_dates[:, i], i] for col in cols},
+                    "location": agg_name,
+                }
             )
+            for i, agg_name in enumerate(self.aggregates)
+        ]
         return pd.concat([df] + aggs, ignore_index=True)
 
     def pipe_daily(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -209,33 +211,50 @@ class DatasetGenerator:
         df = df.sort_values(["location", "date"])
         return df
 
-    def _add_smoothed(self, df: pd.DataFrame) -> pd.DataFrame:
-        # Range where total_vaccinations is registered
-        dt_min = df.dropna(subset=["total_vaccinations"]).date.min()
-        dt_max = df.dropna(subset=["total_vaccinations"]).date.max()
-        df_nan = df[(df.date < dt_min) | (df.date > dt_max)]
-        # Add missing dates
-        df = df.merge(
-            pd.Series(pd.date_range(dt_min, dt_max), name="date"),
-            how="right",
-        ).sort_values(by="date")
-        # Calculate and add smoothed vars
-        new_interpolated_smoothed = (
-            df.total_vaccinations.interpolate(method="linear")
-            .diff()
-            .rolling(7, min_periods=1)
-            .mean()
-            .apply(lambda x: round(x) if not isnan(x) else x)
-        )
-        df = df.assign(new_vaccinations_smoothed=new_interpolated_smoothed)
-        # Add missing dates
-        df = pd.concat([df, df_nan], ignore_index=True).sort_values("date")
-        df.loc[:, "location"] = df.location.dropna().iloc[0]
-        return df
-
     def pipe_smoothed(self, df: pd.DataFrame) -> pd.DataFrame:
         logger.info("Adding smoothed variables")
-        return df.groupby("location").apply(self._add_smoothed).reset_index(drop=True)
+        # Daily grid over the range where total_vaccinations is registered, for all
+        # locations at once. Locations are contiguous segments of the grid
+        df_range = (
+            df.dropna(subset=["total_vaccinations"])
+            .groupby("location")
+            .date.agg(["min", "max"])
+        )
+        lengths = (df_range["max"] - df_range["min"]).dt.days.to_numpy() + 1
+        starts = np.cumsum(lengths) - lengths
+        segment = np.repeat(np.arange(len(lengths)), lengths)
+        position = np.arange(lengths.sum()) - starts[segment]
+        grid = pd.DataFrame(
+            {
+                "location": df_range.index[segment],
+                "date": df_range["min"].to_numpy()[segment]
+                + position.astype("timedelta64[D]"),
+            }
+        )
+        total_vaccinations = grid.merge(df, on=["location", "date"], how="left")[
+            "total_vaccinations"
+        ].to_numpy(dtype=float)
+        # Interpolate. Segments start and end with values, so no values are
+        # interpolated across locations
+        msk = ~np.isnan(total_vaccinations)
+        idx = np.arange(len(total_vaccinations))
+        total_vaccinations = np.interp(idx, idx[msk], total_vaccinations[msk])
+        # Diff and 7-day rolling mean (min_periods=1) within segments
+        diff = np.diff(total_vaccinations, prepend=np.nan)
+        diff[starts] = np.nan
+        window = np.full((len(diff), 7), np.nan)
+        for lag in range(7):
+            valid = position >= lag
+            window[valid, lag] = diff[idx[valid] - lag]
+        with np.errstate(invalid="ignore"):
+            smoothed = np.nansum(window, axis=1) / (~np.isnan(window)).sum(axis=1)
+        grid = grid.assign(new_vaccinations_smoothed=np.round(smoothed))
+        # Add missing dates
+        return (
+            df.merge(grid, on=["location", "date"], how="outer")
+            .sort_values(["location", "date"])
+            .reset_index(drop=True)
+        )
 
     def get_population(self, df_subnational: pd.DataFrame) -> pd.DataFrame:
         # Build population dataframe
@@ -308,22 +327,21 @@ class DatasetGenerator:
         logger.info("Sanity checks")
         # Config
         skip_countries = ["Pitcairn"]
-        # Sanity checks
-        df_to_check = df[-df.location.isin(skip_countries)]
-        if not (df_to_check.total_vaccinations.dropna() >= 0).all():
-            raise ValueError(
-                " Negative values found! Check values in `total_vaccinations`."
-            )
-        if not (df_to_check.new_vaccinations_smoothed.dropna() >= 0).all():
-            raise ValueError(
-                " Negative values found! Check values in `new_vaccinations_smoothed`."
-            )
-        if not (
-            df_to_check.new_vaccinations_smoothed_per_million.dropna() <= 120000
-        ).all():
-            raise ValueError(
-                " Huge values found! Check values in `new_vaccinations_smoothed_per_million`."
-            )
+        # Sanity checks. Location data was already checked in process-data, so only
+        # bounds are checked here (aggregates need not be monotonic)
+        checker = LocationsChecker(
+            df,
+            monotonic=False,
+            inequalities=False,
+            anomalies=False,
+            bounds={
+                "total_vaccinations": (0, None),
+                "new_vaccinations_smoothed": (0, None),
+                "new_vaccinations_smoothed_per_million": (None, 120000),
+            },
+            skip_locations=skip_countries,
+        )
+        checker.raise_for_violations()
         return df
 
     def pipe_to_int(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -681,86 +699,105 @@ class DatasetGenerator:
         copyfile(self.paths.tmp_vax_metadata_man, self.paths.pub_vax_metadata_man)
         copyfile(self.paths.tmp_vax_metadata_age, self.paths.pub_vax_metadata_age)
 
+    @contextmanager
+    def _step(self, description: str):
+        logger.info(f"{description}...")
+        with track(self.run_log, "generate-dataset", description) as record:
+            yield record
+
     def run(self):
         print("-- Generating dataset... --")
-        logger.info("1/10 Loading input data...")
-        try:
-            df_metadata = pd.read_csv(self.inputs.metadata)
-            df_vaccinations = pd.read_csv(
-                self.inputs.vaccinations, parse_dates=["date"]
+        with self._step("1/10 Loading input data") as record:
+            try:
+                df_metadata = pd.read_csv(self.inputs.metadata)
+                df_vaccinations = pd.read_csv(
+                    self.inputs.vaccinations, parse_dates=["date"]
+                )
+            except FileNotFoundError:
+                raise FileNotFoundError(
+                    "Internal files not found! Make sure to run `proccess-data` step prior to"
+                    " running `generate-dataset`."
+                )
+            df_iso = pd.read_csv(self.inputs.iso)
+            files_manufacturer = glob.glob(self.inputs.manufacturer)
+            df_manufacturer = pd.concat(
+                (
+                    pd.read_csv(filepath, parse_dates=["date"])
+                    for filepath in files_manufacturer
+                ),
+                ignore_index=True,
             )
-        except FileNotFoundError:
-            raise FileNotFoundError(
-                "Internal files not found! Make sure to run `proccess-data` step prior to running `generate-dataset`."
+            files_age = glob.glob(self.inputs.age)
+            df_age = pd.concat(
+                (pd.read_csv(filepath, parse_dates=["date"]) for filepath in files_age),
+                ignore_index=True,
             )
-        df_iso = pd.read_csv(self.inputs.iso)
-        files_manufacturer = glob.glob(self.inputs.manufacturer)
-        df_manufacturer = pd.concat(
-            (
-                pd.read_csv(filepath, parse_dates=["date"])
-                for filepath in files_manufacturer
-            ),
-            ignore_index=True,
-        )
-        files_age = glob.glob(self.inputs.age)
-        df_age = pd.concat(
-            (pd.read_csv(filepath, parse_dates=["date"]) for filepath in files_age),
-            ignore_index=True,
-        )
+            record["rows"] = len(df_vaccinations)
 
         # Metadata
-        logger.info("2/10 Generating `automated_state` table...")
-        df_automated = df_metadata.pipe(
-            self.pipeline_automated
-        )  # Export to AUTOMATED_STATE_FILE
-        logger.info("3/10 Generating `locations` table...")
-        df_locations = df_vaccinations.pipe(
-            self.pipeline_locations, df_metadata, df_iso
-        )  # Export to LOCATIONS_FILE
+        with self._step("2/10 Generating `automated_state` table") as record:
+            df_automated = df_metadata.pipe(
+                self.pipeline_automated
+            )  # Export to AUTOMATED_STATE_FILE
+            record["rows"] = len(df_automated)
+        with self._step("3/10 Generating `locations` table") as record:
+            df_locations = df_vaccinations.pipe(
+                self.pipeline_locations, df_metadata, df_iso
+            )  # Export to LOCATIONS_FILE
+            record["rows"] = len(df_locations)
 
         # Vaccinations
-        logger.info("4/10 Generating `vaccinations` table...")
-        df_vaccinations_base = df_vaccinations.pipe(self.pipeline_vaccinations)
-        df_vaccinations = df_vaccinations_base.pipe(self.pipe_vaccinations_csv, df_iso)
-        logger.info("5/10 Generating `vaccinations` json...")
-        json_vaccinations = df_vaccinations.pipe(self.pipe_vaccinations_json)
+        with self._step("4/10 Generating `vaccinations` table") as record:
+            df_vaccinations_base = df_vaccinations.pipe(self.pipeline_vaccinations)
+            df_vaccinations = df_vaccinations_base.pipe(
+                self.pipe_vaccinations_csv, df_iso
+            )
+            record["rows"] = len(df_vaccinations)
+        with self._step("5/10 Generating `vaccinations` json") as record:
+            json_vaccinations = df_vaccinations.pipe(self.pipe_vaccinations_json)
+            record["rows"] = len(df_vaccinations)
 
         # Manufacturer
-        logger.info("6/10 Generating `manufacturer` table...")
-        df_manufacturer = df_manufacturer.pipe(self.pipeline_manufacturer)
+        with self._step("6/10 Generating `manufacturer` table") as record:
+            df_manufacturer = df_manufacturer.pipe(self.pipeline_manufacturer)
+            record["rows"] = len(df_manufacturer)
 
         # Age
-        logger.info("7/10 Generating `age` table...")
-        df_age = df_age.pipe(self.pipeline_age)
+        with self._step("7/10 Generating `age` table") as record:
+            df_age = df_age.pipe(self.pipeline_age)
+            record["rows"] = len(df_age)
 
         # Grapher
-        logger.info("8/10 Generating `grapher` tables...")
-        df_grapher = df_vaccinations_base.pipe(self.pipe_grapher)
-        df_manufacturer_grapher = df_manufacturer.pipe(
-            self.pipeline_manufacturer_grapher
-        )
-        df_age_grapher = df_age.pipe(self.pipeline_age_grapher)
-        # df_age_grapher_fully = df_age.pipe(self.pipeline_age_grapher, "people_fully_vaccinated_per_hundred")
+        with self._step("8/10 Generating `grapher` tables") as record:
+            df_grapher = df_vaccinations_base.pipe(self.pipe_grapher)
+            df_manufacturer_grapher = df_manufacturer.pipe(
+                self.pipeline_manufacturer_grapher
+            )
+            df_age_grapher = df_age.pipe(self.pipeline_age_grapher)
+            # df_age_grapher_fully = df_age.pipe(self.pipeline_age_grapher, "people_fully_vaccinated_per_hundred")
+            record["rows"] = (
+                len(df_grapher) + len(df_manufacturer_grapher) + len(df_age_grapher)
+            )
 
         # HTML
-        logger.info("9/10 Generating HTML...")
-        html_table = df_locations.pipe(self.pipe_locations_to_html)
+        with self._step("9/10 Generating HTML"):
+            html_table = df_locations.pipe(self.pipe_locations_to_html)
 
         # Export
-        logger.info("10/10 Exporting files...")
-        self.export(
-            df_automated=df_automated,
-            df_locations=df_locations,
-            df_vaccinations=df_vaccinations,
-            df_manufacturer=df_manufacturer,
-            df_age=df_age,
-            json_vaccinations=json_vaccinations,
-            df_grapher=df_grapher,
-            df_manufacturer_grapher=df_manufacturer_grapher,
-            df_age_grapher=df_age_grapher,
-            html_table=html_table,
-        )
-        self._cp_locations_files()
+        with self._step("10/10 Exporting files"):
+            self.export(
+                df_automated=df_automated,
+                df_locations=df_locations,
+                df_vaccinations=df_vaccinations,
+                df_manufacturer=df_manufacturer,
+                df_age=df_age,
+                json_vaccinations=json_vaccinations,
+                df_grapher=df_grapher,
+                df_manufacturer_grapher=df_manufacturer_grapher,
+                df_age_grapher=df_age_grapher,
+                html_table=html_table,
+            )
+            self._cp_locations_files()
 
 
 def main_generate_dataset(paths):
@@ -1,10 +1,16 @@
 import importlib
+import multiprocessing as mp
+from multiprocessing.connection import wait
+import os
+import signal
+import time
 
 from joblib import Parallel, delayed
 
 from cowidev.vax.batch import __all__ as batch_countries
 from cowidev.vax.incremental import __all__ as incremental_countries
-from cowidev.vax.cmd.utils import get_logger, print_eoe
+from cowidev.vax.cmd.utils import get_logger, get_n_workers, print_eoe
+from cowidev.vax.utils.metrics import RunLog, track
 
 
 # Logger
@@ -23,32 +29,285 @@ modules_name_batch = list(country_to_module_batch.values())
 modules_name_incremental = list(country_to_module_incremental.values())
 modules_name = modules_name_batch + modules_name_incremental
 
+# Module processes are forked, so that the state of the parent (e.g. the Google Sheets client) need not be pickled.
+# Process groups, which the process backend relies on, are POSIX-only, like fork.
+MP_CONTEXT = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else None)
+
+
+class _OutputsRecorder:
+    """Proxy of `paths` that records the output files requested by a module (e.g. `paths.tmp_vax_out(country)`)."""
+
+    output_methods = [
+        "tmp_vax_out",
+        "tmp_vax_out_proposal",
+        "tmp_vax_out_man",
+        "tmp_vax_out_by_age_group",
+    ]
+
+    def __init__(self, paths):
+        self._paths = paths
+        self.outputs = set()
+
+    def __getattr__(self, name):
+        attr = getattr(self._paths, name)
+        if name not in self.output_methods:
+            return attr
+
+        def _output(location):
+            path = attr(location)
+            self.outputs.add(path)
+            return path
+
+        return _output
+
 
 class CountryDataGetter:
     def __init__(self, paths: str, skip_countries: list, gsheets_api):
         self.paths = paths
         self.skip_countries = skip_countries
         self.gsheets_api = gsheets_api
+        self.run_log = RunLog(paths.tmp_vax_run_log)
+
+    def _rows_written(self, filepaths: set, since: float):
+        # Rows in the module's output files written since `since`
+        rows = 0
+        for filepath in filepaths:
+            if os.path.isfile(filepath) and os.path.getmtime(filepath) >= since:
+                with open(filepath) as f:
+                    rows += max(sum(1 for _ in f) - 1, 0)
+        return rows
 
-    def run(self, module_name: str):
+    def run(self, module_name: str, own_process: bool = False):
+        """Run a module, recording its metrics in the run log.
+
+        Peak RSS is only recorded if the module runs in its own process (`own_process`), since otherwise it is the
+        peak of the whole run so far.
+        """
         country = module_name.split(".")[-1]
         if country.lower() in self.skip_countries:
             logger.info(f"{module_name}: skipped! ⚠️")
             return {"module_name": module_name, "success": None, "skipped": True}
-        args = [self.paths]
+        paths = _OutputsRecorder(self.paths)
+        args = [paths]
         if country == "colombia":
             args.append(self.gsheets_api)
         logger.info(f"{module_name}: started")
-        module = importlib.import_module(module_name)
+        t0 = time.time()
+        with track(
+            self.run_log, "get-data", module_name, max_rss=own_process
+        ) as record:
+            try:
+                module = importlib.import_module(module_name)
+                module.main(*args)
+            except Exception as err:
+                success = False
+                logger.error(f"{module_name}: ❌ {err}", exc_info=True)
+            else:
+                success = True
+                logger.info(f"{module_name}: SUCCESS ✅")
+            record["success"] = success
+            record["rows"] = self._rows_written(paths.outputs, since=t0)
+        return {
+            "module_name": module_name,
+            "success": success,
+            "skipped": False,
+            "time": record["wall_time"],
+        }
+
+
+def _run_module_process(country_data_getter, module_name, conn):
+    # Own process group, so that killing it also kills browsers/drivers spawned by the module. The group is no longer
+    # the terminal's, so Ctrl-C only reaches the parent, which kills the groups (see `_run_modules_processes`).
+    os.setpgrp()
+    conn.send(country_data_getter.run(module_name, own_process=True))
+    conn.close()
+
+
+def _kill_process_group(process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, ProcessLookupError):
+        process.kill()
+
+
+def _process_group_rss(pgid):
+    """Resident memory (MB) of all processes in process group `pgid`, None if unknown (no /proc)."""
+    if not os.path.isdir("/proc"):
+        return None
+    rss_pages = 0
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
         try:
-            module.main(*args)
-        except Exception as err:
-            success = False
-            logger.error(f"{module_name}: ❌ {err}", exc_info=True)
-        else:
-            success = True
-            logger.info(f"{module_name}: SUCCESS ✅")
-        return {"module_name": module_name, "success": success, "skipped": False}
+            with open(f"/proc/{pid}/stat") as f:
+                # Fields after the executable name, which is in parentheses and may contain spaces
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        # 5th field is the process group, 24th the resident set size in pages
+        if int(fields[2]) == pgid:
+            rss_pages += int(fields[21])
+    return rss_pages * os.sysconf("SC_PAGE_SIZE") / 1024**2
+
+
+def _receive(conn):
+    # Result sent by the module process, None if not available (yet)
+    try:
+        if conn.poll():
+            return conn.recv()
+    except EOFError:
+        pass
+    return None
+
+
+def _failed_result(run_log, module_name, t0, error):
+    # The module process could not write its own record
+    run_log.write(
+        {
+            "step": "get-data",
+            "name": module_name,
+            "success": False,
+            "error": error,
+            "wall_time": round(time.time() - t0, 3),
+        }
+    )
+    return {
+        "module_name": module_name,
+        "success": False,
+        "skipped": False,
+        "time": time.time() - t0,
+    }
+
+
+def _run_modules_processes(
+    country_data_getter, modules_name, n_jobs, timeout=None, memory_limit=None
+):
+    """Run each module in its own process, with at most `n_jobs` running at the same time.
+
+    Modules are started in the given order. A module running for longer than `timeout` seconds, or whose processes
+    (including browsers it spawned) use more than `memory_limit` MB of resident memory, is killed and reported as
+    failed, and so is a module whose process dies. Memory is polled about every second, on systems with /proc
+    (otherwise, `memory_limit` is ignored with a warning).
+
+    On KeyboardInterrupt (or any other error), all running modules are killed before raising.
+    """
+    if memory_limit is not None and not os.path.isdir("/proc"):
+        logger.warning(
+            f"Resident memory can't be measured on this system (no /proc), `memory_limit` ({memory_limit} MB) is"
+            " ignored"
+        )
+        memory_limit = None
+    pending = list(modules_name)
+    running = {}
+    results = []
+    try:
+        _run_modules_processes_loop(
+            country_data_getter,
+            pending,
+            running,
+            results,
+            n_jobs,
+            timeout,
+            memory_limit,
+        )
+    finally:
+        for process, conn, _ in running.values():
+            _kill_process_group(process)
+            process.join()
+            conn.close()
+    return results
+
+
+def _run_modules_processes_loop(
+    country_data_getter, pending, running, results, n_jobs, timeout, memory_limit
+):
+    while pending or running:
+        while pending and len(running) < n_jobs:
+            module_name = pending.pop(0)
+            conn_recv, conn_send = MP_CONTEXT.Pipe(duplex=False)
+            process = MP_CONTEXT.Process(
+                target=_run_module_process,
+                args=(country_data_getter, module_name, conn_send),
+            )
+            process.start()
+            conn_send.close()
+            running[module_name] = (process, conn_recv, time.time())
+        wait(
+            [conn for _, conn, _ in running.values()]
+            + [p.sentinel for p, _, _ in running.values()],
+            timeout=1,
+        )
+        for module_name, (process, conn, t0) in list(running.items()):
+            result = _receive(conn)
+            if result is not None:
+                pass
+            elif not process.is_alive():
+                logger.error(
+                    f"{module_name}: ❌ process died (exit code {process.exitcode})"
+                )
+                result = _failed_result(
+                    country_data_getter.run_log, module_name, t0, "died"
+                )
+            elif timeout is not None and time.time() - t0 > timeout:
+                _kill_process_group(process)
+                logger.error(f"{module_name}: ❌ timed out after {timeout} seconds")
+                result = _failed_result(
+                    country_data_getter.run_log, module_name, t0, "timeout"
+                )
+            elif (
+                memory_limit is not None
+                and (_process_group_rss(process.pid) or 0) > memory_limit
+            ):
+                _kill_process_group(process)
+                logger.error(f"{module_name}: ❌ exceeded {memory_limit} MB of memory")
+                result = _failed_result(
+                    country_data_getter.run_log, module_name, t0, "memory"
+                )
+            else:
+                continue
+            process.join()
+            conn.close()
+            del running[module_name]
+            results.append(result)
+
+
+def _load_durations(run_log):
+    # Wall time of each module in its latest run
+    df = run_log.read()
+    df = df[(df.step == "get-data") & df.wall_time.notnull()]
+    return df.groupby("name").wall_time.last().to_dict()
+
+
+def _sort_by_duration(modules_name, durations):
+    # Longest-processing-time first. Modules without recorded duration are assumed to be slow.
+    return sorted(
+        modules_name, key=lambda m: durations.get(m, float("inf")), reverse=True
+    )
+
+
+def _run_modules(
+    country_data_getter, modules_name, parallel, backend, n_jobs, timeout, memory_limit
+):
+    if not parallel:
+        return [country_data_getter.run(module_name) for module_name in modules_name]
+    if backend == "process":
+        return _run_modules_processes(
+            country_data_getter,
+            modules_name,
+            n_jobs=get_n_workers(n_jobs),
+            timeout=timeout,
+            memory_limit=memory_limit,
+        )
+    if backend == "threading":
+        return Parallel(n_jobs=n_jobs, backend="threading")(
+            delayed(country_data_getter.run)(
+                module_name,
+            )
+            for module_name in modules_name
+        )
+    raise ValueError(
+        f"Unknown backend {backend}. Valid backends are 'threading' and 'process'."
+    )
 
 
 def main_get_data(
@@ -58,40 +317,47 @@ def main_get_data(
     modules_name: list = modules_name,
     skip_countries: list = [],
     gsheets_api=None,
+    backend: str = "threading",
+    timeout: int = None,
+    memory_limit: int = None,
 ):
     """Get data from sources and export to output folder.
 
     Is equivalent to script `run_python_scripts.py`
+
+    In parallel mode, modules that took longest in previous runs are started first. With `backend="process"`, each
+    module runs in its own process, killed if it runs for longer than `timeout` seconds or if it uses more than
+    `memory_limit` MB of resident memory (with the browsers it spawns).
     """
     print("-- Getting data... --")
     skip_countries = [x.lower() for x in skip_countries]
     country_data_getter = CountryDataGetter(paths, skip_countries, gsheets_api)
     if parallel:
-        modules_execution_results = Parallel(n_jobs=n_jobs, backend="threading")(
-            delayed(country_data_getter.run)(
-                module_name,
-            )
-            for module_name in modules_name
-        )
-    else:
-        modules_execution_results = []
-        for module_name in modules_name:
-            modules_execution_results.append(
-                country_data_getter.run(
-                    module_name,
-                )
-            )
+        durations = _load_durations(country_data_getter.run_log)
+        modules_name = _sort_by_duration(modules_name, durations)
+    run_kwargs = dict(
+        parallel=parallel,
+        backend=backend,
+        n_jobs=n_jobs,
+        timeout=timeout,
+        memory_limit=memory_limit,
+    )
+    modules_execution_results = _run_modules(
+        country_data_getter, modules_name, **run_kwargs
+    )
 
     modules_failed = [
         m["module_name"] for m in modules_execution_results if m["success"] is False
     ]
     # Retry failed modules
     logger.info(f"\n---\n\nRETRIALS ({len(modules_failed)})")
-    modules_execution_results = []
-    for module_name in modules_failed:
-        modules_execution_results.append(country_data_getter.run(module_name))
+    modules_execution_results_retrial = _run_modules(
+        country_data_getter, modules_failed, **run_kwargs
+    )
     modules_failed_retrial = [
-        m["module_name"] for m in modules_execution_results if m["success"] is False
+        m["module_name"]
+        for m in modules_execution_results_retrial
+        if m["success"] is False
     ]
     if len(modules_failed_retrial) > 0:
         failed_str = "\n".join([f"* {m}" for m in modules_failed_retrial])
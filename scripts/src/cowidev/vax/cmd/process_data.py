@@ -1,13 +1,151 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import hashlib
+import json
+import os
+
 import pandas as pd
 
 from cowidev.vax.utils.gsheets import VaccinationGSheet
 from cowidev.vax.process import process_location
-from cowidev.vax.cmd.utils import get_logger, print_eoe
+from cowidev.vax.process import process, urls
+from cowidev.vax.process.process import COLUMNS_INT
+from cowidev.vax.cmd.utils import get_logger, get_n_workers, print_eoe
+from cowidev.vax.utils import checks, dates
+from cowidev.vax.utils.metrics import RunLog, track
+from cowidev.vax.utils.web import file_fingerprint
 
 
 logger = get_logger()
 
 
+def _code_fingerprint() -> str:
+    """Hash of the source of the modules used to process a location."""
+    return file_fingerprint(__file__, process.__file__, urls.__file__, checks.__file__, dates.__file__)
+
+
+def _fingerprint(
+    df: pd.DataFrame, monotonic_check_skip: list, anomaly_check_skip: list, code_fingerprint: str = ""
+) -> str:
+    """Hash of everything the processed data of a location depends on.
+
+    This is the raw data, the check exceptions, the number of rows before today (rows are only processed once their
+    date is past) and the processing code (`code_fingerprint`).
+    """
+    n_past = int((pd.to_datetime(df.date, dayfirst=True) < pd.Timestamp(datetime.now().date())).sum())
+    h = hashlib.sha256()
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    h.update(json.dumps([df.columns.tolist(), df.dtypes.astype(str).tolist()]).encode())
+    h.update(json.dumps([monotonic_check_skip, anomaly_check_skip, n_past, code_fingerprint], default=str).encode())
+    return h.hexdigest()
+
+
+def _load_fingerprints(path: str) -> dict:
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_fingerprints(path: str, fingerprints: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(fingerprints, f, indent=2, sort_keys=True)
+
+
+def _load_processed(path: str, locations: set) -> pd.DataFrame:
+    """Load processed data of `locations` from the previous combined file."""
+    if not locations or not os.path.isfile(path):
+        return pd.DataFrame()
+    df = pd.read_csv(path, dtype={"date": str})
+    df = df[df.location.isin(locations)]
+    cols = df.columns.intersection(COLUMNS_INT)
+    df[cols] = df[cols].astype("Int64")
+    return df
+
+
+def _process_and_export(
+    df: pd.DataFrame,
+    country: str,
+    monotonic_check_skip: list,
+    anomaly_check_skip: list,
+    filepath: str,
+    run_log_path: str,
+):
+    """Process and export the data of a location.
+
+    Returns:
+        tuple: Location, processed data (None if failed) and error message (None if succeeded).
+    """
+    try:
+        with track(RunLog(run_log_path), "process-data", country) as record:
+            df = process_location(df, monotonic_check_skip, anomaly_check_skip)
+            df.to_csv(filepath, index=False)
+            record["rows"] = len(df)
+    except Exception as e:
+        return country, None, f"{type(e).__name__}: {e}"
+    return country, df, None
+
+
+def _process_locations(tasks: list, parallel: bool, n_jobs: int):
+    """Run `_process_and_export` for each task, in a process pool if `parallel`.
+
+    Results are yielded in the order of tasks.
+    """
+    if parallel and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(get_n_workers(n_jobs), len(tasks))) as executor:
+            yield from executor.map(_process_and_export, *zip(*tasks))
+    else:
+        for task in tasks:
+            yield _process_and_export(*task)
+
+
+def _partition_locations(
+    vax: list, paths, fingerprints_previous: dict, skip_complete: list, skip_monotonic: dict, skip_anomaly: dict
+):
+    """Split the data of locations into those to process and those unchanged since the previous run.
+
+    Returns:
+        tuple: Tasks of `_process_and_export` to run, tasks of unchanged locations (by location), fingerprints (by
+            location) and errors of locations that could not be fingerprinted (by location).
+    """
+    code_fingerprint = _code_fingerprint()
+    tasks = []
+    unchanged = {}
+    fingerprints = {}
+    errors = {}
+    for df in vax:
+        if "location" not in df:
+            raise ValueError(f"Column `location` missing. df: {df.tail(5)}")
+        country = df.loc[0, "location"]
+        if country.lower() in skip_complete:
+            logger.info(f"{country}: SKIPPED 🚧")
+            continue
+        monotonic_check_skip = skip_monotonic.get(country, [])
+        anomaly_check_skip = skip_anomaly.get(country, [])
+        try:
+            fingerprint = _fingerprint(df, monotonic_check_skip, anomaly_check_skip, code_fingerprint)
+        except Exception as e:
+            errors[country] = f"{type(e).__name__}: {e}"
+            logger.error(f"{country}: FAILED ❌ {errors[country]}")
+            continue
+        fingerprints[country] = fingerprint
+        task = (
+            df,
+            country,
+            monotonic_check_skip,
+            anomaly_check_skip,
+            paths.pub_vax_loc(country),
+            paths.tmp_vax_run_log,
+        )
+        if fingerprints_previous.get(country) == fingerprint and os.path.isfile(paths.pub_vax_loc(country)):
+            unchanged[country] = task
+            logger.info(f"{country}: UNCHANGED")
+        else:
+            tasks.append(task)
+    return tasks, unchanged, fingerprints, errors
+
+
 def main_process_data(
     paths,
     gsheets_api,
@@ -15,7 +153,18 @@ def main_process_data(
     skip_complete: list = None,
     skip_monotonic: dict = {},
     skip_anomaly: dict = {},
+    incremental: bool = True,
+    parallel: bool = False,
+    n_jobs: int = -2,
 ):
+    """Process the data of all locations and build the combined file.
+
+    If `incremental`, locations whose raw data (and check exceptions) and processing code did not change since the last
+    run are not processed again: their public file is kept, and their rows are taken from the previous combined file.
+
+    If `parallel`, locations are processed in a pool of `n_jobs` processes. In either case, all locations are processed
+    before failing, and the errors of all failed locations are reported together.
+    """
     print("-- Processing data... --")
     # Get data from sheets
     logger.info("Getting data from Google Spreadsheet...")
@@ -33,27 +182,33 @@ def main_process_data(
 
     # vax = [v for v in vax if v.location.iloc[0] == "Pakistan"]  # DEBUG
     # Process locations
-    def _process_location(df):
-        monotonic_check_skip = skip_monotonic.get(df.loc[0, "location"], [])
-        anomaly_check_skip = skip_anomaly.get(df.loc[0, "location"], [])
-        return process_location(df, monotonic_check_skip, anomaly_check_skip)
-
     logger.info("Processing and exporting data...")
+    fingerprints_previous = _load_fingerprints(paths.tmp_vax_process_fingerprints) if incremental else {}
+    tasks, unchanged, fingerprints, errors = _partition_locations(
+        vax, paths, fingerprints_previous, skip_complete, skip_monotonic, skip_anomaly
+    )
+    # Locations missing from the previous combined file are processed after all
+    df_unchanged = _load_processed(paths.tmp_vax_all, set(unchanged))
+    for country in set(unchanged).difference(df_unchanged.get("location", [])):
+        tasks.append(unchanged.pop(country))
+
     vax_valid = []
-    for df in vax:
-        if "location" not in df:
-            raise ValueError(f"Column `location` missing. df: {df.tail(5)}")
-        country = df.loc[0, "location"]
-        if country.lower() not in skip_complete:
-            df = _process_location(df)
+    for country, df, error in _process_locations(tasks, parallel, n_jobs):
+        if error is None:
             vax_valid.append(df)
-            # Export
-            df.to_csv(paths.pub_vax_loc(country), index=False)
             logger.info(f"{country}: SUCCESS ✅")
         else:
-            logger.info(f"{country}: SKIPPED 🚧")
+            errors[country] = error
+            logger.error(f"{country}: FAILED ❌ {error}")
+    if errors:
+        report = "\n".join(f"{country}: {error}" for country, error in errors.items())
+        raise ValueError(f"Processing failed for {len(errors)} locations:\n{report}")
+    logger.info(f"{len(vax_valid)} locations processed, {len(unchanged)} unchanged")
+    if not df_unchanged.empty:
+        vax_valid.insert(0, df_unchanged)
     df = pd.concat(vax_valid).sort_values(by=["location", "date"])
     df.to_csv(paths.tmp_vax_all, index=False)
     gsheet.metadata.to_csv(paths.tmp_met_all, index=False)
+    _save_fingerprints(paths.tmp_vax_process_fingerprints, fingerprints)
     logger.info("Exported ✅")
     print_eoe()
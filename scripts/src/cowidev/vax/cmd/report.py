@@ -0,0 +1,74 @@
+import pandas as pd
+
+from cowidev.vax.cmd.utils import print_eoe
+from cowidev.vax.utils.metrics import RunLog
+
+
+COLUMNS_REPORT = [
+    "name",
+    "success",
+    "wall_time",
+    "cpu_time",
+    "max_rss_mb",
+    "http_requests",
+    "http_bytes",
+    "rows",
+]
+
+
+def _report_slowest(df_run: pd.DataFrame, n_slowest: int):
+    columns = [col for col in COLUMNS_REPORT if col in df_run.columns]
+    df_run = df_run.sort_values("wall_time", ascending=False)[columns].head(n_slowest)
+    # Peak RSS is that of the process running the entry since it started, not of the entry alone
+    df_run = df_run.rename(columns={"max_rss_mb": "process_max_rss_mb"})
+    print(df_run.to_string(index=False))
+
+
+def _report_regressions(
+    df_run: pd.DataFrame,
+    df_previous: pd.DataFrame,
+    regression_ratio: float,
+    min_wall_time: float,
+):
+    latest = df_run.groupby("name").wall_time.last()
+    baseline = df_previous.groupby("name").wall_time.median()
+    df = pd.concat([latest.rename("wall_time"), baseline.rename("baseline")], axis=1, join="inner")
+    df = df[(df.wall_time >= min_wall_time) & (df.wall_time > regression_ratio * df.baseline)]
+    if df.empty:
+        print("No regressions.")
+        return
+    df = df.assign(ratio=(df.wall_time / df.baseline).round(2)).sort_values("ratio", ascending=False)
+    print(df.to_string())
+
+
+def main_report(
+    paths,
+    n_slowest: int = 15,
+    n_runs_baseline: int = 10,
+    regression_ratio: float = 1.5,
+    min_wall_time: float = 5,
+):
+    """Summarise the run log.
+
+    For each step (get-data, process-data, generate-dataset), shows the slowest entries of the latest run, and the
+    entries whose wall time exceeds `regression_ratio` times their median over the previous `n_runs_baseline` runs.
+    """
+    print("-- Run report --")
+    df = RunLog(paths.tmp_vax_run_log).read()
+    if df.empty:
+        print(f"No runs logged in {paths.tmp_vax_run_log}")
+        return
+    for step, df_step in df.groupby("step", sort=False):
+        run_ids = sorted(df_step.run_id.unique())
+        df_run = df_step[df_step.run_id == run_ids[-1]]
+        run_ids_previous = run_ids[-n_runs_baseline - 1 : -1]
+        df_previous = df_step[df_step.run_id.isin(run_ids_previous)]
+        print(
+            f"\n{step}: latest run {run_ids[-1]} ({len(df_run)} entries, {df_run.wall_time.sum():.1f}s, "
+            f"{df_run.success.eq(False).sum()} failed)\n"
+        )
+        print(f"Slowest ({n_slowest}):")
+        _report_slowest(df_run, n_slowest)
+        print(f"\nRegressions (>{regression_ratio}x median of previous {len(run_ids_previous)} runs):")
+        _report_regressions(df_run, df_previous, regression_ratio, min_wall_time)
+    print_eoe()
@@ -1,4 +1,5 @@
 import logging
+import os
 
 
 def get_logger():
@@ -16,6 +17,17 @@ def normalize_country_name(country_name: str):
     return country_name.strip().replace("-", "_").replace(" ", "_").lower()
 
 
+def get_n_workers(n_jobs: int) -> int:
+    """Number of workers for `n_jobs`.
+
+    Same convention as joblib: -1 uses all CPUs, -2 all but one, etc.
+    """
+    n_jobs = int(n_jobs)
+    if n_jobs < 0:
+        n_jobs = os.cpu_count() + 1 + n_jobs
+    return max(n_jobs, 1)
+
+
 def print_eoe():
     print(
         "----------------------------\n----------------------------\n----------------------------\n"
@@ -1,12 +1,12 @@
 from datetime import datetime
 
-import requests
 import pandas as pd
 
 from cowidev.vax.utils.dates import clean_date
 from cowidev.vax.utils.incremental import increment
 from cowidev.vax.utils.who import VACCINES_WHO_MAPPING
 from cowidev.vax.cmd.utils import get_logger
+from cowidev.vax.utils import web
 
 
 logger = get_logger()
@@ -51,7 +51,7 @@ class AfricaCDC:
         return f"{self._base_url}?f=pjson"
 
     def read(self) -> pd.DataFrame:
-        data = requests.get(self.source_url).json()
+        data = web.get(self.source_url).json()
         res = [d["attributes"] for d in data["features"]]
         df = pd.DataFrame(
             res,
@@ -106,7 +106,7 @@ class AfricaCDC:
 
     def pipe_vaccine_who(self, df: pd.DataFrame) -> pd.DataFrame:
         url = "https://covid19.who.int/who-data/vaccination-data.csv"
-        df_who = pd.read_csv(url, usecols=["ISO3", "VACCINES_USED"]).rename(
+        df_who = web.read_csv_from_url(url, usecols=["ISO3", "VACCINES_USED"]).rename(
             columns={"VACCINES_USED": "vaccine"}
         )
         df_who = df_who.dropna(subset=["vaccine"])
@@ -127,7 +127,7 @@ class AfricaCDC:
         return df.assign(date=self._parse_date())
 
     def _parse_date(self):
-        res = requests.get(self.source_url_date).json()
+        res = web.get(self.source_url_date).json()
         edit_ts = res["editingInfo"]["lastEditDate"]
         return clean_date(datetime.fromtimestamp(edit_ts / 1000))
 
@@ -2,10 +2,11 @@ import pandas as pd
 
 from cowidev.vax.utils.incremental import enrich_data, increment
 from cowidev.vax.utils.dates import localdate
+from cowidev.vax.utils import web
 
 
 def read(source: str) -> pd.Series:
-    df = pd.read_csv(
+    df = web.read_csv_from_url(
         source,
         usecols=[
             "primera_dosis_cantidad",
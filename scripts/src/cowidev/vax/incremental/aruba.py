@@ -1,12 +1,12 @@
-import requests
 import pandas as pd
 
 from cowidev.vax.utils.incremental import enrich_data, increment
 from cowidev.vax.utils.dates import localdate
+from cowidev.vax.utils import web
 
 
 def read(source: str) -> pd.Series:
-    data = requests.get(source).json()
+    data = web.get(source).json()
     for count in data:
         if count[0] == "2nd Vaccine taken":
             people_fully_vaccinated = count[1]
@@ -2,7 +2,6 @@ from multiprocessing.sharedctypes import Value
 import tempfile
 import re
 
-import requests
 import pandas as pd
 from bs4 import BeautifulSoup
 import PyPDF2
@@ -11,6 +10,7 @@ from pdfreader import SimplePDFViewer
 from cowidev.vax.utils.incremental import enrich_data, increment
 from cowidev.vax.utils.utils import get_soup
 from cowidev.vax.utils.dates import clean_date
+from cowidev.vax.utils import web
 
 
 def read(source: str):
@@ -30,7 +30,7 @@ def parse_pdf_link(soup: BeautifulSoup, source: str):
 def parse_data(source_pdf: str):
     with tempfile.NamedTemporaryFile() as tf:
         with open(tf.name, mode="wb") as f:
-            f.write(requests.get(source_pdf).content)
+            f.write(web.get(source_pdf).content)
         (
             total_vaccinations,
             people_vaccinated,
@@ -1,15 +1,15 @@
 import re
 
-import requests
 import pandas as pd
 from bs4 import BeautifulSoup
 
 from cowidev.vax.utils.incremental import enrich_data, increment
 from cowidev.vax.utils.dates import localdate
+from cowidev.vax.utils import web
 
 
 def read(source: str) -> pd.Series:
-    soup = BeautifulSoup(requests.get(source).content, "html.parser")
+    soup = BeautifulSoup(web.get(source).content, "html.parser")
     return parse_data(soup)
 
 
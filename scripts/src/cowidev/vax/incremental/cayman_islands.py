@@ -1,15 +1,15 @@
 import re
-import requests
 
 from bs4 import BeautifulSoup
 import pandas as pd
 
 from cowidev.vax.utils.incremental import enrich_data, increment, clean_count
 from cowidev.vax.utils.dates import localdate
+from cowidev.vax.utils import web
 
 
 def read(source: str) -> pd.Series:
-    soup = BeautifulSoup(requests.get(source).content, "html.parser")
+    soup = BeautifulSoup(web.get(source).content, "html.parser")
     data = parse_data(soup)
     return enrich_data(data, "source_url", source)
 
@@ -1,14 +1,14 @@
 from datetime import timedelta
-import requests
 
 import pandas as pd
 
 from cowidev.vax.utils.incremental import enrich_data, increment
+from cowidev.vax.utils import web
 
 
 def read(source: str) -> pd.Series:
 
-    data = requests.get(source).json()
+    data = web.get(source).json()
 
     total_vaccinations = data[0]["CijepljenjeBrUtrosenihDoza"]
     people_vaccinated = data[0]["CijepljeniJednomDozom"]
@@ -1,8 +1,8 @@
-import requests
 import pandas as pd
 
 from cowidev.vax.utils.incremental import enrich_data, increment
 from cowidev.vax.utils.dates import localdate
+from cowidev.vax.utils import web
 
 
 def read(source: str) -> pd.Series:
@@ -17,7 +17,7 @@ def read(source: str) -> pd.Series:
 
 
 def parse_data(source: str) -> dict:
-    data = requests.get(source).json()
+    data = web.get(source).json()
     return {d["code"]: d["count"] for d in data["stats"]}
 
 
@@ -1,10 +1,9 @@
-import requests
-
 import pandas as pd
 
 from cowidev.vax.utils.utils import clean_count
 from cowidev.vax.utils.incremental import enrich_data, increment
 from cowidev.vax.utils.dates import localdate
+from cowidev.vax.utils import web
 
 
 class FaeroeIslands:
@@ -14,7 +13,7 @@ class FaeroeIslands:
         self.location = location
 
     def read(self) -> pd.Series:
-        data = requests.get(self.source_url).json()["stats"]
+        data = web.get(self.source_url).json()["stats"]
         return pd.DataFrame.from_records(data).iloc[0]
 
     def pipe_metrics(self, ds: pd.Series) -> pd.Series:
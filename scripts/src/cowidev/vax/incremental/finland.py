@@ -2,10 +2,11 @@ import pandas as pd
 
 from cowidev.vax.utils.incremental import enrich_data, increment
 from cowidev.vax.utils.dates import localdate
+from cowidev.vax.utils import web
 
 
 def read(source: str) -> pd.Series:
-    data = pd.read_csv(source, sep=";")
+    data = web.read_csv_from_url(source, sep=";")
     return parse_data(data).pipe(enrich_data, "date", get_date())
 
 
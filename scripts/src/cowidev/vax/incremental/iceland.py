@@ -1,11 +1,11 @@
 import json
 
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 
 from cowidev.vax.utils.incremental import increment, clean_count
 from cowidev.vax.utils.files import export_metadata
+from cowidev.vax.utils import web
 
 
 VACCINE_PROTOCOLS = {
@@ -19,7 +19,7 @@ VACCINE_PROTOCOLS = {
 def main(paths):
 
     url = "https://e.infogram.com/c3bc3569-c86d-48a7-9d4c-377928f102bf"
-    soup = BeautifulSoup(requests.get(url).content, "html.parser")
+    soup = BeautifulSoup(web.get(url).content, "html.parser")
 
     for script in soup.find_all("script"):
         if "infographicData" in str(script):
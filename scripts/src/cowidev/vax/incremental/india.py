@@ -1,8 +1,8 @@
-import requests
 import pandas as pd
 
 from cowidev.vax.utils.incremental import enrich_data, increment
 from cowidev.vax.utils.dates import localdate
+from cowidev.vax.utils import web
 
 
 class India:
@@ -22,7 +22,7 @@ class India:
         }
 
     def read(self):
-        data = requests.get(self.source_url[self.source_name]).json()
+        data = web.get(self.source_url[self.source_name]).json()
         if self.source_name == "mohfw":
             return self.read_mohfw(data)
         elif self.source_name == "cowin":
@@ -2,13 +2,13 @@ from datetime import datetime
 from bs4 import BeautifulSoup
 
 import pandas as pd
-import requests
 import json
 import re
 
 from cowidev.vax.utils.incremental import enrich_data, increment
 from cowidev.vax.utils.utils import get_soup
 from cowidev.vax.utils.dates import localdate
+from cowidev.vax.utils import web
 
 
 def read(dose1_source: str, dose2_source: str) -> pd.Series:
@@ -33,7 +33,7 @@ def parse_data(dose1_soup: BeautifulSoup, dose2_soup: BeautifulSoup) -> pd.Serie
 def parse_tableau(soup: BeautifulSoup) -> int:
     tableauData = json.loads(soup.find("textarea", {"id": "tsConfigContainer"}).text)
     dataUrl = f'https://public.tableau.com{tableauData["vizql_root"]}/bootstrapSession/sessions/{tableauData["sessionid"]}'
-    r = requests.post(dataUrl, data={"sheet_id": tableauData["sheetId"]})
+    r = web.post(dataUrl, data={"sheet_id": tableauData["sheetId"]})
     dataReg = re.search(r"\d+;({.*})\d+;({.*})", r.text, re.MULTILINE)
     data = json.loads(dataReg.group(2))
     return data["secondaryInfo"]["presModelMap"]["dataDictionary"]["presModelHolder"][
@@ -1,11 +1,11 @@
 from datetime import datetime
 
-import requests
 import pandas as pd
 
 from cowidev.vax.utils.incremental import enrich_data, increment
 from cowidev.vax.utils.files import load_query
 from cowidev.vax.utils.dates import clean_date
+from cowidev.vax.utils import web
 
 
 class Ireland:
@@ -39,7 +39,7 @@ class Ireland:
 
     def parse_doses(self) -> str:
         params = load_query("ireland-doses", to_str=False)
-        data = requests.get(self.endpoint_doses, params=params).json()
+        data = web.get(self.endpoint_doses, params=params).json()
         res = data["features"][0]["attributes"]
         return {
             "dose_1": res["firstDose"],
@@ -49,7 +49,7 @@ class Ireland:
 
     def parse_vaccines_manufacturer(self):
         params = load_query("ireland-doses-manufacturer", to_str=False)
-        data = requests.get(self.endpoint_vaccines_manufacturer, params=params).json()
+        data = web.get(self.endpoint_vaccines_manufacturer, params=params).json()
         res = data["features"][0]["attributes"]
         return {
             "pfizer": res["pf"],
@@ -1,15 +1,15 @@
 import json
 
-import requests
 import pandas as pd
 
 from cowidev.vax.utils.incremental import enrich_data, increment
 from cowidev.vax.utils.dates import localdate
+from cowidev.vax.utils import web
 
 
 def get_api_value(source: str, query: str, headers: dict):
     query = json.loads(query)
-    data = requests.post(source, json=query, headers=headers).json()
+    data = web.post(source, json=query, headers=headers).json()
     value = int(data["hits"]["total"])
     return value
 
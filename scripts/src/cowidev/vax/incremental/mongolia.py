@@ -1,8 +1,8 @@
-import requests
 import pandas as pd
 
 from cowidev.vax.utils.incremental import enrich_data, increment
 from cowidev.vax.utils.dates import clean_date
+from cowidev.vax.utils import web
 
 
 vaccine_mapping = {
@@ -16,7 +16,7 @@ vaccine_mapping = {
 
 
 def read(source: str) -> pd.Series:
-    data = requests.get(source).json()
+    data = web.get(source).json()
     return parse_data(data)
 
 
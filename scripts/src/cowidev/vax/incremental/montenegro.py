@@ -1,11 +1,11 @@
-import requests
 import pandas as pd
 
 from cowidev.vax.utils.incremental import enrich_data, increment
+from cowidev.vax.utils import web
 
 
 def read(source: str) -> pd.Series:
-    data = requests.get(source).json()
+    data = web.get(source).json()
     return parse_data(data)
 
 
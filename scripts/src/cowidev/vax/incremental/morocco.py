@@ -1,11 +1,11 @@
 import re
 
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 
 from cowidev.vax.utils.incremental import enrich_data, increment
 from cowidev.vax.utils.dates import localdate
+from cowidev.vax.utils import web
 
 
 def read(source: str) -> pd.Series:
@@ -18,7 +18,7 @@ def read(source: str) -> pd.Series:
         "Pragma": "no-cache",
         "Cache-Control": "no-cache",
     }
-    soup = BeautifulSoup(requests.get(source, headers=headers).content, "html.parser")
+    soup = BeautifulSoup(web.get(source, headers=headers).content, "html.parser")
     return parse_data(soup)
 
 
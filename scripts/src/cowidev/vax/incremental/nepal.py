@@ -2,7 +2,6 @@ import tempfile
 import re
 from datetime import datetime
 
-import requests
 import pandas as pd
 import PyPDF2
 from selenium import webdriver
@@ -10,6 +9,7 @@ from selenium.webdriver.chrome.options import Options
 
 from cowidev.vax.utils.incremental import clean_count, enrich_data, increment
 from cowidev.vax.utils.dates import clean_date
+from cowidev.vax.utils import web
 
 class Nepal:
     def __init__(self):
@@ -45,7 +45,7 @@ class Nepal:
     def _get_text_from_pdf(self, url_pdf: str) -> str:
         with tempfile.NamedTemporaryFile() as tf:
             with open(tf.name, mode="wb") as f:
-                f.write(requests.get(url_pdf).content)
+                f.write(web.get(url_pdf).content)
             with open(tf.name, mode="rb") as f:
                 reader = PyPDF2.PdfFileReader(f)
                 page = reader.getPage(0)
@@ -11,6 +11,7 @@ from cowidev.vax.utils.utils import get_soup, get_driver
 from cowidev.vax.utils.dates import clean_date
 from cowidev.vax.utils.incremental import increment
 from cowidev.vax.utils.who import VACCINES_WHO_MAPPING
+from cowidev.vax.utils import web
 from cowidev.vax.cmd.utils import get_logger
 
 
@@ -138,7 +139,9 @@ class PAHO:
 
     def pipe_vaccine(self, df: pd.DataFrame) -> pd.DataFrame:
         url = "https://covid19.who.int/who-data/vaccination-data.csv"
-        df_who = pd.read_csv(url, usecols=["ISO3", "VACCINES_USED"]).rename(columns={"VACCINES_USED": "vaccine"})
+        df_who = web.read_csv_from_url(url, usecols=["ISO3", "VACCINES_USED"]).rename(
+            columns={"VACCINES_USED": "vaccine"}
+        )
         df_who = df_who.dropna(subset=["vaccine"])
         df_who = df_who.assign(
             vaccine=df_who.vaccine.apply(
@@ -1,11 +1,11 @@
 from datetime import datetime, timedelta
 
-import requests
 import pandas as pd
 
 from cowidev.vax.utils.incremental import enrich_data, increment
 from cowidev.vax.utils.files import load_query
 from cowidev.vax.utils.dates import clean_date
+from cowidev.vax.utils import web
 
 
 class Poland:
@@ -23,7 +23,7 @@ class Poland:
 
     def read(self) -> pd.Series:
         params = load_query("poland-all", to_str=False)
-        data = requests.get(self.source_url, params=params).json()["features"][0][
+        data = web.get(self.source_url, params=params).json()["features"][0][
             "attributes"
         ]
         return pd.Series(data)
@@ -1,11 +1,11 @@
 import re
-import requests
 
 from bs4 import BeautifulSoup
 import pandas as pd
 
 from cowidev.vax.utils.incremental import enrich_data, increment, clean_count
 from cowidev.vax.utils.dates import clean_date
+from cowidev.vax.utils import web
 
 
 def read(source: str) -> pd.Series:
@@ -20,7 +20,7 @@ def read(source: str) -> pd.Series:
         "Pragma": "no-cache",
         "Cache-Control": "no-cache",
     }
-    soup = BeautifulSoup(requests.get(source, headers=headers).content, "html.parser")
+    soup = BeautifulSoup(web.get(source, headers=headers).content, "html.parser")
 
     text = soup.find("div", id="data").find("p").text
 
@@ -1,4 +1,3 @@
-import requests
 import re
 
 import pandas as pd
@@ -6,11 +5,12 @@ from bs4 import BeautifulSoup
 
 from cowidev.vax.utils.incremental import enrich_data, increment, clean_count
 from cowidev.vax.utils.dates import clean_date
+from cowidev.vax.utils import web
 
 
 def read(source: str) -> pd.Series:
     soup = BeautifulSoup(
-        requests.get(source, verify=False).content, "html.parser"
+        web.get(source, verify=False).content, "html.parser"
     )  # noqa: S501
     return parse_data(soup)
 
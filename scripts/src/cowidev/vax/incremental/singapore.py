@@ -1,5 +1,4 @@
 import re
-import requests
 
 from bs4 import BeautifulSoup
 import pandas as pd
@@ -7,6 +6,7 @@ import pandas as pd
 from cowidev.vax.utils.incremental import enrich_data, increment, clean_count
 from cowidev.vax.utils.utils import get_soup
 from cowidev.vax.utils.dates import clean_date
+from cowidev.vax.utils import web
 
 
 class Singapore:
@@ -15,7 +15,7 @@ class Singapore:
         self.feed_url = "https://www.moh.gov.sg/feeds/news-highlights"
 
     def find_article(self) -> str:
-        soup = BeautifulSoup(requests.get(self.feed_url).content, "lxml")
+        soup = BeautifulSoup(web.get(self.feed_url).content, "lxml")
         for link in soup.find_all("item"):
             elements = link.children
             for elem in elements:
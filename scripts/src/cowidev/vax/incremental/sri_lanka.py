@@ -1,5 +1,4 @@
 import re
-import requests
 import tempfile
 import itertools
 
@@ -10,6 +9,7 @@ import PyPDF2
 from cowidev.vax.utils.incremental import increment
 from cowidev.vax.utils.dates import clean_date
 from cowidev.vax.utils.utils import get_soup, clean_count
+from cowidev.vax.utils import web
 
 
 vaccines_mapping = {
@@ -81,7 +81,7 @@ class SriLanka:
     def _extract_text_from_pdf(self, pdf_path):
         with tempfile.NamedTemporaryFile() as tf:
             with open(tf.name, mode="wb") as f:
-                f.write(requests.get(pdf_path).content)
+                f.write(web.get(pdf_path).content)
             with open(tf.name, mode="rb") as f:
                 reader = PyPDF2.PdfFileReader(f)
                 page = reader.getPage(0)
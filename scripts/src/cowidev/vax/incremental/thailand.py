@@ -1,5 +1,4 @@
 import re
-import requests
 from datetime import datetime
 import tempfile
 
@@ -13,6 +12,7 @@ from cowidev.vax.utils.incremental import (
 )
 from cowidev.vax.utils.utils import get_soup
 from cowidev.vax.utils.dates import clean_date
+from cowidev.vax.utils import web
 
 
 class Thailand:
@@ -70,7 +70,7 @@ class Thailand:
     def _text_from_pdf(self, pdf_link: str):
         with tempfile.NamedTemporaryFile() as tf:
             with open(tf.name, mode="wb") as f:
-                f.write(requests.get(pdf_link).content)
+                f.write(web.get(pdf_link).content)
 
             with open(tf.name, mode="rb") as f:
                 viewer = SimplePDFViewer(f)
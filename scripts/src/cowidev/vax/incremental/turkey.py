@@ -1,11 +1,11 @@
 import re
 
-import requests
 import pandas as pd
 from bs4 import BeautifulSoup
 
 from cowidev.vax.utils.incremental import enrich_data, increment, clean_count
 from cowidev.vax.utils.dates import clean_date
+from cowidev.vax.utils import web
 
 
 METRIC_LABELS = {
@@ -16,7 +16,7 @@ METRIC_LABELS = {
 
 
 def read(source: str) -> pd.Series:
-    soup = BeautifulSoup(requests.get(source).content, "html.parser")
+    soup = BeautifulSoup(web.get(source).content, "html.parser")
     return parse_data(soup)
 
 
@@ -3,11 +3,11 @@ import pandas as pd
 from glob import glob
 import re
 
-import requests
 
 from cowidev.vax.utils.incremental import enrich_data, increment
 from cowidev.vax.utils.dates import clean_date
 from cowidev.vax.utils.files import export_metadata
+from cowidev.vax.utils import web
 
 
 vaccines_mapping = {
@@ -38,7 +38,7 @@ class UnitedStates:
 
     def _parse_data(self):
         # Request data
-        data = requests.get(self.source_url).json()
+        data = web.get(self.source_url).json()
         data = data["vaccination_data"]
         # Get only US data (total)
         data = [d for d in data if d["ShortName"] == "USA"]
@@ -105,7 +105,7 @@ class UnitedStates:
         return df
 
     def read_age(self) -> pd.DataFrame:
-        data = requests.get(self.source_url_age).json()
+        data = web.get(self.source_url_age).json()
         age_groups_accepted = {
             #     'Ages_<12yrs',
             #     'Ages_12-15_yrs',
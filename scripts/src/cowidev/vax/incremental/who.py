@@ -1,9 +1,13 @@
+from io import BytesIO
+
 import pandas as pd
 import numpy as np
 
 from cowidev.vax.utils.incremental import increment
 from cowidev.vax.utils.checks import VACCINES_ONE_DOSE
 from cowidev.vax.utils.who import VACCINES_WHO_MAPPING
+from cowidev.vax.utils.web import HTTPCache, file_fingerprint
+from cowidev.vax.utils import web
 from cowidev.vax.cmd.utils import get_logger
 
 
@@ -80,8 +84,10 @@ class WHO:
         self.source_url = "https://covid19.who.int/who-data/vaccination-data.csv"
         self.source_url_ref = "https://covid19.who.int/"
 
-    def read(self) -> pd.DataFrame:
-        return pd.read_csv(self.source_url)
+    def read(self, content: bytes = None) -> pd.DataFrame:
+        if content is None:
+            return web.read_csv_from_url(self.source_url)
+        return pd.read_csv(BytesIO(content))
 
     def pipe_checks(self, df: pd.DataFrame) -> pd.DataFrame:
         if len(df) > 300:
@@ -154,6 +160,8 @@ class WHO:
         return df
 
     def increment_countries(self, df: pd.DataFrame, paths):
+        """Increment the data of each country, return paths of the files written."""
+        outputs = []
         for row in df.sort_values("COUNTRY").iterrows():
             row = row[1]
             cond = (
@@ -179,7 +187,9 @@ class WHO:
                     source_url=self.source_url_ref,
                 )
                 country = row["COUNTRY"]
+                outputs.append(paths.tmp_vax_out(country))
                 logger.info(f"\tvax.incremental.who.{country}: SUCCESS ✅")
+        return outputs
 
     def pipeline(self, df: pd.DataFrame):
         return (
@@ -192,8 +202,16 @@ class WHO:
         )
 
     def export(self, paths):
-        df = self.read().pipe(self.pipeline)
-        self.increment_countries(df, paths)
+        # Skip if source and code unchanged since last successful export, and outputs still exist
+        cache = HTTPCache(paths.tmp_http_cache)
+        fingerprint = file_fingerprint(__file__)
+        response = cache.get(self.source_url, fingerprint=fingerprint)
+        if response.unchanged:
+            logger.info("vax.incremental.who: source not modified, skipping")
+            return
+        df = self.read(response.content).pipe(self.pipeline)
+        outputs = self.increment_countries(df, paths)
+        cache.mark_processed(self.source_url, fingerprint=fingerprint, outputs=outputs)
 
 
 def main(paths):
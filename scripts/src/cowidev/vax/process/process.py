@@ -2,37 +2,53 @@ from datetime import datetime
 import pandas as pd
 
 from cowidev.vax.utils.checks import country_df_sanity_checks
-from cowidev.vax.utils.dates import clean_date
+from cowidev.vax.utils.dates import DATE_FORMAT
 from cowidev.vax.process.urls import clean_urls
 
 
+COLUMNS_INT = [
+    "total_vaccinations",
+    "people_vaccinated",
+    "people_partly_vaccinated",
+    "people_fully_vaccinated",
+    "total_boosters",
+]
+
+
+def _to_int(ds: pd.Series) -> pd.Series:
+    # Integer columns are cast directly, others via float (e.g. strings or floats with NaNs)
+    if pd.api.types.is_integer_dtype(ds):
+        return ds.astype("Int64")
+    return ds.astype(float).astype("Int64")
+
+
+def _strip(ds: pd.Series) -> pd.Series:
+    # Non-string values (NaN in str accessor output) are kept as they are
+    try:
+        ds_stripped = ds.str.strip()
+    except AttributeError:  # no string values
+        return ds
+    return ds_stripped.where(ds_stripped.notna(), ds)
+
+
 def process_location(
     df: pd.DataFrame, monotonic_check_skip: list = [], anomaly_check_skip: list = []
 ) -> pd.DataFrame:
-    # print(df.tail(1))
     # Only report up to previous day to avoid partial reporting
     df = df.assign(date=pd.to_datetime(df.date, dayfirst=True))
-    df = df[df.date.dt.date < datetime.now().date()]
+    df = df[df.date < pd.Timestamp(datetime.now().date())]
     # Default columns for second doses
-    if "people_vaccinated" not in df:
-        df = df.assign(people_vaccinated=pd.NA)
-        df.people_vaccinated = df.people_vaccinated.astype("Int64")
-    if "people_fully_vaccinated" not in df:
-        df = df.assign(people_fully_vaccinated=pd.NA)
-        df.people_fully_vaccinated = df.people_fully_vaccinated.astype("Int64")
-    if "total_boosters" not in df:
-        df = df.assign(total_boosters=pd.NA)
-        df.total_boosters = df.total_boosters.astype("Int64")
+    cols_default = ["people_vaccinated", "people_fully_vaccinated", "total_boosters"]
+    df = df.assign(
+        **{
+            col: pd.Series(pd.NA, index=df.index, dtype="Int64")
+            for col in cols_default
+            if col not in df
+        }
+    )
     # Avoid decimals
-    cols = [
-        "total_vaccinations",
-        "people_vaccinated",
-        "people_partly_vaccinated",
-        "people_fully_vaccinated",
-        "total_boosters",
-    ]
-    cols = df.columns.intersection(cols).tolist()
-    df[cols] = df[cols].astype(float).astype("Int64").fillna(pd.NA)
+    cols = df.columns.intersection(COLUMNS_INT).tolist()
+    df = df.assign(**{col: _to_int(df[col]) for col in cols})
     # Order columns and rows
     usecols = [
         "location",
@@ -49,10 +65,12 @@ def process_location(
         monotonic_check_skip=monotonic_check_skip,
         anomaly_check_skip=anomaly_check_skip,
     )
-    # Strip
-    df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
-    # Date format
-    df = df.assign(date=df.date.apply(clean_date))
+    # Strip and date format
+    cols_str = df.select_dtypes(include="object").columns
+    df = df.assign(
+        **{col: _strip(df[col]) for col in cols_str},
+        date=df.date.dt.strftime(DATE_FORMAT),
+    )
     # Clean URLs
     df = clean_urls(df)
     return df
@@ -9,15 +9,25 @@ regex_facebook = (
 )
 
 
-def clean_urls(df: pd.DataFrame) -> pd.DataFrame:
+def _clean_url_values(urls: pd.Series) -> pd.Series:
     # Twitter
-    msk = df.source_url.str.match(regex_twitter)
-    df.loc[msk, "source_url"] = df.loc[msk, "source_url"].str.extract(regex_twitter)[0]
+    msk = urls.str.match(regex_twitter)
+    urls[msk] = urls[msk].str.extract(regex_twitter)[0]
 
     # Facebook
-    msk = df.source_url.str.fullmatch(regex_facebook)
-    df.loc[msk, "source_url"] = (
-        "https://www." + df.loc[msk, "source_url"].str.extract(regex_facebook)[1]
-    )
+    msk = urls.str.fullmatch(regex_facebook)
+    urls[msk] = "https://www." + urls[msk].str.extract(regex_facebook)[1]
+
+    return urls
 
+
+def clean_urls(df: pd.DataFrame) -> pd.DataFrame:
+    # Locations use few distinct urls, so these are cleaned once and mapped back
+    urls = pd.Series(df.source_url.unique())
+    urls_clean = _clean_url_values(urls.copy())
+    msk = urls != urls_clean
+    if msk.any():
+        df = df.assign(
+            source_url=df.source_url.replace(dict(zip(urls[msk], urls_clean[msk])))
+        )
     return df
@@ -194,9 +194,7 @@ class CountryChecker:
                 raise ValueError(
                     f"{self.location} -- total_vaccinations can't be < people_fully_vaccinated!"
                 )
-        if ("total_vaccinations" in df.columns) and (
-            "total_boosters" in df.columns
-        ):
+        if ("total_vaccinations" in df.columns) and ("total_boosters" in df.columns):
             df_ = df[["total_boosters", "total_vaccinations"]].dropna().copy()
             if (df_["total_vaccinations"] < df_["total_boosters"]).any():
                 raise ValueError(
@@ -252,3 +250,213 @@ class CountryChecker:
         self.check_location()
         # Metrics checks
         self.check_metrics()
+
+
+def _skip_check_keys(check_skip: dict) -> set:
+    # Keys (location, YYYYMMDD, metric) of violations to ignore, from config exceptions
+    keys = set()
+    for location, skips in check_skip.items():
+        for x in skips:
+            metrics = x["metrics"] if isinstance(x["metrics"], list) else [x["metrics"]]
+            keys.update((location, x["date"].strftime("%Y%m%d"), m) for m in metrics)
+    return keys
+
+
+class LocationsChecker:
+    """Checks of CountryChecker, run on the data of all locations at once.
+
+    Checks are vectorised over the concatenated table, grouping by location where needed. Instead of raising on the
+    first error, all violations are collected in a table with columns `location`, `date`, `metric` and `rule`. Checks
+    only run on the columns present in the table.
+
+    Unlike CountryChecker, only columns `location`, `date` and `total_vaccinations` (and those in `bounds`) are
+    required, since other steps drop `vaccine` and `source_url`. Extra columns are allowed. Missing required columns
+    raise a ValueError, as they apply to all locations.
+
+    Args:
+        df (pd.DataFrame): Data of all locations.
+        monotonic_check_skip (dict): Exceptions to monotonicity checks, by location (see CountryChecker).
+        anomaly_check_skip (dict): Exceptions to anomaly checks, by location (see CountryChecker).
+        monotonic (bool): Check that metrics are monotonically increasing.
+        inequalities (bool): Check inequalities between metrics (e.g. total_vaccinations >= people_vaccinated).
+        anomalies (bool): Check for anomalous jumps in metrics.
+        bounds (dict): Bounds of metrics, as {metric: (min, max)}. Use None for no bound.
+        skip_locations (list): Locations that are not checked.
+    """
+
+    metrics = [
+        "total_vaccinations",
+        "people_vaccinated",
+        "people_fully_vaccinated",
+        "total_boosters",
+    ]
+    metric_inequalities = [
+        ("total_vaccinations", "people_vaccinated"),
+        ("total_vaccinations", "people_fully_vaccinated"),
+        ("total_vaccinations", "total_boosters"),
+        ("people_vaccinated", "people_fully_vaccinated"),
+    ]
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        monotonic_check_skip: dict = {},
+        anomaly_check_skip: dict = {},
+        monotonic: bool = True,
+        inequalities: bool = True,
+        anomalies: bool = True,
+        bounds: dict = {},
+        skip_locations: list = [],
+    ):
+        self.check_column_names(df, list(bounds))
+        df = df[~df.location.isin(skip_locations)]
+        self.df = df.assign(date=pd.to_datetime(df.date)).sort_values(
+            ["location", "date"]
+        )
+        self.skip_monocheck_keys = _skip_check_keys(monotonic_check_skip)
+        self.skip_anomalcheck_keys = _skip_check_keys(anomaly_check_skip)
+        self.monotonic = monotonic
+        self.inequalities = inequalities
+        self.anomalies = anomalies
+        self.bounds = bounds
+
+    @staticmethod
+    def check_column_names(df: pd.DataFrame, cols_extra: list = []):
+        cols = ["location", "date", "total_vaccinations"] + cols_extra
+        cols_missing = [col for col in cols if col not in df.columns]
+        if cols_missing:
+            raise ValueError(f"df missing column(s): {cols_missing}.")
+
+    @property
+    def metrics_present(self):
+        return [col for col in self.metrics if col in self.df.columns]
+
+    def _violations(self, msk: pd.Series, metric: str, rule: str) -> pd.DataFrame:
+        return self.df.loc[msk, ["location", "date"]].assign(metric=metric, rule=rule)
+
+    def _drop_skipped(self, violations: pd.DataFrame, skip_keys: set) -> pd.DataFrame:
+        if violations.empty or not skip_keys:
+            return violations
+        keys = zip(
+            violations.location,
+            violations.date.dt.strftime("%Y%m%d"),
+            violations.metric,
+        )
+        return violations[[key not in skip_keys for key in keys]]
+
+    def check_nulls(self):
+        cols = ["location", "date", "vaccine", "source_url"]
+        return [
+            self._violations(self.df[col].isnull(), col, "not_null")
+            for col in cols
+            if col in self.df.columns
+        ]
+
+    def check_vaccine(self):
+        if "vaccine" not in self.df.columns:
+            return []
+        # Few distinct values, so these are validated once
+        values = self.df.vaccine.dropna().unique()
+        values_wrong = [
+            v for v in values if not set(v.split(", ")).issubset(VACCINES_ACCEPTED)
+        ]
+        msk = self.df.vaccine.isin(values_wrong)
+        return [self._violations(msk, "vaccine", "accepted_vaccine")]
+
+    def check_date(self):
+        date = self.df.date
+        msk_range = (date < datetime(2020, 12, 1)) | (
+            date.dt.normalize() > pd.Timestamp(datetime.now().date())
+        )
+        msk_duplicated = self.df.duplicated(subset=["location", "date"], keep=False)
+        return [
+            self._violations(msk_range, "date", "date_range"),
+            self._violations(msk_duplicated & date.notnull(), "date", "unique_date"),
+        ]
+
+    def check_monotonic(self):
+        violations = []
+        for metric in self.metrics_present:
+            df = self.df.dropna(subset=[metric])
+            diff = df.groupby("location")[metric].diff()
+            msk = (diff < 0).reindex(self.df.index, fill_value=False).fillna(False)
+            violations.append(self._violations(msk, metric, "monotonic"))
+        violations = pd.concat(violations, ignore_index=True)
+        return [self._drop_skipped(violations, self.skip_monocheck_keys)]
+
+    def check_inequalities(self):
+        violations = []
+        for metric_high, metric_low in self.metric_inequalities:
+            if {metric_high, metric_low}.issubset(self.df.columns):
+                msk = (self.df[metric_high] < self.df[metric_low]).fillna(False)
+                violations.append(
+                    self._violations(msk, metric_high, f">= {metric_low}")
+                )
+        return violations
+
+    def check_anomalies(self, th=6):
+        violations = []
+        for metric in self.metrics_present:
+            # Get metric values above 10,000. Rows without location or date are reported by `check_nulls`
+            values = self.df[metric].astype(float)
+            msk = (values > 10000) & self.df.location.notnull() & self.df.date.notnull()
+            df = self.df.loc[msk, ["location", "date"]].assign(value=values)
+            # Compute rolling average, 7 days. NaNs are filled with non-smoothed values
+            # Rows are sorted by location and date, so results align by position
+            m = (
+                df.set_index("date")
+                .groupby("location")
+                .value.rolling("7d", min_periods=2)
+                .mean()
+                .groupby(level=0)
+                .shift(1)
+                .to_numpy()
+            )
+            m = pd.Series(m, index=df.index).fillna(df.value)
+            # Ratio between value and rolling average
+            msk = (df.value / (m + 1e-9) > th).reindex(self.df.index, fill_value=False)
+            violations.append(self._violations(msk, metric, "anomaly"))
+        violations = pd.concat(violations, ignore_index=True)
+        return [self._drop_skipped(violations, self.skip_anomalcheck_keys)]
+
+    def check_bounds(self):
+        violations = []
+        for metric, (lower, upper) in self.bounds.items():
+            values = self.df[metric]
+            msk = pd.Series(False, index=self.df.index)
+            if lower is not None:
+                msk |= (values < lower).fillna(False)
+            if upper is not None:
+                msk |= (values > upper).fillna(False)
+            violations.append(self._violations(msk, metric, "bounds"))
+        return violations
+
+    def run(self) -> pd.DataFrame:
+        """Run all checks.
+
+        Returns:
+            pd.DataFrame: Violations, one row per location, date, metric and rule.
+        """
+        violations = self.check_nulls() + self.check_vaccine() + self.check_date()
+        if self.monotonic:
+            violations += self.check_monotonic()
+        if self.inequalities:
+            violations += self.check_inequalities()
+        if self.anomalies:
+            violations += self.check_anomalies()
+        violations += self.check_bounds()
+        columns = ["location", "date", "metric", "rule"]
+        violations = [v for v in violations if not v.empty]
+        if not violations:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(violations, ignore_index=True)[columns]
+
+    def raise_for_violations(self):
+        """Run all checks and raise an error listing all violations, if any."""
+        violations = self.run()
+        if not violations.empty:
+            summary = violations.groupby(["location", "metric", "rule"]).size()
+            raise ValueError(
+                f"{len(violations)} check violations found:\n{summary.to_string()}"
+                f"\n\nDetails:\n{violations.to_string(index=False)}"
+            )
@@ -1,4 +1,5 @@
 import os
+from io import BytesIO
 import datetime
 import re
 import numbers
@@ -6,6 +7,8 @@ import numbers
 import pandas as pd
 import requests
 
+from cowidev.vax.utils.web import HTTPCache
+
 
 GH_LINK = "https://github.com/owid/covid-19-data/raw/master/public/data/vaccinations/country_data"
 
@@ -47,8 +50,13 @@ def increment(
     filepath_automated = paths.tmp_vax_out(location)
     filepath_public = f"{GH_LINK}/{location}.csv".replace(" ", "%20")
     # Move from public to output folder
-    if not os.path.isfile(filepath_automated) and requests.get(filepath_public).ok:
-        pd.read_csv(filepath_public).to_csv(filepath_automated, index=False)
+    if not os.path.isfile(filepath_automated):
+        try:
+            response = HTTPCache(paths.tmp_http_cache).get(filepath_public)
+        except requests.HTTPError:
+            pass
+        else:
+            pd.read_csv(BytesIO(response.content)).to_csv(filepath_automated, index=False)
     # Update file in output/
     if os.path.isfile(filepath_automated):
         df = _increment(
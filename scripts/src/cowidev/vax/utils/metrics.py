@@ -0,0 +1,105 @@
+"""Per-module run metrics.
+
+Steps of the pipeline (country modules in get-data, countries in process-data, steps of generate-dataset) are wrapped
+with `track`, which records wall time, CPU time, peak RSS, HTTP requests/bytes (sent via `cowidev.vax.utils.web`) and
+rows produced. Records are appended to a JSON-lines run log, which `vax report` summarises.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import os
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from cowidev.vax.utils import web
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Identifies all records of one execution (also shared by forked module processes)
+RUN_ID = datetime.utcnow().replace(microsecond=0).isoformat()
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes in Linux, bytes in macOS
+    if sys.platform == "darwin":
+        return round(max_rss / 1024**2, 1)
+    return round(max_rss / 1024, 1)
+
+
+class RunLog:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks can't be pickled (e.g. to start a process with the spawn method)
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def write(self, record: dict):
+        """Append a record. Each record is a single write, so that concurrent processes do not interleave lines."""
+        timestamp = datetime.utcnow().replace(microsecond=0).isoformat()
+        line = json.dumps({"run_id": RUN_ID, "timestamp": timestamp, **record}) + "\n"
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(line)
+
+    def read(self) -> pd.DataFrame:
+        """Load all records.
+
+        Returns:
+            pandas.DataFrame: One row per record, in order of writing.
+        """
+        if not os.path.isfile(self.path):
+            return pd.DataFrame(columns=["run_id", "step", "name", "success", "wall_time"])
+        return pd.read_json(self.path, lines=True, convert_dates=False)
+
+
+@contextmanager
+def track(run_log: RunLog, step: str, name: str, max_rss: bool = True):
+    """Record metrics of the code run within the context.
+
+    Yields a record dictionary, where the caller can set `rows` (rows produced) and `success` (defaults to whether an
+    exception was raised). CPU time is that of the current thread, and peak RSS that of the current process since it
+    started (not only of the code tracked).
+
+    Args:
+        run_log (RunLog): Run log where the record is appended.
+        step (str): Pipeline step, e.g. "get-data".
+        name (str): Name of the module, country or step being tracked.
+        max_rss (bool): Record peak RSS. Disable it when other work runs in the same process (e.g. in threads).
+    """
+    record = {"step": step, "name": name, "success": None, "rows": None}
+    t0 = time.perf_counter()
+    cpu0 = time.thread_time()
+    try:
+        with web.count_requests() as http:
+            yield record
+    except BaseException:
+        record["success"] = False
+        raise
+    else:
+        if record["success"] is None:
+            record["success"] = True
+    finally:
+        record.update(
+            wall_time=round(time.perf_counter() - t0, 3),
+            cpu_time=round(time.thread_time() - cpu0, 3),
+            max_rss_mb=_max_rss_mb() if max_rss else None,
+            http_requests=http["requests"],
+            http_bytes=http["bytes"],
+        )
+        run_log.write(record)
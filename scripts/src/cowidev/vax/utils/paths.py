@@ -44,6 +44,18 @@ class Paths:
     def tmp_inp(self):
         return os.path.join(self.tmp, "input")
 
+    @property
+    def tmp_http_cache(self):
+        return os.path.join(self.tmp, "tmp", "http_cache")
+
+    @property
+    def tmp_vax_run_log(self):
+        return os.path.join(self.tmp, "tmp", "vax_run_log.jsonl")
+
+    @property
+    def tmp_vax_process_fingerprints(self):
+        return os.path.join(self.tmp, "tmp", "vax_process_fingerprints.json")
+
     @property
     def tmp_vax_out_dir(self):
         return os.path.join(self.tmp, "output", "vaccinations")
@@ -1,5 +1,4 @@
 import os
-import requests
 from glob import glob
 import tempfile
 import re
@@ -11,6 +10,8 @@ import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 
+from cowidev.vax.utils import web
+
 
 VAX_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
 
@@ -28,7 +29,7 @@ def read_xlsx_from_url(url: str, as_series: bool = False, **kwargs) -> pd.DataFr
         pandas.DataFrame: Data loaded.
     """
     headers = {"User-Agent": "Mozilla/5.0 (X11; Linux i686)"}
-    response = requests.get(url, headers=headers)
+    response = web.get(url, headers=headers)
     with tempfile.NamedTemporaryFile() as tmp:
         with open(tmp.name, "wb") as f:
             f.write(response.content)
@@ -39,7 +40,7 @@ def read_xlsx_from_url(url: str, as_series: bool = False, **kwargs) -> pd.DataFr
 
 
 def download_file_from_url(url, save_path, chunk_size=128):
-    r = requests.get(url, stream=True)
+    r = web.get(url, stream=True)
     with open(save_path, "wb") as fd:
         for chunk in r.iter_content(chunk_size=chunk_size):
             fd.write(chunk)
@@ -84,7 +85,7 @@ def get_soup(
     if headers is None:
         headers = get_headers()
     try:
-        response = requests.get(source, headers=headers, verify=verify, timeout=timeout)
+        response = web.get(source, headers=headers, verify=verify, timeout=timeout)
     except Exception as err:
         raise err
     if not response.ok:
@@ -0,0 +1,275 @@
+"""Shared HTTP client for vaccination sources.
+
+All country modules fetch their sources through the same pooled session, so that connections are kept alive per host
+and reused across modules. Requests have a default timeout, are retried with exponential backoff on connection errors
+and transient server errors, and the number of concurrent requests to the same host is bounded.
+
+HTTPCache adds an on-disk cache on top, which revalidates sources with conditional requests (ETag/Last-Modified).
+"""
+from contextlib import contextmanager
+import hashlib
+from io import BytesIO
+import json
+import os
+import threading
+from urllib.parse import urlparse
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+TIMEOUT = 60
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUS = (429, 500, 502, 503, 504)
+# Connections kept alive per host
+POOL_MAXSIZE = 16
+# Concurrent requests per host
+MAX_REQUESTS_PER_HOST = 4
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".zip": "zip", ".xz": "xz"}
+
+_LOCK = threading.Lock()
+_session = None
+_session_pid = None
+_host_semaphores = {}
+_counters = threading.local()
+
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_MAXSIZE, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Get the session shared by all modules of this process.
+
+    A new session is built after a fork, so that child processes do not share sockets with their parent.
+
+    Returns:
+        requests.Session: Pooled session.
+    """
+    global _session, _session_pid
+    with _LOCK:
+        if _session is None or _session_pid != os.getpid():
+            _session = _build_session()
+            _session_pid = os.getpid()
+            _host_semaphores.clear()
+        return _session
+
+
+@contextmanager
+def _host_slot(url: str):
+    host = urlparse(url).netloc
+    with _LOCK:
+        semaphore = _host_semaphores.setdefault(host, threading.BoundedSemaphore(MAX_REQUESTS_PER_HOST))
+    with semaphore:
+        yield
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """Send a request with the shared session.
+
+    Args:
+        method (str): HTTP method.
+        url (str): Request url.
+        kwargs: Arguments for requests.Session.request. `timeout` defaults to TIMEOUT.
+
+    Returns:
+        requests.Response: Response.
+    """
+    kwargs.setdefault("timeout", TIMEOUT)
+    session = get_session()
+    with _host_slot(url):
+        response = session.request(method, url, **kwargs)
+    counter = getattr(_counters, "counter", None)
+    if counter is not None:
+        counter["requests"] += 1
+        if kwargs.get("stream"):
+            counter["bytes"] += int(response.headers.get("Content-Length", 0))
+        else:
+            counter["bytes"] += len(response.content)
+    return response
+
+
+@contextmanager
+def count_requests():
+    """Count requests (and bytes received) sent from the current thread within the context.
+
+    Yields:
+        dict: Counter with keys `requests` and `bytes`, updated as requests are sent.
+    """
+    counter = {"requests": 0, "bytes": 0}
+    previous = getattr(_counters, "counter", None)
+    _counters.counter = counter
+    try:
+        yield counter
+    finally:
+        _counters.counter = previous
+        if previous is not None:
+            previous["requests"] += counter["requests"]
+            previous["bytes"] += counter["bytes"]
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """Drop-in replacement for requests.get using the shared session."""
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """Drop-in replacement for requests.post using the shared session."""
+    return request("POST", url, **kwargs)
+
+
+def read_csv_from_url(url: str, headers: dict = None, **kwargs) -> pd.DataFrame:
+    """Download and load csv file from URL.
+
+    Drop-in replacement for pandas.read_csv(url). Compression is inferred from the extension of the url path, as pandas
+    does for urls.
+
+    Args:
+        url (str): File url.
+        headers (dict, optional): Headers to be used for request. Defaults to None.
+        kwargs: Arguments for pandas.read_csv.
+
+    Returns:
+        pandas.DataFrame: Data loaded.
+    """
+    response = get(url, headers=headers)
+    response.raise_for_status()
+    if kwargs.get("compression", "infer") == "infer":
+        extension = os.path.splitext(urlparse(url).path)[1].lower()
+        kwargs["compression"] = COMPRESSION_EXTENSIONS.get(extension)
+    return pd.read_csv(BytesIO(response.content), **kwargs)
+
+
+class CachedResponse:
+    def __init__(self, url: str, content: bytes, not_modified: bool, processed: bool):
+        self.url = url
+        self.content = content
+        self.not_modified = not_modified
+        self.processed = processed
+
+    @property
+    def unchanged(self) -> bool:
+        """True if the source returned 304 and its cached content was already processed successfully.
+
+        See `HTTPCache.get` for when content counts as processed.
+        """
+        return self.not_modified and self.processed
+
+
+class HTTPCache:
+    """On-disk cache of source downloads, keyed by URL.
+
+    Each entry stores the response body together with its ETag/Last-Modified validators, which are sent back as
+    If-None-Match/If-Modified-Since on the next request. On 304 the cached body is returned and no data is transferred.
+
+    Modules call `mark_processed` once they have exported the data of a response, so that they can skip their whole
+    pipeline on the next run if the source has not changed (see `CachedResponse.unchanged`). The module passes a
+    fingerprint of its code (see `file_fingerprint`) and the files it wrote, so that it is not skipped after its code
+    changed or if an output is missing.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def _entry_path(self, url: str, ext: str) -> str:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.{ext}")
+
+    def _load_entry(self, url: str) -> dict:
+        metadata_path = self._entry_path(url, "json")
+        if not (os.path.isfile(metadata_path) and os.path.isfile(self._entry_path(url, "body"))):
+            return None
+        with open(metadata_path) as f:
+            return json.load(f)
+
+    def _write_atomic(self, path: str, data: bytes):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _save_entry(self, url: str, entry: dict):
+        self._write_atomic(self._entry_path(url, "json"), json.dumps(entry).encode())
+
+    def get(self, url: str, headers: dict = None, fingerprint: str = None, **kwargs) -> CachedResponse:
+        """Get url, revalidating the cached copy if there is one.
+
+        The cached content counts as processed if `mark_processed` was called for it with the same `fingerprint`, and
+        all the outputs recorded then still exist.
+
+        Args:
+            url (str): Source url.
+            headers (dict, optional): Headers to be used for request. Defaults to None.
+            fingerprint (str, optional): Fingerprint of the processing code. Defaults to None.
+            kwargs: Arguments for requests.Session.request.
+
+        Returns:
+            CachedResponse: Response content (from the server or the cache).
+        """
+        entry = self._load_entry(url)
+        headers = dict(headers or {})
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        response = get(url, headers=headers, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            with open(self._entry_path(url, "body"), "rb") as f:
+                content = f.read()
+            return CachedResponse(url, content, not_modified=True, processed=self._is_processed(entry, fingerprint))
+        response.raise_for_status()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self._write_atomic(self._entry_path(url, "body"), response.content)
+            self._save_entry(url, {"url": url, "etag": etag, "last_modified": last_modified, "processed": False})
+        elif entry is not None:
+            # Source stopped sending validators, stale entry would never be revalidated
+            os.remove(self._entry_path(url, "json"))
+        return CachedResponse(url, response.content, not_modified=False, processed=False)
+
+    @staticmethod
+    def _is_processed(entry: dict, fingerprint: str) -> bool:
+        processed = entry["processed"]
+        return (
+            isinstance(processed, dict)
+            and processed["fingerprint"] == fingerprint
+            and all(os.path.isfile(path) for path in processed["outputs"])
+        )
+
+    def mark_processed(self, url: str, fingerprint: str = None, outputs: list = ()):
+        """Record that the cached content of url was processed successfully.
+
+        Args:
+            url (str): Source url.
+            fingerprint (str, optional): Fingerprint of the processing code. Defaults to None.
+            outputs (list, optional): Paths of the files written from the content. Defaults to ().
+        """
+        entry = self._load_entry(url)
+        if entry is not None:
+            entry["processed"] = {"fingerprint": fingerprint, "outputs": [os.path.abspath(path) for path in outputs]}
+            self._save_entry(url, entry)
+
+
+def file_fingerprint(*paths: str) -> str:
+    """Hash of the contents of files, e.g. `file_fingerprint(__file__)` for the source of a module."""
+    h = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
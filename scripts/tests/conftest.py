@@ -0,0 +1,9 @@
+import os
+import sys
+
+
+TESTS_DIR = os.path.dirname(__file__)
+# Modules in scripts/scripts import each other as top-level modules (e.g. `from shared import ...`)
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "scripts"))
+# cowidev package, if not installed
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "src"))
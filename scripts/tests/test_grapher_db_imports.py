@@ -0,0 +1,151 @@
+import pandas as pd
+import pytest
+
+from cowidev.grapher.db.utils import db_imports
+from cowidev.grapher.db.utils.db_utils import DBUtils
+
+
+class FakeCursor:
+    """Cursor on an in-memory data_values table, {(variableId, entityId, year): value}."""
+
+    def __init__(self, rows=()):
+        self.data_values = {(v, e, y): value for value, y, e, v in rows}
+        self.written = []
+        self.queries = []
+        self.executemany_calls = 0
+        self._result = []
+
+    def execute(self, query, args=None):
+        query = " ".join(query.split())
+        self.queries.append(query)
+        if "SELECT value, year, entityId, variableId" in query:
+            variable_ids = set(args[0])
+            self._result = [(value, y, e, v) for (v, e, y), value in self.data_values.items() if v in variable_ids]
+        elif "DELETE FROM data_values WHERE (variableId, entityId, year) IN" in query:
+            for key in args[0]:
+                del self.data_values[tuple(int(k) for k in key)]
+        elif "LOAD DATA LOCAL INFILE" in query:
+            df = pd.read_csv(args[0], sep="\t", header=None, dtype=str)
+            self._write(df.itertuples(index=False, name=None))
+
+    def executemany(self, query, rows):
+        self.executemany_calls += 1
+        self._write(rows)
+
+    def _write(self, rows):
+        for value, y, e, v in rows:
+            key = (int(v), int(e), int(y))
+            self.written.append(key)
+            self.data_values[key] = value
+
+    def fetchall(self):
+        return self._result
+
+
+def _data_values(rows):
+    return pd.DataFrame(rows, columns=["value", "year", "entityId", "variableId"])
+
+
+def _update(cursor, df_new):
+    db = DBUtils(cursor)
+    df_current = db_imports.get_current_data_values(db, df_new.variableId.unique())
+    df_upsert, df_delete = db_imports.get_data_values_delta(df_current, df_new)
+    db_imports.apply_data_values_delta(db, df_upsert, df_delete)
+
+
+def test_data_values_delta():
+    cursor = FakeCursor(
+        [
+            ("100", 10, 1, 7),  # untouched
+            ("0.123456789012345", 10, 2, 7),  # small revision
+            ("5", 11, 1, 7),  # revised
+            ("3", 12, 1, 7),  # deleted
+            ("8", 10, 1, 9),  # other variable
+        ]
+    )
+    df_new = _data_values(
+        [
+            ("100", 10, 1, 7),
+            ("0.123456789012346", 10, 2, 7),
+            ("6", 11, 1, 7),
+            ("42", 13, 1, 7),  # inserted
+        ]
+    )
+    _update(cursor, df_new)
+    assert cursor.data_values == {
+        (7, 1, 10): "100",
+        (7, 2, 10): "0.123456789012346",
+        (7, 1, 11): "6",
+        (7, 1, 13): "42",
+        (9, 1, 10): "8",
+    }
+    assert sorted(cursor.written) == [(7, 1, 11), (7, 1, 13), (7, 2, 10)]
+
+
+def test_data_values_delta_unchanged():
+    rows = [("100", 10, 1, 7), ("1.5", 11, 1, 7)]
+    cursor = FakeCursor(rows)
+    _update(cursor, _data_values(rows))
+    assert cursor.written == []
+    assert not any(query.startswith("DELETE") for query in cursor.queries)
+
+
+@pytest.mark.parametrize("load_data_infile", [False, True])
+def test_data_values_full_import_round_trip(monkeypatch, load_data_infile):
+    # A differential import right after a full one writes nothing, whichever way values were inserted
+    monkeypatch.setattr(db_imports, "LOAD_DATA_INFILE", load_data_infile)
+    df = pd.DataFrame({"Country": ["Atlantis", "Utopia"], "Year": [10, 10], "people": [12.0, 0.1 + 0.2]})
+    df_new = db_imports.get_data_values(
+        df, ["Country", "Year"], ["people"], {"Atlantis": 1, "Utopia": 2}, {"people": 7}
+    )
+    cursor = FakeCursor()
+    db_imports.insert_data_values(DBUtils(cursor), df_new)
+    assert sorted(cursor.data_values.values()) == ["0.3", "12"]
+    cursor.written = []
+    _update(cursor, df_new)
+    assert cursor.written == []
+
+
+def test_format_data_values():
+    assert db_imports.format_data_values(pd.Series([12.0, 0.5, 1e20, 1 / 3])).tolist() == [
+        "12",
+        "0.5",
+        "1e+20",
+        "0.333333333333333",
+    ]
+    assert db_imports.format_data_values(pd.Series([3, 40])).tolist() == ["3", "40"]
+    assert db_imports.format_data_values(pd.Series([3, 2.5, "x"], dtype=object)).tolist() == ["3", "2.5", "x"]
+
+
+def test_get_data_values():
+    df = pd.DataFrame({"Country": ["Atlantis", "Utopia"], "Year": [10, 11], "a": [1.0, None], "b": [2.5, 3.0]})
+    df_data_values = db_imports.get_data_values(
+        df, ["Country", "Year"], ["a", "b"], {"Atlantis": 1, "Utopia": 2}, {"a": 7, "b": 8}
+    )
+    # NaN values are dropped
+    assert df_data_values.values.tolist() == [["1", 10, 1, 7], ["2.5", 10, 1, 8], ["3", 11, 2, 8]]
+    assert df_data_values.dtypes[["year", "entityId", "variableId"]].tolist() == [int] * 3
+
+
+@pytest.mark.parametrize(
+    "entity_id_by_name, variable_id_by_name, match",
+    [
+        ({"Atlantis": 1}, {"a": 7}, r"entities: \['Utopia'\]"),
+        ({"Atlantis": 1, "Utopia": 2}, {}, r"variables: \['a'\]"),
+    ],
+)
+def test_get_data_values_unknown_ids(entity_id_by_name, variable_id_by_name, match):
+    df = pd.DataFrame({"Country": ["Atlantis", "Utopia"], "Year": [10, 11], "a": [1.0, 2.0]})
+    with pytest.raises(KeyError, match=match):
+        db_imports.get_data_values(df, ["Country", "Year"], ["a"], entity_id_by_name, variable_id_by_name)
+
+
+@pytest.mark.parametrize("load_data_infile", [False, True])
+def test_insert_data_values(monkeypatch, load_data_infile):
+    monkeypatch.setattr(db_imports, "LOAD_DATA_INFILE", load_data_infile)
+    cursor = FakeCursor()
+    db_imports.insert_data_values(DBUtils(cursor), _data_values([("1", 10, 1, 7), ("2.5", 11, 1, 7)]), chunk_size=1)
+    assert cursor.data_values == {(7, 1, 10): "1", (7, 1, 11): "2.5"}
+    # LOAD DATA with one statement, or multi-row INSERT statements (one per chunk)
+    load_data = [query for query in cursor.queries if query.startswith("LOAD DATA")]
+    assert (len(load_data), cursor.executemany_calls) == ((1, 0) if load_data_infile else (0, 2))
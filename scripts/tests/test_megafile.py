@@ -0,0 +1,70 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from megafile import encode_json_column, encode_json_values
+
+
+def _json(values):
+    return [json.dumps(v.item() if isinstance(v, np.generic) else v, separators=(",", ":")) for v in values]
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [-0.0, 0.0, 1.5, -0.0, 2.0],
+        [1, 3, 1, -7],
+        [True, False, True],
+        ["a", "b", "a"],
+    ],
+)
+def test_encode_json_values_typed(values):
+    series = pd.Series(values)
+    assert series.dtype != object or isinstance(values[0], str)
+    assert encode_json_values(series).tolist() == _json(values)
+
+
+def test_encode_json_values_object_mixed():
+    # Equal values of different types (and -0.0/0.0) must not share their encoding
+    values = [-0.0, 0.0, 1, 1.0, True, -0.0, 1, "x"]
+    series = pd.Series(values, dtype=object)
+    assert encode_json_values(series).tolist() == ["-0.0", "0.0", "1", "1.0", "true", "-0.0", "1", '"x"']
+
+
+def test_encode_json_values_object_floats():
+    # e.g. a float column where NA was assigned with pd.NA (object dtype under pandas 1.3)
+    series = pd.Series([0.0, -0.0, 2.5, pd.NA], dtype=object)
+    assert encode_json_column(series).tolist() == ["0.0", "-0.0", "2.5", "null"]
+
+
+def test_encode_json_values_not_finite():
+    with pytest.raises(ValueError):
+        encode_json_values(pd.Series([1.0, np.inf]))
+
+
+@pytest.mark.parametrize("fail", [False, True])
+def test_generate_megafile_saves_cache_after_exports(monkeypatch, fail):
+    # A failed export must leave the cache untouched, so that the next run retries it
+    import megafile
+
+    all_covid = pd.DataFrame({"location": ["Atlantis"], "date": ["2021-03-01"]})
+    cache = dict(sources={}, static={}, location_hashes={})
+    calls = []
+
+    def export_megafile(df, parallel=False):
+        calls.append("export")
+        if fail:
+            raise OSError("export failed")
+
+    monkeypatch.setattr(megafile, "build_megafile_incremental", lambda: (all_covid, cache))
+    monkeypatch.setattr(megafile, "export_megafile", export_megafile)
+    monkeypatch.setattr(megafile, "_save_cache", lambda df, **kwargs: calls.append(("save", kwargs)))
+    if fail:
+        with pytest.raises(OSError):
+            megafile.generate_megafile(incremental=True)
+        assert calls == ["export"]
+    else:
+        megafile.generate_megafile(incremental=True)
+        assert calls == ["export", ("save", cache)]
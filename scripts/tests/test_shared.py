@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import shared
+
+
+# Row-wise implementations replaced by column expressions, kept as reference
+
+
+def _cfr_100_cases_rowwise(df):
+    def _apply_row_cfr_100(row):
+        if pd.notnull(row["total_cases"]) and row["total_cases"] >= 100:
+            return row["cfr"]
+        return pd.NA
+
+    return df.apply(_apply_row_cfr_100, axis=1)
+
+
+def _doubling_days_rowwise(df):
+    df = df.copy()
+    for col, spec in shared.doubling_days_spec.items():
+        value_col = spec["value_col"]
+        periods = spec["periods"]
+        df.loc[df[value_col] == 0, value_col] = np.nan
+        df[col] = (
+            df.groupby("location", as_index=False)[value_col]
+            .pct_change(periods=periods, fill_method=None)[value_col]
+            .map(lambda pct: shared.pct_change_to_doubling_days(pct, periods))
+        )
+    return df
+
+
+def _exemplars_rowwise(df, countries_with_testing_data):
+    df = shared.inject_population(df)
+
+    def mapper_days_since(row):
+        if pd.notnull(row["population"]) and row["population"] >= 5e6:
+            return row["days_since_100_total_cases"]
+        return pd.NA
+
+    def mapper_bool(row):
+        if (
+            pd.notnull(row["days_since_100_total_cases"])
+            and pd.notnull(row["population"])
+            and row["days_since_100_total_cases"] >= 21
+            and row["population"] >= 5e6
+            and row["location"] in countries_with_testing_data
+        ):
+            return 1
+        return 0
+
+    df["days_since_100_total_cases_and_5m_pop"] = df.apply(mapper_days_since, axis=1)
+    df["5m_pop_and_21_days_since_100_cases_and_testing"] = df.apply(mapper_bool, axis=1)
+    return shared.drop_population(df)
+
+
+@pytest.fixture
+def df():
+    """Three locations (one with population < 5M, one not in the population file), rows interleaved by date."""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2020-08-20", periods=40).strftime("%Y-%m-%d")
+    frames = []
+    for location in ["France", "Iceland", "Atlantis"]:
+        new_cases = rng.integers(0, 60, len(dates)).astype(float)
+        new_cases[rng.random(len(dates)) < 0.1] = np.nan
+        new_deaths = np.floor(np.nan_to_num(new_cases) * rng.random(len(dates)) / 5)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "date": dates,
+                    "location": location,
+                    "new_cases": new_cases,
+                    "new_deaths": new_deaths,
+                    "total_cases": np.nancumsum(new_cases),
+                    "total_deaths": np.cumsum(new_deaths),
+                }
+            )
+        )
+    df = pd.concat(frames).sort_values("date", kind="stable").reset_index(drop=True)
+    df = shared.inject_per_million(df, ["new_cases", "new_deaths", "total_cases", "total_deaths"])
+    df = shared.inject_rolling_avg(df)
+    return shared.inject_days_since(df)
+
+
+def _float(series):
+    """Row-wise results hold pd.NA in object columns"""
+    return series.astype(object).where(series.notna(), np.nan).astype(float)
+
+
+def _sorted(df):
+    return df.sort_values(["location", "date"]).reset_index(drop=True)
+
+
+def test_pct_change_to_doubling_days_scalar():
+    assert shared.pct_change_to_doubling_days(1.0, 7) == 7
+    assert shared.pct_change_to_doubling_days(0, 7) is pd.NA
+    assert shared.pct_change_to_doubling_days(np.nan, 7) is pd.NA
+
+
+def test_pct_change_to_doubling_days_series():
+    pct_change = pd.Series([1.0, 0.0, np.nan, 0.1, -0.5])
+    expected = [shared.pct_change_to_doubling_days(pct, 3) for pct in pct_change]
+    result = shared.pct_change_to_doubling_days(pct_change, 3)
+    pd.testing.assert_series_equal(result, _float(pd.Series(expected)))
+
+
+def test_inject_doubling_days(df):
+    expected = _sorted(_doubling_days_rowwise(df))
+    result = _sorted(shared.inject_doubling_days(df.copy()))
+    for col in shared.doubling_days_spec:
+        pd.testing.assert_series_equal(result[col], _float(expected[col]))
+
+
+def test_inject_cfr(df):
+    expected = _cfr_100_cases_rowwise(shared.inject_cfr(df.copy()))
+    result = shared.inject_cfr(df.copy())["cfr_100_cases"]
+    pd.testing.assert_series_equal(result, _float(expected), check_names=False)
+
+
+def test_inject_exemplars(df, monkeypatch):
+    testing = pd.DataFrame({"location": ["France"]})
+    monkeypatch.setattr(shared.megafile, "get_testing", lambda: testing)
+    expected = _exemplars_rowwise(df.copy(), {"France"})
+    result = shared.inject_exemplars(df.copy())
+    pd.testing.assert_series_equal(
+        _float(result["days_since_100_total_cases_and_5m_pop"]),
+        _float(expected["days_since_100_total_cases_and_5m_pop"]),
+    )
+    pd.testing.assert_series_equal(
+        result["5m_pop_and_21_days_since_100_cases_and_testing"],
+        expected["5m_pop_and_21_days_since_100_cases_and_testing"],
+    )
+    assert result["5m_pop_and_21_days_since_100_cases_and_testing"].any()
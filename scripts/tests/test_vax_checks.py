@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from cowidev.vax.utils.checks import LocationsChecker
+
+
+def _df(location, total_vaccinations):
+    n = len(total_vaccinations)
+    return pd.DataFrame(
+        {
+            "location": [location] * n,
+            "date": pd.date_range("2021-03-01", periods=n).strftime("%Y-%m-%d"),
+            "total_vaccinations": total_vaccinations,
+        }
+    )
+
+
+def test_locations_checker_anomalies():
+    df = pd.concat(
+        [
+            _df("Atlantis", [20000, 21000, 22000, 500000, 510000]),
+            _df("Utopia", [30000, 31000, 32000]),
+        ],
+        ignore_index=True,
+    )
+    violations = LocationsChecker(df).run()
+    assert violations[["location", "metric", "rule"]].values.tolist() == [
+        ["Atlantis", "total_vaccinations", "anomaly"]
+    ]
+    assert violations.date.dt.strftime("%Y-%m-%d").tolist() == ["2021-03-04"]
+
+
+def test_locations_checker_null_location():
+    df = pd.concat(
+        [
+            _df("Atlantis", [20000, 21000, 22000, 500000]),
+            _df(None, [30000, 31000]),
+        ],
+        ignore_index=True,
+    )
+    violations = LocationsChecker(df).run()
+    assert violations.groupby("rule").size().to_dict() == {"anomaly": 1, "not_null": 2}
+    assert violations.loc[violations.rule == "not_null", "metric"].unique().tolist() == ["location"]
+
+
+def test_locations_checker_missing_columns():
+    df = _df("Atlantis", [20000, 21000]).drop(columns="total_vaccinations")
+    with pytest.raises(ValueError, match=r"missing column\(s\): \['total_vaccinations', 'people_vaccinated'\]"):
+        LocationsChecker(df, bounds={"people_vaccinated": (0, None)})
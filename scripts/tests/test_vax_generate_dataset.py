@@ -0,0 +1,157 @@
+import itertools
+from datetime import datetime
+from math import isnan
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cowidev.vax.cmd.generate_dataset import DatasetGenerator
+
+
+# Per-location implementations replaced by vectorised ones, kept as reference
+
+COLUMNS = ["total_vaccinations", "people_vaccinated", "people_fully_vaccinated", "total_boosters"]
+
+
+def _get_aggregate_old(aggregates, df, agg_name, included_locs, excluded_locs):
+    agg = df[~df.location.isin(aggregates.keys())]
+    if excluded_locs is not None:
+        agg = agg[~agg.location.isin(excluded_locs)]
+    elif included_locs is not None:
+        agg = agg[agg.location.isin(included_locs)]
+    agg = (
+        pd.DataFrame(
+            itertools.product(agg.location.unique(), agg.date.unique()),
+            columns=[agg.location.name, agg.date.name],
+        )
+        .merge(agg, on=["date", "location"], how="outer")
+        .sort_values(by=["location", "date"])
+    )
+    grouper = agg.groupby("location")
+    for col in COLUMNS:
+        agg[col] = grouper[col].apply(lambda x: x.fillna(0) if x.isnull().all() else x.fillna(method="ffill"))
+    agg = agg.groupby("date").sum().reset_index().assign(location=agg_name)
+    agg = agg[agg.date.dt.date < datetime.now().date()]
+    return agg
+
+
+def _pipe_aggregates_old(aggregates, df):
+    aggs = [
+        _get_aggregate_old(aggregates, df, agg_name, agg["included_locs"], agg["excluded_locs"])
+        for agg_name, agg in aggregates.items()
+    ]
+    return pd.concat([df] + aggs, ignore_index=True)
+
+
+def _add_smoothed_old(df):
+    dt_min = df.dropna(subset=["total_vaccinations"]).date.min()
+    dt_max = df.dropna(subset=["total_vaccinations"]).date.max()
+    df_nan = df[(df.date < dt_min) | (df.date > dt_max)]
+    df = df.merge(
+        pd.Series(pd.date_range(dt_min, dt_max), name="date"),
+        how="right",
+    ).sort_values(by="date")
+    new_interpolated_smoothed = (
+        df.total_vaccinations.interpolate(method="linear")
+        .diff()
+        .rolling(7, min_periods=1)
+        .mean()
+        .apply(lambda x: round(x) if not isnan(x) else x)
+    )
+    df = df.assign(new_vaccinations_smoothed=new_interpolated_smoothed)
+    df = pd.concat([df, df_nan], ignore_index=True).sort_values("date")
+    df.loc[:, "location"] = df.location.dropna().iloc[0]
+    return df
+
+
+def _pipe_smoothed_old(df):
+    return df.groupby("location").apply(_add_smoothed_old).reset_index(drop=True)
+
+
+@pytest.fixture
+def generator():
+    # Only the aggregate definitions are needed, not the input files
+    generator = DatasetGenerator.__new__(DatasetGenerator)
+    generator.aggregates = {
+        "World": {"excluded_locs": ["England"], "included_locs": None},
+        "European Union": {"excluded_locs": None, "included_locs": ["France", "Germany"]},
+        "Europe": {"excluded_locs": None, "included_locs": ["England", "France", "Germany"]},
+        "High income": {"excluded_locs": None, "included_locs": ["England", "France", "Israel"]},
+        "Low income": {"excluded_locs": None, "included_locs": ["Nigeria", "Chad"]},
+    }
+    return generator
+
+
+def _frame(rows):
+    df = pd.DataFrame(rows, columns=["location", "date"] + COLUMNS)
+    return df.assign(date=pd.to_datetime(df.date))
+
+
+def test_pipe_aggregates(generator):
+    # Locations report on different days, some metrics never, and aggregate rows in the input are kept as they are.
+    # Locations belong to several aggregates (e.g. continent and income group)
+    df = _frame(
+        [
+            ("England", "2021-03-01", 100, 80, 20, np.nan),
+            ("England", "2021-03-04", 150, 110, 40, np.nan),
+            ("France", "2021-03-01", 200, 150, 50, 1),
+            ("France", "2021-03-03", 260, 190, 70, np.nan),
+            ("France", "2021-03-05", 300, 200, 100, 5),
+            ("Germany", "2021-03-02", 500, 400, 100, np.nan),
+            ("Israel", "2021-03-03", 1000, 600, 400, 10),
+            ("Nigeria", "2021-03-05", 30, 30, np.nan, np.nan),
+            # Aggregates only include dates before today
+            ("Israel", str(datetime.now().date()), 1100, 650, 450, 20),
+            ("World", "2021-03-01", 1, 1, 1, 1),
+        ]
+    )
+    expected = _pipe_aggregates_old(generator.aggregates, df)
+    pd.testing.assert_frame_equal(generator.pipe_aggregates(df), expected)
+
+
+def test_pipe_smoothed(generator):
+    df = _frame(
+        [
+            # Means ending in .5 (1.5 and 2.5), rounded half to even
+            ("Atlantis", "2021-03-01", 0, np.nan, np.nan, np.nan),
+            ("Atlantis", "2021-03-02", 1, 1, np.nan, np.nan),
+            ("Atlantis", "2021-03-03", 3, np.nan, np.nan, np.nan),
+            ("Eden", "2021-03-01", 10, np.nan, np.nan, np.nan),
+            ("Eden", "2021-03-02", 12, np.nan, np.nan, np.nan),
+            ("Eden", "2021-03-03", 15, np.nan, np.nan, np.nan),
+            # Gapped dates, and rows without values before and after
+            ("Utopia", "2021-02-25", np.nan, 5, np.nan, np.nan),
+            ("Utopia", "2021-03-01", 100, 50, np.nan, np.nan),
+            ("Utopia", "2021-03-04", 130, 60, np.nan, np.nan),
+            ("Utopia", "2021-03-05", np.nan, 70, np.nan, np.nan),
+            ("Utopia", "2021-03-13", 211, 90, 10, np.nan),
+            ("Utopia", "2021-03-20", np.nan, 95, 12, np.nan),
+            # Single value
+            ("Zion", "2021-03-10", 7, 7, np.nan, np.nan),
+        ]
+    )
+    expected = _pipe_smoothed_old(df)
+    result = generator.pipe_smoothed(df)
+    pd.testing.assert_frame_equal(result, expected)
+    smoothed = result.set_index("location").new_vaccinations_smoothed
+    assert smoothed["Atlantis"].tolist()[1:] == [1, 2]
+    assert smoothed["Eden"].tolist()[1:] == [2, 2]
+
+
+def test_pipe_smoothed_location_without_values(generator):
+    # Previously failed (empty date range); its rows are now kept, without smoothed values
+    df = _frame(
+        [
+            ("Atlantis", "2021-03-01", 10, np.nan, np.nan, np.nan),
+            ("Atlantis", "2021-03-03", 20, np.nan, np.nan, np.nan),
+            ("Erewhon", "2021-03-01", np.nan, 3, np.nan, np.nan),
+            ("Erewhon", "2021-03-02", np.nan, 4, np.nan, np.nan),
+        ]
+    )
+    result = generator.pipe_smoothed(df)
+    expected = _pipe_smoothed_old(df[df.location == "Atlantis"])
+    pd.testing.assert_frame_equal(result[result.location == "Atlantis"], expected)
+    erewhon = result[result.location == "Erewhon"]
+    assert erewhon.people_vaccinated.tolist() == [3, 4]
+    assert erewhon.new_vaccinations_smoothed.isnull().all()
@@ -0,0 +1,91 @@
+import os
+import pickle
+import sys
+
+import pandas as pd
+import pytest
+
+from cowidev.vax.cmd import get_data
+from cowidev.vax.utils.metrics import RunLog
+from cowidev.vax.utils.paths import Paths
+
+
+MODULE_ATLANTIS = """
+import pandas as pd
+
+
+def main(paths):
+    df = pd.DataFrame({"location": "Atlantis", "total_vaccinations": [1, 2, 3]})
+    df.to_csv(paths.tmp_vax_out("Atlantis"), index=False)
+    df.head(2).to_csv(paths.tmp_vax_out_man("Atlantis"), index=False)
+    # Written by another module running at the same time
+    df.to_csv(paths.tmp_vax_out_dir + "/main_data/Utopia.csv", index=False)
+"""
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    package = tmp_path / "fakemodules"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "atlantis.py").write_text(MODULE_ATLANTIS)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield Paths(str(tmp_path))
+    sys.modules.pop("fakemodules.atlantis", None)
+    sys.modules.pop("fakemodules", None)
+
+
+def _records(paths):
+    return RunLog(paths.tmp_vax_run_log).read()
+
+
+def test_run_counts_rows_of_own_outputs(paths):
+    for subdir in ["main_data", "by_manufacturer"]:
+        os.makedirs(os.path.join(paths.tmp_vax_out_dir, subdir))
+    getter = get_data.CountryDataGetter(paths, [], None)
+    result = getter.run("fakemodules.atlantis")
+    assert result["success"]
+    record = _records(paths).iloc[-1]
+    assert record["rows"] == 5
+    # Peak RSS of the process is not that of the module, unless it runs in its own process
+    assert pd.isnull(record["max_rss_mb"])
+
+
+def test_run_import_error(paths):
+    getter = get_data.CountryDataGetter(paths, [], None)
+    result = getter.run("fakemodules.missing")
+    assert result["success"] is False
+    record = _records(paths).iloc[-1]
+    assert record[["name", "success", "rows"]].tolist() == ["fakemodules.missing", False, 0]
+
+
+def test_run_log_pickle(paths):
+    # e.g. to start module processes with the spawn method
+    getter = pickle.loads(pickle.dumps(get_data.CountryDataGetter(paths, [], None)))
+    getter.run_log.write({"step": "get-data", "name": "test"})
+    assert _records(paths).name.tolist() == ["test"]
+
+
+def test_run_modules_processes(paths):
+    for subdir in ["main_data", "by_manufacturer"]:
+        os.makedirs(os.path.join(paths.tmp_vax_out_dir, subdir))
+    getter = get_data.CountryDataGetter(paths, [], None)
+    results = get_data._run_modules_processes(
+        getter, ["fakemodules.atlantis", "fakemodules.missing"], n_jobs=2, timeout=60, memory_limit=10000
+    )
+    assert {r["module_name"]: r["success"] for r in results} == {
+        "fakemodules.atlantis": True,
+        "fakemodules.missing": False,
+    }
+    records = _records(paths).set_index("name")
+    assert records.loc["fakemodules.atlantis", "rows"] == 5
+    assert records.loc["fakemodules.atlantis", "max_rss_mb"] > 0
+
+
+def test_run_modules_processes_without_proc(paths, monkeypatch, caplog):
+    isdir = os.path.isdir
+    monkeypatch.setattr(get_data.os.path, "isdir", lambda path: path != "/proc" and isdir(path))
+    getter = get_data.CountryDataGetter(paths, [], None)
+    results = get_data._run_modules_processes(getter, ["fakemodules.missing"], n_jobs=1, memory_limit=1)
+    assert [r["success"] for r in results] == [False]
+    assert "`memory_limit` (1 MB) is ignored" in caplog.text
@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cowidev.vax.process import process_location
+from cowidev.vax.process.process import _strip, _to_int
+
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+
+# Element-wise implementations replaced by column operations, kept as reference
+
+
+def _to_int_old(ds):
+    return ds.astype(float).astype("Int64").fillna(pd.NA)
+
+
+def _strip_old(ds):
+    return ds.to_frame().applymap(lambda x: x.strip() if isinstance(x, str) else x)[ds.name]
+
+
+@pytest.mark.parametrize(
+    "values, dtype",
+    [
+        ([1, 2, 30000000], "int64"),
+        ([1.0, 2.0, 30000000.0], "float64"),
+        ([1.0, np.nan, 3.0], "float64"),
+        ([np.nan, np.nan], "float64"),
+        ([1, pd.NA, 3], "Int64"),
+        (["1", "2.0", np.nan], "object"),
+        ([1.0, None, 3], "object"),
+    ],
+)
+def test_to_int(values, dtype):
+    ds = pd.Series(values, dtype=dtype)
+    pd.testing.assert_series_equal(_to_int(ds), _to_int_old(ds))
+
+
+def test_to_int_large_int_is_exact():
+    ds = pd.Series([2**53 + 1, 2**60])
+    assert _to_int(ds).tolist() == [2**53 + 1, 2**60]
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [" Pfizer/BioNTech ", "Moderna", "\tSputnik V\n"],
+        [" a ", np.nan, "b "],
+        [" https://example.com", None, 1, 2.5],
+        [np.nan, np.nan],
+        [1, 2, 3],
+    ],
+)
+def test_strip(values):
+    # Columns without strings are no longer converted from object dtype, which does not change the exported CSV
+    ds = pd.Series(values, dtype=object, name="vaccine")
+    pd.testing.assert_series_equal(_strip(ds), _strip_old(ds), check_dtype=False)
+    assert _strip(ds).to_csv(index=False) == _strip_old(ds).to_csv(index=False)
+
+
+@pytest.mark.parametrize(
+    "location",
+    [
+        "Albania",  # source_url with surrounding whitespace and Twitter urls to clean
+        "Antigua and Barbuda",  # no people_fully_vaccinated, Facebook urls to clean
+        "Aruba",  # total_boosters
+        "Chile",  # float-typed integers
+    ],
+)
+def test_process_location(location):
+    # Output of the module in get-data, and the public file it was processed into
+    df = pd.read_csv(os.path.join(SCRIPTS_DIR, "output", "vaccinations", "main_data", f"{location}.csv"))
+    with open(
+        os.path.join(SCRIPTS_DIR, "..", "public", "data", "vaccinations", "country_data", f"{location}.csv")
+    ) as f:
+        expected = f.read()
+    assert process_location(df).to_csv(index=False) == expected
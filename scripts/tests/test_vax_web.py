@@ -0,0 +1,157 @@
+import gzip
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+
+import pandas as pd
+import pytest
+import requests
+
+from cowidev.vax.utils import web
+
+
+CSV = b"date,total_vaccinations\n2021-01-01,10\n2021-01-02,25\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Set by the `server` fixture
+    state = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        state = self.state
+        state["requests"].append((self.path, dict(self.headers)))
+        if self.path == "/data.csv":
+            self._send(200, CSV)
+        elif self.path == "/data.csv.gz":
+            self._send(200, gzip.compress(CSV))
+        elif self.path == "/flaky.csv":
+            state["flaky"] -= 1
+            if state["flaky"] >= 0:
+                self._send(503)
+            else:
+                self._send(200, CSV)
+        elif self.path == "/down.csv":
+            self._send(503)
+        elif self.path == "/etag.csv":
+            if self.headers.get("If-None-Match") == state["etag"]:
+                self._send(304, headers={"ETag": state["etag"]})
+            else:
+                self._send(200, state["body"], headers={"ETag": state["etag"]})
+        else:
+            self._send(404)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Local HTTP server, and a fresh shared session without retry backoff."""
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+    monkeypatch.setattr(web, "BACKOFF_FACTOR", 0)
+    monkeypatch.setattr(web, "_session", None)
+    state = {"requests": [], "flaky": 2, "etag": '"v1"', "body": CSV}
+    handler = type("Handler", (_Handler,), {"state": state})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", state
+    httpd.shutdown()
+    httpd.server_close()
+    web._session = None
+
+
+def test_read_csv_from_url(server):
+    url, _ = server
+    df = web.read_csv_from_url(f"{url}/data.csv", usecols=["total_vaccinations"])
+    pd.testing.assert_frame_equal(df, pd.DataFrame({"total_vaccinations": [10, 25]}))
+
+
+def test_read_csv_from_url_compression(server):
+    url, _ = server
+    df = web.read_csv_from_url(f"{url}/data.csv.gz")
+    assert df.total_vaccinations.tolist() == [10, 25]
+
+
+def test_retry_server_error(server):
+    url, state = server
+    df = web.read_csv_from_url(f"{url}/flaky.csv")
+    assert len(df) == 2
+    assert [path for path, _ in state["requests"]] == ["/flaky.csv"] * 3
+
+
+def test_retry_exhausted(server):
+    url, state = server
+    with pytest.raises(requests.HTTPError):
+        web.read_csv_from_url(f"{url}/down.csv")
+    assert len(state["requests"]) == web.MAX_RETRIES + 1
+
+
+def test_count_requests(server):
+    url, _ = server
+    with web.count_requests() as counter:
+        web.get(f"{url}/data.csv")
+        web.get(f"{url}/data.csv")
+    assert counter == {"requests": 2, "bytes": 2 * len(CSV)}
+
+
+def test_session_shared(server):
+    assert web.get_session() is web.get_session()
+
+
+def test_http_cache_not_modified(server, tmp_path):
+    url, state = server
+    cache = web.HTTPCache(str(tmp_path))
+    response = cache.get(f"{url}/etag.csv")
+    assert response.content == CSV
+    assert not response.not_modified
+    # Revalidated, but not processed yet
+    response = cache.get(f"{url}/etag.csv")
+    assert response.not_modified and not response.unchanged
+    assert state["requests"][-1][1]["If-None-Match"] == '"v1"'
+    cache.mark_processed(f"{url}/etag.csv")
+    response = cache.get(f"{url}/etag.csv")
+    assert response.unchanged
+    assert response.content == CSV
+
+
+def test_http_cache_modified(server, tmp_path):
+    url, state = server
+    cache = web.HTTPCache(str(tmp_path))
+    cache.get(f"{url}/etag.csv")
+    cache.mark_processed(f"{url}/etag.csv")
+    state["etag"], state["body"] = '"v2"', CSV + b"2021-01-03,40\n"
+    response = cache.get(f"{url}/etag.csv")
+    assert not response.not_modified and not response.unchanged
+    assert response.content == state["body"]
+
+
+def test_http_cache_processed_fingerprint_and_outputs(server, tmp_path):
+    url, _ = server
+    cache = web.HTTPCache(str(tmp_path / "cache"))
+    output = tmp_path / "output.csv"
+    output.write_text("x")
+    cache.get(f"{url}/etag.csv", fingerprint="code-v1")
+    cache.mark_processed(f"{url}/etag.csv", fingerprint="code-v1", outputs=[str(output)])
+    assert cache.get(f"{url}/etag.csv", fingerprint="code-v1").unchanged
+    # Code changed
+    assert not cache.get(f"{url}/etag.csv", fingerprint="code-v2").unchanged
+    # Output missing
+    output.unlink()
+    assert not cache.get(f"{url}/etag.csv", fingerprint="code-v1").unchanged
+
+
+def test_file_fingerprint(tmp_path):
+    path = tmp_path / "module.py"
+    path.write_text("a = 1\n")
+    fingerprint = web.file_fingerprint(str(path))
+    assert web.file_fingerprint(str(path)) == fingerprint
+    path.write_text("a = 2\n")
+    assert web.file_fingerprint(str(path)) != fingerprint